@@ -0,0 +1,218 @@
+"""
+Concurrent-connection benchmark: gunicorn (WSGI) against uvicorn (ASGI).
+
+Starts both servers on a throwaway SQLite database with the same number of
+worker processes and drives each with two groups of clients:
+
+* slow clients, which trickle their request headers one line at a time and
+  so occupy a connection for the whole run, like clients on a bad network;
+* fast clients, which send back-to-back GET requests and measure throughput
+  and latency.
+
+The WSGI server answers the DRF endpoint (/api/datasets/history/), the ASGI
+server the async one (/api/async/datasets/history/). Gunicorn runs threaded
+workers as configured in gunicorn.conf.py: a thread is held by each slow
+client, while the event loop of an ASGI worker is not.
+
+Usage (from the backend directory; needs gunicorn and uvicorn):
+    python -m benchmarks.bench_asgi
+    python -m benchmarks.bench_asgi --slow-clients 0 8 64 --fast-clients 16 --duration 10
+    python -m benchmarks.bench_asgi --threads 1              # sync gunicorn workers
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+HOST = '127.0.0.1'
+
+SERVERS = {
+    'wsgi': {
+        'command': ['gunicorn', 'config.wsgi:application', '-c', 'gunicorn.conf.py', '--log-level', 'warning'],
+        'path': '/api/datasets/history/',
+    },
+    'asgi': {
+        'command': ['uvicorn', 'config.asgi:application', '--log-level', 'warning'],
+        'path': '/api/async/datasets/history/',
+    },
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+
+def prepare_database(env: dict) -> str:
+    """Create the schema, a user with a token and a few datasets; return the token."""
+    script = (
+        "import django; django.setup()\n"
+        "from django.core.management import call_command\n"
+        "call_command('migrate', run_syncdb=True, verbosity=0)\n"
+        "from django.contrib.auth.models import User\n"
+        "from rest_framework.authtoken.models import Token\n"
+        "from equipment.models import Dataset\n"
+        "user = User.objects.create_user('bench', password='bench-password')\n"
+        "for i in range(5):\n"
+        "    Dataset.objects.create(user=user, filename=f'bench_{i}.csv', total_count=100,\n"
+        "                           avg_flowrate=1.0, avg_pressure=1.0, avg_temperature=1.0,\n"
+        "                           equipment_type_distribution={'Pump': 100})\n"
+        "print(Token.objects.create(user=user).key)\n"
+    )
+    output = subprocess.run([sys.executable, '-c', script], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return output.strip().splitlines()[-1]
+
+
+def start_server(name: str, port: int, workers: int, threads: int, env: dict) -> subprocess.Popen:
+    command = list(SERVERS[name]['command'])
+    if name == 'wsgi':
+        command += ['--bind', f'{HOST}:{port}', '--workers', str(workers), '--threads', str(threads)]
+    else:
+        command += ['--host', HOST, '--port', str(port), '--workers', str(workers)]
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f'http://{HOST}:{port}/api/health/', timeout=1)
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f'{name} server did not start on port {port}')
+
+
+async def read_response(reader) -> bool:
+    """Read one HTTP response; return True if the server keeps the connection open."""
+    head = await reader.readuntil(b'\r\n\r\n')
+    headers = {}
+    for line in head.decode('latin-1').split('\r\n')[1:]:
+        if ':' in line:
+            key, value = line.split(':', 1)
+            headers[key.strip().lower()] = value.strip()
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+        return headers.get('connection', '').lower() != 'close'
+    await reader.read()
+    return False
+
+
+async def fast_client(port: int, request: bytes, deadline: float, latencies: list, errors: list):
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(HOST, port)
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            keep_alive = await asyncio.wait_for(read_response(reader), deadline - start + 5)
+            latencies.append(time.perf_counter() - start)
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            errors.append(1)
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def slow_client(port: int, path: str, deadline: float, interval: float):
+    """Hold a connection by sending one header line every ``interval`` seconds."""
+    try:
+        reader, writer = await asyncio.open_connection(HOST, port)
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: {HOST}\r\n'.encode())
+        while time.perf_counter() < deadline:
+            writer.write(b'X-Slow-Client: 1\r\n')
+            await writer.drain()
+            await asyncio.sleep(interval)
+        writer.close()
+    except OSError:
+        pass
+
+
+async def run_load(port: int, path: str, token: str, fast: int, slow: int, duration: float,
+                   interval: float) -> dict:
+    request = (
+        f'GET {path} HTTP/1.1\r\nHost: {HOST}\r\nAuthorization: Token {token}\r\n'
+        f'Connection: keep-alive\r\n\r\n'
+    ).encode()
+    deadline = time.perf_counter() + duration
+    latencies, errors = [], []
+    slow_tasks = [asyncio.create_task(slow_client(port, path, deadline, interval)) for _ in range(slow)]
+    # Let the slow clients connect first
+    await asyncio.sleep(0.5)
+    started = time.perf_counter()
+    await asyncio.gather(*(fast_client(port, request, deadline, latencies, errors) for _ in range(fast)))
+    elapsed = time.perf_counter() - started
+    await asyncio.gather(*slow_tasks)
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': statistics.median(latencies) * 1000 if latencies else float('nan'),
+        'p99_ms': latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float('nan'),
+        'errors': len(errors),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--servers', nargs='+', choices=list(SERVERS), default=list(SERVERS))
+    parser.add_argument('--workers', type=int, default=2, help='Worker processes per server (default: 2)')
+    parser.add_argument('--threads', type=int, default=8,
+                        help='Threads per gunicorn worker, as GUNICORN_THREADS (default: 8)')
+    parser.add_argument('--fast-clients', type=int, default=16, help='Concurrent fast clients (default: 16)')
+    parser.add_argument('--slow-clients', type=int, nargs='+', default=[0, 8, 64],
+                        help='Slow client counts to run (default: 0 8 64)')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per run (default: 10)')
+    parser.add_argument('--trickle-interval', type=float, default=1.0,
+                        help='Seconds between header lines of a slow client (default: 1)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE='config.settings',
+            DATABASE_URL=f'sqlite:///{workdir}/bench.sqlite3',
+            METRICS_ENABLED='False',
+            PYTHONPATH=str(BACKEND_DIR),
+        )
+        token = prepare_database(env)
+
+        print(f"{'server':<8}{'slow':>6}{'fast':>6}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for name in args.servers:
+            port = free_port()
+            process = start_server(name, port, args.workers, args.threads, env)
+            try:
+                for slow in args.slow_clients:
+                    result = asyncio.run(run_load(
+                        port, SERVERS[name]['path'], token, args.fast_clients, slow,
+                        args.duration, args.trickle_interval,
+                    ))
+                    print(f"{name:<8}{slow:>6}{args.fast_clients:>6}{result['rps']:>10.0f}"
+                          f"{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}{result['errors']:>8}")
+            finally:
+                process.terminate()
+                process.wait(10)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Cold-start benchmark for a backend worker process.
+
+Starts fresh interpreters that do what a gunicorn worker does before its
+first request (set up Django, build the WSGI application, load the URLconf)
+and reports the wall time, the peak RSS and which heavy optional libraries
+got imported along the way. pandas, numpy and ReportLab must only be loaded
+by the code paths that use them.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_startup                 # check against the budgets
+    python -m benchmarks.bench_startup --runs 10       # more samples
+
+The process exits with status 1 when the median time or RSS exceeds its
+budget, or when a heavy library is imported at startup.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ['pandas', 'numpy', 'reportlab', 'PIL', 'matplotlib', 'pyarrow']
+TIME_BUDGET = 1.0
+RSS_BUDGET_MB = 90
+
+STARTUP_SCRIPT = f"""
+import json, os, resource, sys, time
+start = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+import config.urls
+elapsed = time.perf_counter() - start
+try:
+    # Peak RSS of this image only; ru_maxrss also counts the parent before exec
+    with open('/proc/self/status') as status:
+        rss_mb = next(int(line.split()[1]) for line in status if line.startswith('VmHWM:')) / 1024
+except OSError:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    rss_mb = rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+heavy = [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+print(json.dumps({{'time': elapsed, 'rss_mb': rss_mb, 'heavy_modules': heavy}}))
+"""
+
+
+def measure_startup() -> dict:
+    """Start one fresh worker-like process and return its measurements."""
+    env = dict(os.environ, PYTHONPATH=str(BACKEND_DIR))
+    output = subprocess.run(
+        [sys.executable, '-c', STARTUP_SCRIPT], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='Fresh processes to start (median is reported)')
+    parser.add_argument('--time-budget', type=float,
+                        default=float(os.environ.get('BENCH_STARTUP_TIME_BUDGET', TIME_BUDGET)),
+                        help=f'Allowed median startup time in seconds (default: {TIME_BUDGET})')
+    parser.add_argument('--rss-budget', type=float,
+                        default=float(os.environ.get('BENCH_STARTUP_RSS_BUDGET', RSS_BUDGET_MB)),
+                        help=f'Allowed median peak RSS in MB (default: {RSS_BUDGET_MB})')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    samples = [measure_startup() for _ in range(args.runs)]
+    elapsed = statistics.median(sample['time'] for sample in samples)
+    rss_mb = statistics.median(sample['rss_mb'] for sample in samples)
+    heavy = sorted({name for sample in samples for name in sample['heavy_modules']})
+
+    print(f"{'startup time':<16}{elapsed * 1000:>10.0f} ms   (budget {args.time_budget * 1000:.0f} ms)")
+    print(f"{'peak RSS':<16}{rss_mb:>10.1f} MB   (budget {args.rss_budget:.0f} MB)")
+    print(f"{'heavy modules':<16}{', '.join(heavy) or 'none':>10}")
+
+    failures = []
+    if elapsed > args.time_budget:
+        failures.append(f"startup time {elapsed:.2f}s exceeds {args.time_budget:.2f}s")
+    if rss_mb > args.rss_budget:
+        failures.append(f"peak RSS {rss_mb:.1f} MB exceeds {args.rss_budget:.0f} MB")
+    if heavy:
+        failures.append(f"imported at startup: {', '.join(heavy)}")
+    if failures:
+        print('\nBudget exceeded:')
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+
+    print('\nWithin budget.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
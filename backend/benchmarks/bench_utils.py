@@ -0,0 +1,279 @@
+"""
+Microbenchmarks for the hot functions in equipment.utils.
+
+Measures wall time and peak memory (tracemalloc) of the CSV parsing,
+validation, analysis, conversion and PDF generation functions on synthetic
+datasets, and compares the results against a stored baseline.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_utils                  # compare against baseline
+    python -m benchmarks.bench_utils --quick          # small sizes only
+    python -m benchmarks.bench_utils --save-baseline  # record a new baseline
+
+The process exits with status 1 when any benchmark regresses beyond the
+configured threshold, so it can be used as a CI gate.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from django.core.files.uploadedfile import SimpleUploadedFile  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from equipment.models import Dataset  # noqa: E402
+from equipment.utils import (  # noqa: E402
+    analyze_equipment_data, convert_dataframe_to_list, generate_pdf_report,
+    parse_csv_file, validate_csv_structure
+)
+
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+DEFAULT_ROWS = [1_000, 10_000, 100_000, 1_000_000]
+DEFAULT_TYPES = [5, 50, 500]
+QUICK_ROWS = [1_000, 10_000]
+QUICK_TYPES = [5, 50]
+FUNCTIONS = [
+    'parse_csv_file', 'validate_csv_structure', 'analyze_equipment_data',
+    'convert_dataframe_to_list', 'generate_pdf_report',
+]
+
+
+def make_dataframe(rows: int, types: int, seed: int = 42) -> pd.DataFrame:
+    """Build a synthetic equipment DataFrame with the given shape."""
+    rng = np.random.default_rng(seed)
+    type_names = np.array([f"Type-{i}" for i in range(types)])
+    return pd.DataFrame({
+        'Equipment Name': [f"EQ-{i}" for i in range(rows)],
+        'Type': type_names[rng.integers(0, types, size=rows)],
+        'Flowrate': rng.uniform(50, 250, size=rows).round(2),
+        'Pressure': rng.uniform(1, 15, size=rows).round(2),
+        'Temperature': rng.uniform(20, 300, size=rows).round(2),
+    })
+
+
+def make_dataset(df: pd.DataFrame) -> Dataset:
+    """Build an unsaved Dataset instance for PDF generation."""
+    analysis = analyze_equipment_data(df)
+    return Dataset(
+        filename='benchmark.csv',
+        uploaded_at=timezone.now(),
+        total_count=analysis['total_count'],
+        avg_flowrate=analysis['avg_flowrate'],
+        avg_pressure=analysis['avg_pressure'],
+        avg_temperature=analysis['avg_temperature'],
+        equipment_type_distribution=analysis['equipment_type_distribution'],
+    )
+
+
+def build_case(function: str, rows: int, types: int, workdir: str):
+    """
+    Return a zero-argument callable running one benchmark case.
+
+    Input preparation happens here so it is excluded from the measurement.
+    """
+    df = make_dataframe(rows, types)
+
+    if function == 'parse_csv_file':
+        content = df.to_csv(index=False).encode('utf-8')
+
+        def run():
+            upload = SimpleUploadedFile('benchmark.csv', content, content_type='text/csv')
+            result, error = parse_csv_file(upload)
+            assert result is not None, error
+        return run
+
+    if function == 'validate_csv_structure':
+        def run():
+            is_valid, error = validate_csv_structure(df)
+            assert is_valid, error
+        return run
+
+    if function == 'analyze_equipment_data':
+        return lambda: analyze_equipment_data(df)
+
+    if function == 'convert_dataframe_to_list':
+        return lambda: convert_dataframe_to_list(df)
+
+    if function == 'generate_pdf_report':
+        dataset = make_dataset(df)
+        filepath = os.path.join(workdir, 'benchmark.pdf')
+
+        def run():
+            assert generate_pdf_report(dataset, filepath)
+        return run
+
+    raise ValueError(f"Unknown benchmark function: {function}")
+
+
+def measure(run, repeat: int) -> dict:
+    """Measure best-of-N wall time and peak traced memory of a callable."""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    # Memory is measured in a separate run: tracing distorts timings.
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'wall_time': min(timings),
+        'mean_time': sum(timings) / len(timings),
+        'peak_memory': peak,
+    }
+
+
+def case_id(function: str, rows: int, types: int) -> str:
+    """Return the baseline key for a benchmark case."""
+    if function == 'generate_pdf_report':
+        # The report only depends on the type distribution, not on row count.
+        return f"{function}[types={types}]"
+    return f"{function}[rows={rows},types={types}]"
+
+
+def run_benchmarks(functions, rows_list, types_list, repeat: int) -> dict:
+    """Run every benchmark case and return the results keyed by case id."""
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for function in functions:
+            for types in types_list:
+                for rows in rows_list:
+                    key = case_id(function, rows, types)
+                    if key in results:
+                        continue
+                    run = build_case(function, rows, types, workdir)
+                    results[key] = measure(run, repeat)
+                    print(
+                        f"{key:<60} {results[key]['wall_time'] * 1000:>10.2f} ms "
+                        f"{results[key]['peak_memory'] / 1024 ** 2:>10.2f} MiB",
+                        flush=True
+                    )
+    return results
+
+
+def compare(results: dict, baseline: dict, time_threshold: float, memory_threshold: float,
+            min_delta: float = 0.0) -> list:
+    """
+    Compare results with a baseline.
+
+    Wall time differences smaller than ``min_delta`` seconds are treated as
+    noise, so very fast cases do not flap.
+
+    Returns:
+        List of human-readable regression descriptions (empty when clean)
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            print(f"NEW        {key}")
+            continue
+
+        time_ratio = current['wall_time'] / previous['wall_time'] if previous['wall_time'] else 1.0
+        memory_ratio = current['peak_memory'] / previous['peak_memory'] if previous['peak_memory'] else 1.0
+
+        status = 'OK'
+        time_delta = current['wall_time'] - previous['wall_time']
+        if time_ratio > 1 + time_threshold and time_delta > min_delta:
+            status = 'REGRESSED'
+            regressions.append(f"{key}: wall time {time_ratio:.2f}x baseline")
+        if memory_ratio > 1 + memory_threshold:
+            status = 'REGRESSED'
+            regressions.append(f"{key}: peak memory {memory_ratio:.2f}x baseline")
+        print(f"{status:<10} {key}  time {time_ratio:.2f}x  memory {memory_ratio:.2f}x")
+    return regressions
+
+
+def environment_info() -> dict:
+    """Describe the machine the benchmarks ran on."""
+    return {
+        'recorded_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', help='Row counts to benchmark')
+    parser.add_argument('--types', type=int, nargs='+', help='Equipment type counts to benchmark')
+    parser.add_argument('--functions', nargs='+', choices=FUNCTIONS, default=FUNCTIONS,
+                        help='Functions to benchmark (default: all)')
+    parser.add_argument('--quick', action='store_true', help='Only run the small input sizes')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case (best is kept)')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='Store results as the new baseline')
+    parser.add_argument('--threshold', type=float,
+                        default=float(os.environ.get('BENCH_TIME_THRESHOLD', 0.25)),
+                        help='Allowed wall time regression as a fraction (default: 0.25)')
+    parser.add_argument('--memory-threshold', type=float,
+                        default=float(os.environ.get('BENCH_MEMORY_THRESHOLD', 0.10)),
+                        help='Allowed peak memory regression as a fraction (default: 0.10)')
+    parser.add_argument('--min-delta-ms', type=float,
+                        default=float(os.environ.get('BENCH_MIN_DELTA_MS', 10)),
+                        help='Ignore wall time regressions smaller than this (default: 10 ms)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    rows_list = args.rows or (QUICK_ROWS if args.quick else DEFAULT_ROWS)
+    types_list = args.types or (QUICK_TYPES if args.quick else DEFAULT_TYPES)
+
+    results = run_benchmarks(args.functions, rows_list, types_list, args.repeat)
+
+    if args.save_baseline:
+        stored = {'environment': environment_info(), 'results': {}}
+        if args.baseline.exists():
+            stored['results'] = json.loads(args.baseline.read_text()).get('results', {})
+        stored['results'].update(results)
+        args.baseline.write_text(json.dumps(stored, indent=2, sort_keys=True) + '\n')
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline found at {args.baseline}; run with --save-baseline first.")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text()).get('results', {})
+    regressions = compare(
+        results, baseline, args.threshold, args.memory_threshold, args.min_delta_ms / 1000
+    )
+    if regressions:
+        print('\nRegressions detected:')
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+
+    print('\nNo regressions detected.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
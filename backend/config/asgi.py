@@ -7,5 +7,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# Connections opened by the executor threads of async views are never closed
+# at the end of a request, so none of them may persist
+os.environ['DB_CONN_MAX_AGE'] = '0'
 
 application = get_asgi_application()
@@ -5,8 +5,11 @@ Follows Django best practices with environment-based configuration.
 
 import os
 from pathlib import Path
+from corsheaders.defaults import default_headers
 from decouple import config
 
+from config.database import database_from_url
+
 # Build paths inside the project
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -35,7 +38,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'equipment.metrics.MetricsMiddleware',
+    'equipment.profiling.RequestProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # ETag / If-None-Match revalidation for API responses
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -65,13 +72,46 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
-# Database
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Database: SQLite by default, or any DATABASE_URL (e.g. postgres://...)
+DATABASE_URL = config('DATABASE_URL', default='')
+if DATABASE_URL:
+    DATABASES = {
+        'default': database_from_url(
+            DATABASE_URL,
+            # Persistent connections, one per thread: gunicorn's gthread pool
+            # keeps at most GUNICORN_THREADS per worker. config/asgi.py forces
+            # 0, as the threads running async views never close theirs
+            conn_max_age=config('DB_CONN_MAX_AGE', default=600, cast=int),
+            health_checks=config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+            statement_timeout=config('DB_STATEMENT_TIMEOUT', default=30000, cast=int),
+            connect_timeout=config('DB_CONNECT_TIMEOUT', default=5, cast=int),
+            pgbouncer=config('DB_PGBOUNCER', default=False, cast=bool),
+            sqlite_timeout=config('SQLITE_BUSY_TIMEOUT', default=20, cast=int),
+        )
     }
-}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                # Seconds to wait for a lock before raising "database is locked"
+                'timeout': config('SQLITE_BUSY_TIMEOUT', default=20, cast=int),
+            },
+        }
+    }
+
+# High-concurrency SQLite profile: WAL journal so readers never block behind
+# a writer, tuned pragmas, and upload writes serialized through one writer.
+SQLITE_HIGH_CONCURRENCY = config('SQLITE_HIGH_CONCURRENCY', default=False, cast=bool)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64000,       # 64 MB page cache
+    'mmap_size': 268435456,     # 256 MB memory-mapped I/O
+    'temp_store': 'MEMORY',
+} if SQLITE_HIGH_CONCURRENCY else {}
+SERIALIZE_DB_WRITES = SQLITE_HIGH_CONCURRENCY
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -132,6 +172,7 @@ CORS_ALLOWED_ORIGINS = [
 ]
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_ALL_ORIGINS = False
+CORS_ALLOW_HEADERS = (*default_headers, 'x-chunk-sha256')
 
 # Swagger settings
 SWAGGER_SETTINGS = {
@@ -150,6 +191,90 @@ SWAGGER_SETTINGS = {
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
+# Largest size a .csv.gz upload may decompress to; upload limits count compressed bytes
+CSV_MAX_DECOMPRESSED_SIZE = config('CSV_MAX_DECOMPRESSED_SIZE', default=268435456, cast=int)  # 256MB
+
+# Resumable chunked uploads (api/uploads/) for files above the 5MB single-request limit
+CHUNKED_UPLOAD_DIR = config('CHUNKED_UPLOAD_DIR', default=str(BASE_DIR / 'chunked_uploads'))
+CHUNKED_UPLOAD_CHUNK_SIZE = config('CHUNKED_UPLOAD_CHUNK_SIZE', default=4194304, cast=int)  # 4MB
+CHUNKED_UPLOAD_MAX_SIZE = config('CHUNKED_UPLOAD_MAX_SIZE', default=4294967296, cast=int)  # 4GB
+CHUNKED_UPLOAD_EXPIRY_HOURS = config('CHUNKED_UPLOAD_EXPIRY_HOURS', default=24, cast=int)
+# Threads per process that ingest finalized uploads in the background (0 ingests
+# inside the finalize request), and the seconds without a heartbeat after which
+# a session stuck in 'processing' by a dead worker can be finalized again
+CHUNKED_UPLOAD_FINALIZE_WORKERS = config('CHUNKED_UPLOAD_FINALIZE_WORKERS', default=2, cast=int)
+CHUNKED_UPLOAD_PROCESSING_TIMEOUT = config('CHUNKED_UPLOAD_PROCESSING_TIMEOUT', default=300, cast=int)
+# Rows up to which a chunked upload also keeps its rows in Dataset.raw_data;
+# the analysis of larger datasets is aggregated from their EquipmentData rows
+RAW_DATA_MAX_ROWS = config('RAW_DATA_MAX_ROWS', default=100000, cast=int)
+
+# Multi-file uploads (datasets/upload_batch/): CSV files and ZIP archive members
+# per request, the largest CSV accepted (uncompressed, for ZIP members) and the
+# worker processes that parse and analyze them
+BATCH_UPLOAD_MAX_FILES = config('BATCH_UPLOAD_MAX_FILES', default=100, cast=int)
+BATCH_UPLOAD_MAX_FILE_SIZE = config('BATCH_UPLOAD_MAX_FILE_SIZE', default=5242880, cast=int)  # 5MB
+BATCH_UPLOAD_WORKERS = config('BATCH_UPLOAD_WORKERS', default=min(4, os.cpu_count() or 1), cast=int)
+# Seconds after which a batch starts no more files, reporting them as not
+# processed, to answer within the worker and proxy timeouts (0: no limit)
+BATCH_UPLOAD_TIME_LIMIT = config('BATCH_UPLOAD_TIME_LIMIT', default=20, cast=int)
+
+# File downloads (PDF reports, stored CSVs): 'python' streams them from the
+# worker (os.sendfile under gunicorn); 'x-sendfile' (Apache, lighttpd) and
+# 'x-accel-redirect' (nginx) hand them to the front web server
+FILE_SERVING_BACKEND = config('FILE_SERVING_BACKEND', default='python')
+# nginx 'internal' location serving MEDIA_ROOT, for x-accel-redirect
+FILE_SERVING_ACCEL_PREFIX = config('FILE_SERVING_ACCEL_PREFIX', default='/protected-media/')
 
 # Custom settings for dataset management
-MAX_STORED_DATASETS = 5  # Store last 5 uploaded datasets
+# Datasets kept per user; older ones are deleted on upload (0 keeps all of them)
+MAX_STORED_DATASETS = config('MAX_STORED_DATASETS', default=5, cast=int)
+# Cursor pages of datasets/ and datasets/history/; clients may ask for up to the maximum
+DATASET_PAGE_SIZE = config('DATASET_PAGE_SIZE', default=50, cast=int)
+MAX_DATASET_PAGE_SIZE = config('MAX_DATASET_PAGE_SIZE', default=500, cast=int)
+# Most datasets one call to datasets/batch/ may ask for
+MAX_BATCH_IDS = config('MAX_BATCH_IDS', default=50, cast=int)
+
+# Server-Sent Events (api/events/): streams poll the DatasetEvent table and end
+# after EVENT_STREAM_SECONDS, below gunicorn's 30s worker timeout, when clients
+# reconnect; the async stream (api/async/events/) holds no worker and runs longer
+EVENT_POLL_INTERVAL = config('EVENT_POLL_INTERVAL', default=1.0, cast=float)
+EVENT_STREAM_SECONDS = config('EVENT_STREAM_SECONDS', default=25, cast=int)
+EVENT_STREAM_ASYNC_SECONDS = config('EVENT_STREAM_ASYNC_SECONDS', default=300, cast=int)
+# Streams a process serves on threads (WSGI) at once; each holds one of the
+# GUNICORN_THREADS threads, so more get a 503 and plain requests keep the rest
+EVENT_STREAM_MAX_THREADS = config('EVENT_STREAM_MAX_THREADS', default=4, cast=int)
+# Seconds an EventSource ticket (api/events/ticket/) may take to open a stream
+EVENT_TICKET_SECONDS = config('EVENT_TICKET_SECONDS', default=60, cast=int)
+EVENT_RETENTION_HOURS = config('EVENT_RETENTION_HOURS', default=24, cast=int)
+# Seconds between purges of expired events by each process that publishes
+# them; 0 leaves it to a scheduled 'manage.py purge_events'
+EVENT_PURGE_INTERVAL = config('EVENT_PURGE_INTERVAL', default=600, cast=int)
+
+# Request profiling (opt-in): Server-Timing headers and structured log lines
+REQUEST_PROFILING_ENABLED = config('REQUEST_PROFILING_ENABLED', default=False, cast=bool)
+REQUEST_PROFILING_SAMPLE_RATE = config('REQUEST_PROFILING_SAMPLE_RATE', default=0.01, cast=float)
+REQUEST_PROFILING_TRACE_MEMORY = config('REQUEST_PROFILING_TRACE_MEMORY', default=False, cast=bool)
+
+# Prometheus metrics (set PROMETHEUS_MULTIPROC_DIR for multi-worker servers).
+# /metrics is served only with METRICS_AUTH_TOKEN set, to scrapers sending
+# it as a bearer token
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_AUTH_TOKEN = config('METRICS_AUTH_TOKEN', default='')
+
+# Logging
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'equipment.profiling': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
@@ -11,6 +11,8 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
+from equipment.views import metrics
+
 # Swagger/OpenAPI schema configuration
 schema_view = get_schema_view(
     openapi.Info(
@@ -31,6 +33,9 @@ urlpatterns = [
     # API routes
     path('api/', include('equipment.urls')),
     
+    # Prometheus metrics
+    path('metrics', metrics, name='metrics'),
+    
     # REST Framework authentication
     path('api-auth/', include('rest_framework.urls')),
     
@@ -4,7 +4,7 @@ Provides an interface for managing datasets and equipment data.
 """
 
 from django.contrib import admin
-from .models import Dataset, EquipmentData
+from .models import Dataset, DatasetEvent, EquipmentData, ImportedFile, UploadSession
 
 
 @admin.register(Dataset)
@@ -40,3 +40,31 @@ class EquipmentDataAdmin(admin.ModelAdmin):
             'fields': ('flowrate', 'pressure', 'temperature')
         }),
     )
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    """Admin interface for UploadSession model."""
+    list_display = ['filename', 'user', 'status', 'total_size', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['filename', 'user__username']
+    readonly_fields = ['id', 'created_at', 'dataset']
+
+
+
+@admin.register(DatasetEvent)
+class DatasetEventAdmin(admin.ModelAdmin):
+    """Admin interface for DatasetEvent model."""
+    list_display = ['event_type', 'user', 'dataset_id', 'created_at']
+    list_filter = ['event_type', 'created_at']
+    search_fields = ['user__username']
+    readonly_fields = ['created_at']
+
+
+@admin.register(ImportedFile)
+class ImportedFileAdmin(admin.ModelAdmin):
+    """Admin interface for ImportedFile model."""
+    list_display = ['path', 'source', 'user', 'dataset', 'imported_at']
+    list_filter = ['imported_at', 'user']
+    search_fields = ['path', 'source']
+    readonly_fields = ['imported_at']
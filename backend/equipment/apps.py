@@ -9,3 +9,10 @@ class EquipmentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'equipment'
     verbose_name = 'Chemical Equipment Data'
+    
+    def ready(self):
+        """Apply SQLite pragmas to every new database connection."""
+        from django.db.backends.signals import connection_created
+        from .db import apply_sqlite_pragmas
+        
+        connection_created.connect(apply_sqlite_pragmas)
@@ -0,0 +1,264 @@
+"""
+Async read endpoints for the Equipment application.
+
+Plain Django async views, mounted under /api/async/ next to the synchronous
+DRF API (DRF views cannot be async). Under an ASGI server such as uvicorn
+one process serves many slow clients at once: waiting on the database or
+on a client socket does not hold a worker. The responses match their DRF
+counterparts, including ?fields= shaping and the error format of
+custom_exception_handler.
+"""
+
+import asyncio
+import os
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from django.http import JsonResponse
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.request import Request
+
+from .events import (
+    aevent_stream, open_thread_stream, parse_last_event_id, request_token, stream_response, ticket_user_id,
+    too_many_streams_response,
+)
+from .files import serve_file
+from .models import Dataset
+from .pagination import DatasetCursorPagination
+from .profiling import profile_phase
+from .utils import get_dataset_analysis, get_pdf_report
+from .views import SparseFieldsMixin
+
+FILE_CHUNK_SIZE = 64 * 1024
+
+
+def error_response(status_code: int, detail: str) -> JsonResponse:
+    """Error body in the format produced by custom_exception_handler."""
+    return JsonResponse(
+        {'success': False, 'errors': [f"detail: {detail}"], 'status_code': status_code},
+        status=status_code
+    )
+
+
+def validation_error_response(exc: ValidationError) -> JsonResponse:
+    """400 for a DRF ValidationError, in the format produced by custom_exception_handler."""
+    errors = [f"{field}: {error}" for field, messages in exc.detail.items() for error in messages]
+    return JsonResponse({'success': False, 'errors': errors, 'status_code': 400}, status=400)
+
+
+def in_executor(func):
+    """
+    Run ``func`` on an executor thread rather than the event loop's one,
+    for CPU work that may query the database. No request signals reach
+    those threads, so their connections are closed before and after here,
+    as Django does around each request.
+    """
+    @wraps(func)
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)
+
+
+class FieldSelection(SparseFieldsMixin):
+    """``?fields=``, ``?exclude=`` and ``?expand=`` of the DRF view ``action``."""
+    
+    def __init__(self, request, action):
+        self.request = Request(request)
+        self.action = action
+    
+    def get_serializer_context(self):
+        return {'request': self.request}
+
+
+async def authenticate(request, allow_ticket: bool = False):
+    """
+    Return the active user of an 'Authorization: Token <key>' header or,
+    with ``allow_ticket``, of an event stream ticket; otherwise None.
+    """
+    key = request_token(request)
+    if key is None:
+        user_id = ticket_user_id(request) if allow_ticket else None
+        if user_id is None:
+            return None
+        user = await User.objects.filter(pk=user_id).afirst()
+        return user if user is not None and user.is_active else None
+    try:
+        token = await Token.objects.select_related('user').aget(key=key)
+    except Token.DoesNotExist:
+        return None
+    return token.user if token.user.is_active else None
+
+
+def async_api_view(require_auth: bool = True, allow_ticket: bool = False):
+    """
+    Allow only GET/HEAD and, unless ``require_auth`` is False, a valid token
+    (or, with ``allow_ticket``, an event stream ticket). The authenticated
+    user is set as ``request.user``.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return error_response(405, f'Method "{request.method}" not allowed.')
+            if require_auth:
+                with profile_phase('auth'):
+                    user = await authenticate(request, allow_ticket)
+                if user is None:
+                    response = error_response(401, 'Authentication credentials were not provided.')
+                    response['WWW-Authenticate'] = 'Token'
+                    return response
+                request.user = user
+            return await view(request, *args, **kwargs)
+        # Token auth only, like the DRF views; django's csrf_exempt would wrap
+        # the coroutine function in a sync one on Django 4.2
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
+
+
+async def get_dataset(request, pk, queryset):
+    """Fetch one of the user's datasets, or None."""
+    try:
+        return await queryset.aget(pk=pk, user=request.user)
+    except Dataset.DoesNotExist:
+        return None
+
+
+async def serialize(serializer):
+    """Serializer data, with any prefetched rows; CPU work, so off the event loop."""
+    return await in_executor(lambda: serializer.data)()
+
+
+@async_api_view(require_auth=False)
+async def health_check(request):
+    """Simple health check endpoint."""
+    return JsonResponse({
+        'status': 'healthy',
+        'message': 'Chemical Equipment Visualizer API is running'
+    })
+
+
+@async_api_view()
+async def dataset_history(request):
+    """Get upload history, newest first, one cursor page at a time."""
+    selection = FieldSelection(request, 'history')
+    try:
+        queryset = selection.shape_queryset(Dataset.objects.filter(user=request.user))
+    except ValidationError as e:
+        return validation_error_response(e)
+    # The same keyset pagination as the DRF endpoint; it reads the cursor
+    # from a DRF request and queries synchronously
+    paginator = DatasetCursorPagination()
+    try:
+        datasets = await sync_to_async(paginator.paginate_queryset)(queryset, selection.request)
+    except NotFound as e:
+        return error_response(404, str(e.detail))
+    with profile_phase('serialize'):
+        data = await serialize(selection.get_serializer(datasets, many=True))
+    return JsonResponse({
+        'success': True,
+        'count': len(data),
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link(),
+        'data': data
+    })
+
+
+@async_api_view()
+async def dataset_detail(request, pk):
+    """Get a dataset with all of its equipment rows."""
+    selection = FieldSelection(request, 'retrieve')
+    try:
+        queryset = selection.shape_queryset(Dataset.objects.all())
+    except ValidationError as e:
+        return validation_error_response(e)
+    dataset = await get_dataset(request, pk, queryset)
+    if dataset is None:
+        return error_response(404, 'Not found.')
+    with profile_phase('serialize'):
+        data = await serialize(selection.get_serializer(dataset))
+    return JsonResponse(data)
+
+
+@async_api_view()
+async def dataset_summary(request, pk):
+    """Get detailed summary and analysis for a specific dataset."""
+    selection = FieldSelection(request, 'summary')
+    try:
+        queryset = selection.shape_queryset(Dataset.objects.all())
+    except ValidationError as e:
+        return validation_error_response(e)
+    dataset = await get_dataset(request, pk, queryset)
+    if dataset is None:
+        return error_response(404, 'Not found.')
+    with profile_phase('serialize'):
+        dataset_data = await serialize(selection.get_serializer(dataset))
+    response_data = {'success': True, 'dataset': dataset_data}
+
+    if selection.wants_analysis():
+        with profile_phase('analyze'):
+            response_data['analysis'] = await in_executor(get_dataset_analysis)(dataset)
+    return JsonResponse(response_data)
+
+
+async def read_file_chunks(path: str, start: int = 0, length: int = None,
+                           chunk_size: int = FILE_CHUNK_SIZE):
+    """Yield ``length`` bytes of a file from ``start`` in chunks, reading each one on a worker thread."""
+    f = await asyncio.to_thread(open, path, 'rb')
+    try:
+        await asyncio.to_thread(f.seek, start)
+        remaining = length if length is not None else float('inf')
+        while remaining > 0:
+            chunk = await asyncio.to_thread(f.read, int(min(chunk_size, remaining)))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        await asyncio.to_thread(f.close)
+
+
+@async_api_view()
+async def dataset_pdf(request, pk):
+    """Generate and download a PDF report for a specific dataset."""
+    dataset = await get_dataset(request, pk, Dataset.objects.select_related('user').defer('raw_data'))
+    if dataset is None:
+        return error_response(404, 'Not found.')
+
+    with profile_phase('pdf'):
+        pdf_path = await in_executor(get_pdf_report)(dataset)
+    if pdf_path is None:
+        return JsonResponse(
+            {'success': False, 'error': 'Failed to generate PDF report'},
+            status=500
+        )
+
+    # Django buffers sync iterators under ASGI, so the body is an async generator
+    return serve_file(request, pdf_path, os.path.basename(pdf_path),
+                      content_type='application/pdf', stream=read_file_chunks)
+
+
+@async_api_view(allow_ticket=True)
+async def dataset_events(request):
+    """
+    Server-Sent Events stream of the user's dataset and upload events.
+    
+    Served by a WSGI server, the response is written by a worker thread
+    whatever the view, and Django would buffer an async stream whole: the
+    sync stream is sent instead, within EVENT_STREAM_MAX_THREADS.
+    """
+    last_id = parse_last_event_id(request)
+    if not isinstance(request, ASGIRequest):
+        stream = open_thread_stream(request.user.id, last_id)
+        if stream is None:
+            return too_many_streams_response()
+        return stream_response(stream)
+    return stream_response(aevent_stream(request.user.id, last_id))
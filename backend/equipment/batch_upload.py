@@ -0,0 +1,204 @@
+"""
+Multi-file uploads: several CSV files, or ZIP archives of them, in one request.
+
+Each CSV is copied to a temporary directory block by block (a ZIP member is
+decompressed as it is read, never whole into memory), then parsed and
+analyzed in a bounded pool of worker processes. The request's process
+stores the results in upload order, with the same store_dataset() as a
+single upload, while the workers go on with the next files. History is
+pruned once, after the whole batch is stored.
+
+The request stays synchronous, so files are no longer started once it has
+run for BATCH_UPLOAD_TIME_LIMIT seconds: they are reported as not processed,
+to be sent again, before a worker or proxy timeout cuts the response off.
+"""
+
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.files import File
+
+from .db import serialized_write
+from .ingest import prune_history, store_dataset
+
+CSV_SUFFIXES = ('.csv', '.csv.gz')
+# Read size when copying uploads and ZIP members to disk
+BLOCK_SIZE = 64 * 1024
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class BatchError(Exception):
+    """Raised when a batch upload cannot be processed at all."""
+
+
+class FileTooLarge(Exception):
+    """A file is larger than BATCH_UPLOAD_MAX_FILE_SIZE."""
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Return the worker pool, started on first use and shared by all requests."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Workers are spawned: forking a threaded server copies its locks
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.BATCH_UPLOAD_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executor
+
+
+def submit(path: str):
+    """Parse and analyze the file at ``path`` in the pool; return the future."""
+    from equipment_analysis import process_csv_path
+
+    executor = get_executor()
+    try:
+        return executor.submit(process_csv_path, path, settings.CSV_MAX_DECOMPRESSED_SIZE)
+    except BrokenProcessPool:
+        # A worker died in an earlier batch; start a new pool
+        global _executor
+        with _executor_lock:
+            if _executor is executor:
+                _executor = None
+        return get_executor().submit(process_csv_path, path, settings.CSV_MAX_DECOMPRESSED_SIZE)
+
+
+def too_large_message() -> str:
+    return f"File size must not exceed {settings.BATCH_UPLOAD_MAX_FILE_SIZE // (1024 * 1024)}MB."
+
+
+def list_files(uploaded_files, stack: ExitStack):
+    """
+    Return (filename, open function, error) for every file of the request,
+    with the CSV members of ZIP archives in place of the archives. Archives
+    stay open until ``stack`` is closed.
+    """
+    files = []
+    for uploaded in uploaded_files:
+        name = os.path.basename(uploaded.name)
+        if name.lower().endswith('.zip'):
+            try:
+                # Reads the central directory only; the archive stays on disk
+                archive = stack.enter_context(zipfile.ZipFile(uploaded))
+            except (zipfile.BadZipFile, OSError):
+                files.append((name, None, "Not a valid ZIP archive."))
+                continue
+            for info in archive.infolist():
+                member = os.path.basename(info.filename)
+                if info.is_dir() or info.filename.startswith('__MACOSX/') or member.startswith('.'):
+                    continue
+                if not member.endswith(CSV_SUFFIXES):
+                    files.append((member, None, "Only CSV files are allowed."))
+                elif info.file_size > settings.BATCH_UPLOAD_MAX_FILE_SIZE:
+                    files.append((member, None, too_large_message()))
+                else:
+                    files.append((member, lambda archive=archive, info=info: archive.open(info), None))
+        elif not name.endswith(CSV_SUFFIXES):
+            files.append((name, None, "Only CSV files and ZIP archives are allowed."))
+        elif uploaded.size > settings.BATCH_UPLOAD_MAX_FILE_SIZE:
+            files.append((name, None, too_large_message()))
+        else:
+            files.append((name, uploaded.open, None))
+    return files
+
+
+def spool(source, path: str, limit: int) -> None:
+    """Copy the file object ``source`` to ``path``; raise FileTooLarge past ``limit`` bytes."""
+    written = 0
+    with open(path, 'wb') as out:
+        while block := source.read(BLOCK_SIZE):
+            written += len(block)
+            if written > limit:
+                raise FileTooLarge
+            out.write(block)
+
+
+def store_result(user, filename: str, path, future, error):
+    """Wait for a file's analysis and store it; return its result."""
+    if future is not None:
+        try:
+            processed, error = future.result()
+        except BrokenProcessPool:
+            error = "The worker processing this file stopped unexpectedly."
+        except Exception as e:
+            error = f"Unexpected error processing CSV: {str(e)}"
+    if error:
+        return {'filename': filename, 'error': error}
+
+    with open(path, 'rb') as f:
+        dataset = store_dataset(user, File(f, name=filename), processed['analysis'],
+                                processed['raw_data'], processed['rows'], prune=False)
+    os.remove(path)
+    return {'filename': filename, 'dataset': dataset}
+
+
+def ingest_batch(user, uploaded_files):
+    """
+    Store every CSV of ``uploaded_files`` as a dataset of ``user``.
+
+    Returns one result per CSV in upload order, ZIP members in archive
+    order: {'filename', 'dataset'} or {'filename', 'error'}. Datasets of the
+    batch that history pruning deleted again, when it holds more files than
+    MAX_STORED_DATASETS, have an error and ``'pruned': True`` instead.
+
+    Raises:
+        BatchError: If there are more than BATCH_UPLOAD_MAX_FILES files
+    """
+    with ExitStack() as stack:
+        files = list_files(uploaded_files, stack)
+        if len(files) > settings.BATCH_UPLOAD_MAX_FILES:
+            raise BatchError(f"At most {settings.BATCH_UPLOAD_MAX_FILES} files may be uploaded at once.")
+        workdir = stack.enter_context(tempfile.TemporaryDirectory(prefix='batch_upload_'))
+
+        # Files copied ahead of the one being stored: enough to keep every
+        # worker busy, not the whole batch on disk at once
+        window = 2 * settings.BATCH_UPLOAD_WORKERS
+        deadline = time.monotonic() + settings.BATCH_UPLOAD_TIME_LIMIT
+        pending = deque()
+        results = []
+        for index, (filename, open_file, error) in enumerate(files):
+            path = future = None
+            if error is None and settings.BATCH_UPLOAD_TIME_LIMIT and time.monotonic() > deadline:
+                error = (f"Not processed: the batch ran for more than {settings.BATCH_UPLOAD_TIME_LIMIT}s. "
+                         "Upload this file again.")
+            if error is None:
+                # Keep the suffix: the parser decompresses .gz files
+                suffix = '.csv.gz' if filename.endswith('.gz') else '.csv'
+                path = os.path.join(workdir, f'{index}{suffix}')
+                try:
+                    with open_file() as source:
+                        spool(source, path, settings.BATCH_UPLOAD_MAX_FILE_SIZE)
+                    future = submit(path)
+                except FileTooLarge:
+                    error = too_large_message()
+                except (zipfile.BadZipFile, RuntimeError, NotImplementedError, EOFError) as e:
+                    # Corrupt, encrypted or unsupported member
+                    error = f"Could not extract file from the archive: {str(e)}"
+            pending.append((filename, path, future, error))
+            while len(pending) > window:
+                results.append(store_result(user, *pending.popleft()))
+        while pending:
+            results.append(store_result(user, *pending.popleft()))
+
+    if settings.MAX_STORED_DATASETS and any('dataset' in result for result in results):
+        with serialized_write():
+            pruned = set(prune_history(user))
+        for result in results:
+            if 'dataset' in result and result['dataset'].id in pruned:
+                del result['dataset']
+                result['pruned'] = True
+                result['error'] = (f"Stored, then removed: only the newest {settings.MAX_STORED_DATASETS} "
+                                   "datasets are kept (MAX_STORED_DATASETS).")
+    return results
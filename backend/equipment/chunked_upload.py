@@ -0,0 +1,265 @@
+"""
+On-disk storage for resumable chunked uploads.
+
+Each UploadSession owns a directory under CHUNKED_UPLOAD_DIR holding the
+target file, pre-sized to the full upload, and one marker per received
+chunk. Each chunk is received into a temporary file and, once its checksum
+matches, copied to its offset in the target file, so nothing is assembled in
+memory and finalizing needs no copy.
+
+Finalized sessions are ingested on a pool of background threads. While one
+is processed, its thread touches a heartbeat file in the session directory;
+a session left in 'processing' by a worker that died can be finalized again
+once the heartbeat is older than CHUNKED_UPLOAD_PROCESSING_TIMEOUT.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+READ_SIZE = 64 * 1024
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class ChunkError(Exception):
+    """Raised when a chunk does not match its expected length or checksum."""
+
+
+class UploadExpired(APIException):
+    """The upload session outlived CHUNKED_UPLOAD_EXPIRY_HOURS and was removed."""
+    status_code = status.HTTP_410_GONE
+    default_detail = 'Upload session has expired.'
+    default_code = 'upload_expired'
+
+
+def session_dir(session) -> Path:
+    return Path(settings.CHUNKED_UPLOAD_DIR) / str(session.id)
+
+
+def data_path(session) -> Path:
+    return session_dir(session) / 'data'
+
+
+def heartbeat_path(session) -> Path:
+    return session_dir(session) / 'processing'
+
+
+def create_storage(session) -> None:
+    """Create the session directory and a sparse target file of the full size."""
+    (session_dir(session) / 'chunks').mkdir(parents=True, exist_ok=True)
+    with open(data_path(session), 'wb') as f:
+        f.truncate(session.total_size)
+
+
+def delete_storage(session) -> None:
+    """Remove the session's files and any dataset a dead process left staged for it."""
+    from .ingest import delete_staged
+
+    shutil.rmtree(session_dir(session), ignore_errors=True)
+    if session.dataset_id:
+        delete_staged(session.dataset_id)
+
+
+def write_chunk(session, index: int, stream, sha256: str) -> None:
+    """
+    Receive one chunk from ``stream`` and, once its checksum matches, copy
+    it into place and record it as received.
+
+    The body is received into a temporary file first: a failed or truncated
+    re-send of a chunk never touches the bytes already stored for it.
+
+    Args:
+        session: UploadSession the chunk belongs to
+        index: Zero-based chunk number
+        stream: File-like object positioned at the chunk body
+        sha256: Expected hex digest of the chunk
+
+    Raises:
+        ChunkError: If the body length or checksum does not match
+    """
+    expected = session.chunk_length(index)
+    digest = hashlib.sha256()
+    received = 0
+    with tempfile.TemporaryFile(dir=session_dir(session)) as part:
+        while received < expected:
+            block = stream.read(min(READ_SIZE, expected - received))
+            if not block:
+                break
+            digest.update(block)
+            part.write(block)
+            received += len(block)
+        # Anything beyond the expected length belongs to no chunk
+        if received == expected and stream.read(1):
+            received += 1
+
+        if received != expected:
+            raise ChunkError(f"Chunk {index} must be {expected} bytes, received {received}")
+        if digest.hexdigest() != sha256.lower():
+            raise ChunkError(f"Checksum mismatch for chunk {index}")
+
+        # Unrecorded while its bytes are replaced, in case the copy is cut short
+        marker = session_dir(session) / 'chunks' / str(index)
+        marker.unlink(missing_ok=True)
+        part.seek(0)
+        with open(data_path(session), 'r+b') as f:
+            f.seek(index * session.chunk_size)
+            shutil.copyfileobj(part, f, READ_SIZE)
+
+    # Publish the marker atomically so a crash never leaves a half-written one
+    tmp = marker.with_suffix('.tmp')
+    tmp.write_text(digest.hexdigest())
+    os.replace(tmp, marker)
+
+
+def received_chunks(session) -> list:
+    """Return the sorted numbers of the chunks received so far."""
+    chunks_dir = session_dir(session) / 'chunks'
+    if not chunks_dir.exists():
+        return []
+    return sorted(int(name) for name in os.listdir(chunks_dir) if name.isdigit())
+
+
+def file_sha256(session) -> str:
+    """Hex digest of the assembled file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(data_path(session), 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def touch_heartbeat(session) -> None:
+    heartbeat_path(session).touch()
+
+
+def processing_stalled(session) -> bool:
+    """Return True if nothing has processed the session for CHUNKED_UPLOAD_PROCESSING_TIMEOUT seconds."""
+    try:
+        age = time.time() - heartbeat_path(session).stat().st_mtime
+    except FileNotFoundError:
+        return True
+    return age > settings.CHUNKED_UPLOAD_PROCESSING_TIMEOUT
+
+
+@contextmanager
+def heartbeat(session):
+    """Touch the session's heartbeat file from a helper thread until the block exits."""
+    stop = threading.Event()
+    interval = max(1, settings.CHUNKED_UPLOAD_PROCESSING_TIMEOUT / 5)
+
+    def beat():
+        while not stop.wait(interval):
+            try:
+                touch_heartbeat(session)
+            except FileNotFoundError:
+                return
+
+    thread = threading.Thread(target=beat, name=f'heartbeat-{session.id}', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the finalize thread pool, started on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.CHUNKED_UPLOAD_FINALIZE_WORKERS,
+                thread_name_prefix='finalize'
+            )
+        return _executor
+
+
+def start_processing(session) -> None:
+    """
+    Ingest a session claimed for processing: on a finalize thread once the
+    claim commits, or right away if CHUNKED_UPLOAD_FINALIZE_WORKERS is 0.
+    """
+    if not settings.CHUNKED_UPLOAD_FINALIZE_WORKERS:
+        process_session(session.pk)
+        return
+    transaction.on_commit(lambda: get_executor().submit(_process_in_thread, session.pk))
+
+
+def _process_in_thread(session_id) -> None:
+    try:
+        process_session(session_id)
+    finally:
+        # Pool threads outlive the request cycle that would close it
+        connection.close()
+
+
+def process_session(session_id) -> None:
+    """
+    Verify and ingest the assembled file of a session in 'processing'.
+
+    The session ends 'complete' with its dataset, or 'failed' with an error
+    for a file that can never be ingested. A checksum mismatch or an
+    unexpected error sets it back to 'active' with the error, and keeps its
+    chunks so it can be repaired or finalized again.
+    """
+    from .events import publish
+    from .ingest import IngestError, delete_staged, ingest_csv_path
+    from .models import DatasetEvent, UploadSession
+
+    sessions = UploadSession.objects.filter(pk=session_id, status=UploadSession.STATUS_PROCESSING)
+    session = sessions.select_related('user').first()
+    if session is None:
+        return
+
+    def stop(new_status, error):
+        sessions.update(status=new_status, error=error)
+        if new_status == UploadSession.STATUS_FAILED:
+            delete_storage(session)
+        publish(
+            session.user, DatasetEvent.TYPE_UPLOAD_FAILED,
+            upload_id=str(session.id), filename=session.filename, error=error
+        )
+
+    if session.dataset_id:
+        # Staged by an earlier attempt whose process died
+        delete_staged(session.dataset_id)
+    try:
+        with heartbeat(session):
+            if session.sha256 and file_sha256(session) != session.sha256:
+                stop(UploadSession.STATUS_ACTIVE, 'Checksum mismatch for the assembled file')
+                return
+            dataset, _ = ingest_csv_path(
+                session.user, str(data_path(session)), session.filename,
+                on_staged=lambda staged: sessions.update(dataset=staged)
+            )
+    except IngestError as e:
+        stop(UploadSession.STATUS_FAILED, str(e))
+        return
+    except Exception:
+        logger.exception('Processing upload %s failed', session.id)
+        # Finalizing again can only help while the assembled file is still there
+        if data_path(session).exists():
+            stop(UploadSession.STATUS_ACTIVE, 'Unexpected error processing the upload; finalize it again')
+        else:
+            stop(UploadSession.STATUS_FAILED, 'Unexpected error processing the upload')
+        return
+
+    sessions.update(status=UploadSession.STATUS_COMPLETE, dataset=dataset, error='')
+    delete_storage(session)
@@ -0,0 +1,81 @@
+"""
+Database helpers for the Equipment application.
+Applies SQLite pragmas on connection and serializes upload writes so that
+concurrent uploads never contend for the SQLite write lock.
+"""
+
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections, transaction
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads within one process are serialized
+    fcntl = None
+
+
+_writer_lock = threading.RLock()
+_writer_state = threading.local()
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """
+    Apply SQLITE_PRAGMAS to every new SQLite connection.
+    Connected to the connection_created signal in EquipmentConfig.ready().
+    """
+    if connection.vendor != 'sqlite':
+        return
+
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+    if not pragmas:
+        return
+
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def _lock_file_path(using: str):
+    """Return the host-wide writer lock file for a SQLite database, if any."""
+    connection = connections[using]
+    if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+        return None
+    return f"{connection.settings_dict['NAME']}.write-lock"
+
+
+@contextmanager
+def serialized_write(using: str = 'default'):
+    """
+    Run a block of writes in a transaction, one writer at a time.
+
+    With SERIALIZE_DB_WRITES enabled, writers queue on a lock shared by all
+    threads of the process and, for file-based SQLite databases, by all
+    worker processes on the host (via an flock'd lock file). With WAL
+    journaling, readers keep reading the last committed snapshot while a
+    writer holds the lock. The lock is re-entrant within a thread.
+    """
+    if not getattr(settings, 'SERIALIZE_DB_WRITES', False):
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    with _writer_lock:
+        depth = getattr(_writer_state, 'depth', 0)
+        lock_file = None
+        if depth == 0 and fcntl is not None:
+            path = _lock_file_path(using)
+            if path:
+                lock_file = open(path, 'a')
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        _writer_state.depth = depth + 1
+        try:
+            with transaction.atomic(using=using):
+                yield
+        finally:
+            _writer_state.depth = depth
+            if lock_file is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
@@ -0,0 +1,263 @@
+"""
+Per-user dataset events, delivered to clients as Server-Sent Events.
+
+Events are rows in the DatasetEvent table, so a stream served by one worker
+sees the events published by every other worker: it polls for rows newer
+than the last one it sent. The row id is the SSE event id, so a reconnecting
+EventSource resumes from its Last-Event-ID header without missing events.
+That needs a user's events to commit in id order; publish() ensures it.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections, transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from .db import serialized_write
+from .models import DatasetEvent
+
+# Events read per query; a stream catching up keeps reading without sleeping
+BATCH_SIZE = 100
+# Comment lines keep idle connections open through proxies
+KEEPALIVE_SECONDS = 15
+# Delay before an EventSource reconnects after a stream ends
+RETRY_MILLISECONDS = 1000
+# First key of the PostgreSQL advisory locks ordering each user's events
+EVENT_LOCK_NAMESPACE = 0x45564E54
+# Stream tickets are valid for event streams only
+TICKET_SALT = 'equipment.events.ticket'
+
+_last_purge = None
+_purge_lock = threading.Lock()
+# Streams open on threads of this process, at most EVENT_STREAM_MAX_THREADS
+_thread_streams = 0
+_thread_streams_lock = threading.Lock()
+
+
+def publish(user, event_type: str, dataset_id=None, **data) -> DatasetEvent:
+    """
+    Record an event for ``user``. Joins the caller's serialized_write()
+    block, if any, so the event commits together with the change it reports.
+    """
+    with serialized_write():
+        _lock_user_events(user.id)
+        event = DatasetEvent.objects.create(
+            user=user, event_type=event_type, dataset_id=dataset_id, data=data
+        )
+    _schedule_purge()
+    return event
+
+
+def _lock_user_events(user_id: int, using: str = 'default') -> None:
+    """
+    Wait until no other open transaction has published an event for the user.
+
+    Ids come from a sequence at insert time but rows appear at commit, so
+    an event could commit after one with a higher id, which a stream has
+    already moved past. On PostgreSQL an advisory lock, held until commit,
+    makes a user's events commit in id order. SQLite holds its write lock
+    from the first write to the commit, which already does.
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s, %s)', [EVENT_LOCK_NAMESPACE, user_id])
+
+
+def purge_expired_events() -> int:
+    """Delete events older than EVENT_RETENTION_HOURS; return how many."""
+    cutoff = timezone.now() - timedelta(hours=settings.EVENT_RETENTION_HOURS)
+    with serialized_write():
+        deleted, _ = DatasetEvent.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
+
+
+def _schedule_purge() -> None:
+    """Purge expired events after commit, at most once per EVENT_PURGE_INTERVAL in this process."""
+    global _last_purge
+    if not settings.EVENT_PURGE_INTERVAL:
+        return
+    now = time.monotonic()
+    with _purge_lock:
+        if _last_purge is not None and now - _last_purge < settings.EVENT_PURGE_INTERVAL:
+            return
+        _last_purge = now
+    transaction.on_commit(purge_expired_events)
+
+
+def format_event(event: DatasetEvent) -> str:
+    payload = {
+        'type': event.event_type,
+        'dataset_id': event.dataset_id,
+        'created_at': event.created_at.isoformat(),
+        **event.data,
+    }
+    return f"id: {event.id}\nevent: {event.event_type}\ndata: {json.dumps(payload)}\n\n"
+
+
+def request_token(request):
+    """Token key from an 'Authorization: Token <key>' header, or None."""
+    auth = request.headers.get('Authorization', '').split()
+    if len(auth) == 2 and auth[0].lower() == 'token':
+        return auth[1]
+    return None
+
+
+def issue_ticket(user) -> str:
+    """
+    Signed ticket opening ``user``'s event stream for EVENT_TICKET_SECONDS.
+    EventSource cannot send an Authorization header, and the token itself
+    must not end up in a URL, where access logs and proxies keep it.
+    """
+    return signing.dumps(user.id, salt=TICKET_SALT)
+
+
+def ticket_user_id(request):
+    """User id of a valid ``ticket`` query parameter, or None."""
+    ticket = request.GET.get('ticket')
+    if not ticket:
+        return None
+    try:
+        return signing.loads(ticket, salt=TICKET_SALT, max_age=settings.EVENT_TICKET_SECONDS)
+    except signing.BadSignature:
+        return None
+
+
+def parse_last_event_id(request):
+    """Event id to resume after: the Last-Event-ID header or ?last_event_id=."""
+    value = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _queryset(user_id, last_id):
+    return DatasetEvent.objects.filter(user_id=user_id, id__gt=last_id).order_by('id')[:BATCH_SIZE]
+
+
+def _latest_id_queryset(user_id):
+    return DatasetEvent.objects.filter(user_id=user_id).order_by('-id').values_list('id', flat=True)
+
+
+def event_stream(user_id: int, last_id=None, duration: float = None):
+    """
+    Yield SSE messages for ``user_id`` until ``duration`` seconds have
+    passed. Without ``last_id`` only events published from now on are sent.
+    """
+    duration = settings.EVENT_STREAM_SECONDS if duration is None else duration
+    if last_id is None:
+        last_id = _latest_id_queryset(user_id).first() or 0
+    deadline = time.monotonic() + duration
+    keepalive_at = time.monotonic() + KEEPALIVE_SECONDS
+    # Sets the client's last event id even if no event follows before the stream ends
+    yield f"retry: {RETRY_MILLISECONDS}\nid: {last_id}\n\n"
+
+    while True:
+        events = list(_queryset(user_id, last_id))
+        for event in events:
+            last_id = event.id
+            yield format_event(event)
+        if len(events) == BATCH_SIZE:
+            continue
+        now = time.monotonic()
+        if now >= deadline:
+            return
+        if events:
+            keepalive_at = now + KEEPALIVE_SECONDS
+        elif now >= keepalive_at:
+            keepalive_at = now + KEEPALIVE_SECONDS
+            yield ": keep-alive\n\n"
+        time.sleep(min(settings.EVENT_POLL_INTERVAL, deadline - now))
+
+
+class ThreadStream:
+    """
+    An event_stream served on a WSGI server thread. It holds one of the
+    process's EVENT_STREAM_MAX_THREADS slots until the server closes it.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._closed = False
+
+    def __iter__(self):
+        return self._stream
+
+    def close(self):
+        global _thread_streams
+        if self._closed:
+            return
+        self._closed = True
+        self._stream.close()
+        with _thread_streams_lock:
+            _thread_streams -= 1
+
+
+def open_thread_stream(user_id: int, last_id=None):
+    """
+    Return a ThreadStream of event_stream, or None when this process already
+    serves EVENT_STREAM_MAX_THREADS streams: each holds a thread that plain
+    API requests need.
+    """
+    global _thread_streams
+    with _thread_streams_lock:
+        if _thread_streams >= settings.EVENT_STREAM_MAX_THREADS:
+            return None
+        _thread_streams += 1
+    return ThreadStream(event_stream(user_id, last_id))
+
+
+def stream_response(stream) -> StreamingHttpResponse:
+    """SSE response of ``stream``, unbuffered by proxies."""
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def too_many_streams_response() -> JsonResponse:
+    """503 for a stream above EVENT_STREAM_MAX_THREADS, in the API's error format."""
+    response = JsonResponse(
+        {'success': False, 'errors': ['detail: Too many open event streams, try again later.'],
+         'status_code': 503},
+        status=503
+    )
+    # A slot frees up when a stream ends
+    response['Retry-After'] = str(settings.EVENT_STREAM_SECONDS)
+    return response
+
+
+async def aevent_stream(user_id: int, last_id=None, duration: float = None):
+    """Async version of event_stream, for the ASGI endpoint."""
+    duration = settings.EVENT_STREAM_ASYNC_SECONDS if duration is None else duration
+    if last_id is None:
+        last_id = await _latest_id_queryset(user_id).afirst() or 0
+    deadline = time.monotonic() + duration
+    keepalive_at = time.monotonic() + KEEPALIVE_SECONDS
+    # Sets the client's last event id even if no event follows before the stream ends
+    yield f"retry: {RETRY_MILLISECONDS}\nid: {last_id}\n\n"
+
+    while True:
+        events = [event async for event in _queryset(user_id, last_id)]
+        for event in events:
+            last_id = event.id
+            yield format_event(event)
+        if len(events) == BATCH_SIZE:
+            continue
+        now = time.monotonic()
+        if now >= deadline:
+            return
+        if events:
+            keepalive_at = now + KEEPALIVE_SECONDS
+        elif now >= keepalive_at:
+            keepalive_at = now + KEEPALIVE_SECONDS
+            yield ": keep-alive\n\n"
+        await asyncio.sleep(min(settings.EVENT_POLL_INTERVAL, deadline - now))
@@ -0,0 +1,132 @@
+"""
+Streaming exports of the equipment rows of a dataset.
+
+Rows are read with QuerySet.iterator(), through a server-side cursor where
+the database has one, and encoded chunk by chunk as they arrive. An export
+holds at most one chunk (one row group for Parquet) in memory whatever the
+size of the dataset, and the response starts before the last row is read.
+"""
+
+import csv
+import io
+import json
+from itertools import islice
+
+from .models import EquipmentData
+
+# Rows fetched from the database and encoded per chunk
+CHUNK_SIZE = 2000
+# Rows per Parquet row group; a group is encoded once it is complete
+PARQUET_ROW_GROUP_SIZE = 10000
+
+COLUMNS = ['equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
+# CSV exports use the upload headers, so an export can be uploaded again
+CSV_HEADER = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+
+
+class ExportUnavailable(Exception):
+    """The format needs an optional library that is not installed."""
+
+
+def iter_rows(dataset, chunk_size: int = CHUNK_SIZE):
+    """Yield the rows of a dataset as tuples of COLUMNS, in upload order."""
+    return (
+        EquipmentData.objects.filter(dataset=dataset).order_by('id')
+        .values_list(*COLUMNS).iterator(chunk_size=chunk_size)
+    )
+
+
+def batched(rows, size: int):
+    """Yield lists of up to ``size`` rows."""
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def stream_csv(dataset):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    # The header goes out before the first query
+    yield buffer.getvalue().encode()
+    for batch in batched(iter_rows(dataset), CHUNK_SIZE):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+
+
+# json.dumps() with arguments builds a new encoder on every call
+_encode_json = json.JSONEncoder(separators=(',', ':')).encode
+
+
+def stream_ndjson(dataset):
+    for batch in batched(iter_rows(dataset), CHUNK_SIZE):
+        yield ''.join(_encode_json(dict(zip(COLUMNS, row))) + '\n' for row in batch).encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that keeps what is written until it is drained."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_parquet(dataset):
+    """
+    Return an iterator of Parquet file bytes, one row group at a time.
+    pyarrow is optional and imported here, before the response starts.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportUnavailable('Parquet export requires pyarrow on the server')
+
+    schema = pa.schema([
+        ('equipment_name', pa.string()),
+        ('equipment_type', pa.string()),
+        ('flowrate', pa.float64()),
+        ('pressure', pa.float64()),
+        ('temperature', pa.float64()),
+    ])
+
+    def chunks():
+        sink = _ChunkSink()
+        with pq.ParquetWriter(sink, schema, compression='snappy') as writer:
+            # The magic bytes, written on open, go out before the first query
+            yield sink.drain()
+            for batch in batched(iter_rows(dataset), PARQUET_ROW_GROUP_SIZE):
+                columns = [list(column) for column in zip(*batch)]
+                writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+                yield sink.drain()
+        # Closing the writer adds the footer
+        yield sink.drain()
+
+    return chunks()
+
+
+# format: (encoder, content type, file extension)
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv', 'csv'),
+    'ndjson': (stream_ndjson, 'application/x-ndjson', 'ndjson'),
+    'parquet': (stream_parquet, 'application/vnd.apache.parquet', 'parquet'),
+}
@@ -0,0 +1,174 @@
+"""
+File downloads for the Equipment application.
+
+serve_file() answers a GET or HEAD for a file on disk. It sends ETag and
+Last-Modified validators, answers If-None-Match/If-Modified-Since with 304
+and If-Match/If-Unmodified-Since with 412, and honours a single byte range
+(Range, with If-Range), so an interrupted download resumes where it stopped.
+
+FILE_SERVING_BACKEND chooses who sends the bytes:
+
+* 'python' (default): the worker streams the file. Under gunicorn the open
+  file goes to os.sendfile(), so the kernel copies it to the socket.
+* 'x-sendfile' (Apache mod_xsendfile, lighttpd) and 'x-accel-redirect'
+  (nginx): an empty response names the file and the web server sends it,
+  ranges included, while the worker moves on to the next request.
+"""
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+BACKEND_PYTHON = 'python'
+BACKEND_X_SENDFILE = 'x-sendfile'
+BACKEND_X_ACCEL_REDIRECT = 'x-accel-redirect'
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# Read size when the server cannot use os.sendfile()
+BLOCK_SIZE = 64 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    """The requested range starts past the end of the file."""
+
+
+class FileRange:
+    """
+    Read-only view of ``length`` bytes of an open file from ``start``.
+
+    It exposes the file descriptor, positioned at ``start``, so gunicorn
+    can send the range with os.sendfile(); it bounds the copy by the
+    response's Content-Length.
+    """
+
+    def __init__(self, file, start: int, length: int):
+        file.seek(start)
+        self._file = file
+        self._remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def fileno(self) -> int:
+        return self._file.fileno()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def parse_range(header, size: int):
+    """
+    Return the inclusive (start, end) of a single 'bytes=' range.
+
+    Returns None, meaning the whole file, for a missing or malformed header
+    and for several ranges, which servers may ignore. Raises
+    RangeNotSatisfiable when no byte of the range exists.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        if int(last) == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def if_range_matches(request, etag: str, last_modified: int) -> bool:
+    """Whether a Range may be used: no If-Range, or one naming the current file."""
+    value = request.META.get('HTTP_IF_RANGE')
+    if value is None:
+        return True
+    if value.startswith('"'):
+        # Strong comparison; weak validators (W/"...") never match
+        return value == etag
+    return parse_http_date_safe(value) == last_modified
+
+
+def offload_response(path: str, backend: str, content_type: str):
+    """Return an empty response that has the web server send ``path``, or None."""
+    response = HttpResponse(content_type=content_type)
+    if backend == BACKEND_X_SENDFILE:
+        response['X-Sendfile'] = os.path.abspath(path)
+        return response
+    if backend == BACKEND_X_ACCEL_REDIRECT:
+        relative = os.path.relpath(os.path.abspath(path), os.path.abspath(settings.MEDIA_ROOT))
+        if relative.startswith(os.pardir):
+            # Only MEDIA_ROOT is mapped to the internal location
+            return None
+        prefix = settings.FILE_SERVING_ACCEL_PREFIX.rstrip('/')
+        response['X-Accel-Redirect'] = f"{prefix}/{quote(relative.replace(os.sep, '/'))}"
+        return response
+    return None
+
+
+def serve_file(request, path: str, filename: str, content_type: str = None,
+               as_attachment: bool = True, stream=None):
+    """
+    Return a response delivering the file at ``path`` as ``filename``.
+
+    ``stream(path, start, length)``, if given, returns the body iterator
+    instead of the open file; async views pass an async generator.
+    Raises FileNotFoundError when the file does not exist.
+    """
+    stat = os.stat(path)
+    size = stat.st_size
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+    last_modified = int(stat.st_mtime)
+    content_type = content_type or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    # 304 Not Modified or 412 Precondition Failed
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        if response.status_code == 304:
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    response = None
+    if settings.FILE_SERVING_BACKEND != BACKEND_PYTHON:
+        response = offload_response(path, settings.FILE_SERVING_BACKEND, content_type)
+    if response is None:
+        # A Range with a stale If-Range gets the whole, current file
+        range_header = request.META.get('HTTP_RANGE') if if_range_matches(request, etag, last_modified) else None
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        start, end = byte_range or (0, size - 1)
+        length = end - start + 1
+
+        if stream is not None:
+            response = StreamingHttpResponse(stream(path, start, length), content_type=content_type)
+        else:
+            response = FileResponse(FileRange(open(path, 'rb'), start, length), content_type=content_type)
+            response.block_size = BLOCK_SIZE
+        response['Content-Length'] = str(length)
+        if byte_range is not None:
+            response.status_code = 206
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Accept-Ranges'] = 'bytes'
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    return response
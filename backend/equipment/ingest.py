@@ -0,0 +1,253 @@
+"""
+Dataset ingestion for the Equipment application.
+Turns an uploaded CSV file into a stored Dataset, shared by the single-request,
+resumable and batch upload endpoints.
+"""
+
+import os
+from functools import partial
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .db import serialized_write
+from .events import publish
+from .metrics import record_upload
+from .models import Dataset, DatasetEvent, EquipmentData
+from .profiling import profile_phase
+
+# Rows parsed and inserted at a time by ingest_csv_path()
+INGEST_CHUNK_ROWS = 20_000
+
+
+class IngestError(Exception):
+    """Raised when an uploaded file cannot be turned into a dataset."""
+
+
+def ingest_csv(user, uploaded_file):
+    """
+    Parse, analyze and store an uploaded CSV file.
+    Automatically manages dataset history (keeps last MAX_STORED_DATASETS).
+
+    Args:
+        user: Owner of the new dataset
+        uploaded_file: Django File with a ``name`` ending in .csv or .csv.gz
+
+    Returns:
+        Tuple of (Dataset, analysis dictionary)
+
+    Raises:
+        IngestError: If the file is not a valid equipment CSV
+    """
+    from equipment_analysis import parse_csv_file, analyze_equipment_data, convert_dataframe_to_list, equipment_rows
+    
+    # Parse CSV file
+    with profile_phase('parse'):
+        df, error_msg = parse_csv_file(uploaded_file, settings.CSV_MAX_DECOMPRESSED_SIZE)
+    if df is None:
+        raise IngestError(error_msg)
+
+    # Analyze data
+    with profile_phase('analyze'):
+        analysis = analyze_equipment_data(df)
+
+    dataset = store_dataset(user, uploaded_file, analysis, convert_dataframe_to_list(df), equipment_rows(df))
+    return dataset, analysis
+
+
+def store_dataset(user, uploaded_file, analysis, raw_data, rows, prune=True):
+    """
+    Store an analyzed CSV file as a new dataset of ``user`` and, unless
+    ``prune`` is False, prune the oldest datasets beyond MAX_STORED_DATASETS.
+
+    ``rows`` are (name, type, flowrate, pressure, temperature) tuples, as
+    returned by analysis.equipment_rows().
+    """
+    # Prepare rows before taking the write lock to keep it short
+    equipment_items = build_equipment_items(rows)
+    with serialized_write():
+        # Create dataset
+        dataset = build_dataset(user, uploaded_file, analysis, raw_data)
+        dataset.save()
+
+        # Create equipment data entries
+        for item in equipment_items:
+            item.dataset = dataset
+        EquipmentData.objects.bulk_create(equipment_items)
+        publish(user, DatasetEvent.TYPE_DATASET_CREATED, dataset.id, dataset=dataset.get_summary())
+        if prune:
+            prune_history(user)
+
+    record_upload(uploaded_file.size, analysis['total_count'])
+    return dataset
+
+
+class AssembledFile(File):
+    """A complete file on local disk, which storage moves into place instead of copying."""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def ingest_csv_path(user, path, filename, on_staged=None):
+    """
+    Parse, analyze and store the CSV file at ``path``, INGEST_CHUNK_ROWS
+    rows at a time, for files too large to hold in memory.
+
+    The dataset is created staged, hidden from Dataset.objects, and each
+    chunk of rows is inserted in a transaction of its own, so other writers
+    wait for one chunk at most rather than the whole file. A short final
+    transaction stores the analysis and file and makes the dataset visible.
+    If the file is invalid or storing it fails, the staged dataset is deleted.
+
+    raw_data is kept only for files of up to RAW_DATA_MAX_ROWS rows; the
+    analysis of larger datasets is computed from their rows. The file is
+    moved into storage, so ``path`` no longer exists once this returns.
+
+    Args:
+        user: Owner of the new dataset
+        path: Local path of the file
+        filename: Name the file was uploaded as, ending in .csv or .csv.gz
+        on_staged: Called with the staged dataset in the transaction creating
+            it, to find it again if the process dies before it is complete
+
+    Returns:
+        Tuple of (Dataset, analysis dictionary)
+
+    Raises:
+        IngestError: If the file is not a valid equipment CSV
+    """
+    from equipment_analysis import AnalysisAccumulator, CSVError, convert_dataframe_to_list, equipment_rows, iter_csv_chunks
+
+    size = os.path.getsize(path)
+    accumulator = AnalysisAccumulator()
+    raw_data = []
+    with serialized_write():
+        dataset = Dataset.all_objects.create(user=user, filename=filename, staged=True)
+        if on_staged is not None:
+            on_staged(dataset)
+    try:
+        with open(path, 'rb') as f:
+            try:
+                chunks = iter_csv_chunks(File(f, name=filename), INGEST_CHUNK_ROWS,
+                                         settings.CSV_MAX_DECOMPRESSED_SIZE)
+                for chunk in chunks:
+                    accumulator.add(chunk)
+                    if raw_data is not None:
+                        if accumulator.total_count <= settings.RAW_DATA_MAX_ROWS:
+                            raw_data.extend(convert_dataframe_to_list(chunk))
+                        else:
+                            raw_data = None
+                    equipment_items = build_equipment_items(equipment_rows(chunk))
+                    for item in equipment_items:
+                        item.dataset = dataset
+                    with serialized_write():
+                        EquipmentData.objects.bulk_create(equipment_items)
+            except CSVError as e:
+                raise IngestError(str(e))
+
+            analysis = accumulator.result()
+            dataset.total_count = analysis['total_count']
+            dataset.avg_flowrate = analysis['avg_flowrate']
+            dataset.avg_pressure = analysis['avg_pressure']
+            dataset.avg_temperature = analysis['avg_temperature']
+            dataset.equipment_type_distribution = analysis['equipment_type_distribution']
+            dataset.raw_data = raw_data or []
+            # Listed as uploaded when it becomes visible
+            dataset.uploaded_at = timezone.now()
+            dataset.staged = False
+            dataset.file.save(filename, AssembledFile(f, name=filename), save=False)
+            try:
+                with serialized_write():
+                    dataset.save()
+                    publish(user, DatasetEvent.TYPE_DATASET_CREATED, dataset.id, dataset=dataset.get_summary())
+                    prune_history(user)
+            except Exception:
+                # The transaction rolled back; do not leave the moved file behind
+                dataset.file.delete(save=False)
+                raise
+    except Exception:
+        delete_staged(dataset.pk)
+        raise
+
+    record_upload(size, analysis['total_count'])
+    return dataset, analysis
+
+
+def delete_staged(dataset_id) -> None:
+    """Delete a dataset with its rows if it is still staged."""
+    with serialized_write():
+        Dataset.all_objects.filter(pk=dataset_id, staged=True).delete()
+
+
+def prune_history(user):
+    """
+    Delete the oldest datasets of ``user`` beyond MAX_STORED_DATASETS, inside
+    the caller's write. Returns the ids of the deleted datasets.
+    """
+    pruned = []
+    user_datasets = Dataset.objects.filter(user=user).order_by('-uploaded_at', '-id')
+    if settings.MAX_STORED_DATASETS and user_datasets.count() > settings.MAX_STORED_DATASETS:
+        datasets_to_delete = user_datasets[settings.MAX_STORED_DATASETS:]
+        for old_dataset in datasets_to_delete:
+            # Delete the associated file once the deletion commits; a rollback keeps both
+            if old_dataset.file:
+                transaction.on_commit(partial(old_dataset.file.storage.delete, old_dataset.file.name))
+            publish(user, DatasetEvent.TYPE_DATASET_PRUNED, old_dataset.id, filename=old_dataset.filename)
+            pruned.append(old_dataset.id)
+            old_dataset.delete()
+    return pruned
+
+
+def store_datasets(user, items):
+    """
+    Store several analyzed CSV files as datasets of ``user`` in a single
+    transaction, for bulk imports: no events are published and no history
+    is pruned.
+
+    ``items`` are (File, analysis, raw_data, rows) tuples as taken by
+    store_dataset(). Returns the new datasets.
+    """
+    datasets = []
+    equipment_items = []
+    with serialized_write():
+        for uploaded_file, analysis, raw_data, rows in items:
+            dataset = build_dataset(user, uploaded_file, analysis, raw_data)
+            dataset.save()
+            datasets.append(dataset)
+            for item in build_equipment_items(rows):
+                item.dataset = dataset
+                equipment_items.append(item)
+        EquipmentData.objects.bulk_create(equipment_items)
+    return datasets
+
+
+def build_dataset(user, uploaded_file, analysis, raw_data):
+    """Return an unsaved Dataset for an analyzed CSV file."""
+    return Dataset(
+        user=user,
+        filename=uploaded_file.name,
+        file=uploaded_file,
+        total_count=analysis['total_count'],
+        avg_flowrate=analysis['avg_flowrate'],
+        avg_pressure=analysis['avg_pressure'],
+        avg_temperature=analysis['avg_temperature'],
+        equipment_type_distribution=analysis['equipment_type_distribution'],
+        raw_data=raw_data
+    )
+
+
+def build_equipment_items(rows):
+    """Return unsaved EquipmentData for (name, type, flowrate, pressure, temperature) tuples."""
+    return [
+        EquipmentData(
+            equipment_name=name,
+            equipment_type=equipment_type,
+            flowrate=flowrate,
+            pressure=pressure,
+            temperature=temperature
+        )
+        for name, equipment_type, flowrate, pressure, temperature in rows
+    ]
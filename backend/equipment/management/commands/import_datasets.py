@@ -0,0 +1,194 @@
+"""
+Bulk import of CSV exports from a directory tree, without the HTTP API.
+
+    python manage.py import_datasets /data/exports --user alice --workers 8
+
+Every .csv and .csv.gz file under the directory is parsed and analyzed in a
+pool of worker processes with the same code as uploads (equipment.utils),
+and the results are stored --batch-size files per transaction. The same
+transaction records each stored file, and each file rejected as invalid, as
+an ImportedFile; running the command again after an interruption skips
+them. Files that failed for other reasons (a worker that died, an unexpected
+error) are not recorded and are tried again by the next run.
+"""
+
+import multiprocessing
+import os
+import signal
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from equipment import utils
+from equipment.batch_upload import CSV_SUFFIXES
+from equipment.db import serialized_write
+from equipment.export import batched
+from equipment.ingest import store_datasets
+from equipment.models import ImportedFile
+
+
+class WorkerPool:
+    """Parser processes, started again when one dies and breaks the pool."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.executor = self.start()
+
+    def start(self) -> ProcessPoolExecutor:
+        # Workers are spawned so they start without Django's open connections,
+        # and ignore Ctrl-C, which the command handles
+        return ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+            initializer=signal.signal, initargs=(signal.SIGINT, signal.SIG_IGN)
+        )
+
+    def submit(self, fn, *args):
+        try:
+            return self.executor.submit(fn, *args)
+        except BrokenProcessPool:
+            # The files in flight fail and are retried by the next run
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = self.start()
+            return self.executor.submit(fn, *args)
+
+    def shutdown(self, **kwargs):
+        self.executor.shutdown(**kwargs)
+
+
+def find_csv_files(root: str):
+    """Return the paths of the CSV files under ``root``, relative to it, in sorted walk order."""
+    paths = []
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(name for name in dirnames if not name.startswith('.'))
+        for filename in sorted(filenames):
+            if filename.endswith(CSV_SUFFIXES) and not filename.startswith('.'):
+                paths.append(os.path.relpath(os.path.join(directory, filename), root))
+    return paths
+
+
+def analyze_files(pool: WorkerPool, root: str, paths, window: int):
+    """
+    Yield (path, processed, error, rejected) for ``paths`` in order, keeping
+    up to ``window`` files in the pool ahead of the caller. ``rejected`` is
+    True when the file itself is invalid, so importing it again would fail
+    the same way.
+    """
+    pending = deque()
+
+    def result(path, future):
+        try:
+            processed, error = future.result()
+        except BrokenProcessPool:
+            return path, None, "The worker processing this file stopped unexpectedly", False
+        except Exception as e:
+            return path, None, f"Unexpected error processing CSV: {str(e)}", False
+        # parse_csv_file reports errors that are not about the data this way
+        return path, processed, error, processed is None and not error.startswith('Unexpected error')
+
+    for path in paths:
+        future = pool.submit(utils.process_csv_path, os.path.join(root, path),
+                             settings.CSV_MAX_DECOMPRESSED_SIZE)
+        pending.append((path, future))
+        if len(pending) > window:
+            yield result(*pending.popleft())
+    while pending:
+        yield result(*pending.popleft())
+
+
+class Command(BaseCommand):
+    help = 'Import every CSV file under a directory as datasets of a user, resuming where the last run stopped.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Directory tree of .csv and .csv.gz files')
+        parser.add_argument('--user', required=True, help='Username owning the imported datasets')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Parser processes (default: number of CPUs)')
+        parser.add_argument('--batch-size', type=int, default=20,
+                            help='Files stored per transaction (default: 20)')
+        parser.add_argument('--restart', action='store_true',
+                            help='Forget the files already imported from the directory and import every file again')
+
+    def handle(self, *args, **options):
+        root = options['directory']
+        workers = options['workers']
+        batch_size = options['batch_size']
+        if not os.path.isdir(root):
+            raise CommandError(f"'{root}' is not a directory")
+        if workers < 1 or batch_size < 1:
+            raise CommandError('--workers and --batch-size must be at least 1')
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist")
+
+        source = os.path.realpath(root)
+        imported_files = ImportedFile.objects.filter(source=source)
+        if options['restart']:
+            imported_files.delete()
+        done = set(imported_files.values_list('path', flat=True))
+        all_paths = find_csv_files(root)
+        paths = [path for path in all_paths if path not in done]
+        skipped = len(all_paths) - len(paths)
+        self.stdout.write(f"{len(paths)} files to import, {skipped} already imported from {source}")
+        if settings.MAX_STORED_DATASETS:
+            self.stderr.write(self.style.WARNING(
+                f"MAX_STORED_DATASETS is {settings.MAX_STORED_DATASETS}: the next upload of "
+                f"'{user.username}' will delete all but the newest {settings.MAX_STORED_DATASETS} datasets"
+            ))
+
+        imported = failed = retry = rows = 0
+        started = time.perf_counter()
+        pool = WorkerPool(workers)
+        try:
+            for batch in batched(analyze_files(pool, root, paths, 2 * workers), batch_size):
+                with ExitStack() as stack:
+                    items = []
+                    stored_paths = []
+                    records = []
+                    for path, processed, error, rejected in batch:
+                        if processed is None:
+                            self.stderr.write(f"{path}: {error}")
+                            failed += 1
+                            if rejected:
+                                records.append(ImportedFile(user=user, source=source, path=path, error=error))
+                            else:
+                                retry += 1
+                            continue
+                        source_file = stack.enter_context(open(os.path.join(root, path), 'rb'))
+                        items.append((File(source_file, name=os.path.basename(path)), processed['analysis'],
+                                      processed['raw_data'], processed['rows']))
+                        stored_paths.append(path)
+                        rows += processed['analysis']['total_count']
+                    with serialized_write():
+                        datasets = store_datasets(user, items) if items else []
+                        records.extend(
+                            ImportedFile(user=user, source=source, path=path, dataset=dataset)
+                            for path, dataset in zip(stored_paths, datasets)
+                        )
+                        ImportedFile.objects.bulk_create(records)
+                imported += len(items)
+
+                if options['verbosity'] >= 1:
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(f"{imported + failed}/{len(paths)} files, {rows} rows, "
+                                      f"{rows / elapsed:,.0f} rows/s")
+        except KeyboardInterrupt:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise CommandError(
+                f"Interrupted after {imported + failed} files; run the command again to resume"
+            )
+        pool.shutdown()
+
+        elapsed = time.perf_counter() - started
+        rate = rows / elapsed if elapsed else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported} files ({rows} rows) in {elapsed:.1f}s: {rate:,.0f} rows/s; "
+            f"{failed} failed ({retry} to retry on the next run), {skipped} skipped"
+        ))
@@ -0,0 +1,21 @@
+"""
+Delete dataset events older than EVENT_RETENTION_HOURS.
+
+    python manage.py purge_events
+
+Processes that publish events purge them every EVENT_PURGE_INTERVAL
+seconds; with EVENT_PURGE_INTERVAL=0, schedule this command instead.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from equipment.events import purge_expired_events
+
+
+class Command(BaseCommand):
+    help = 'Delete dataset events older than EVENT_RETENTION_HOURS.'
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_events()
+        self.stdout.write(f"Deleted {deleted} events older than {settings.EVENT_RETENTION_HOURS} hours")
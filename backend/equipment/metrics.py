@@ -0,0 +1,148 @@
+"""
+Prometheus metrics for the Equipment application.
+Exports request latency, upload volume, processing durations and database
+query counts. When PROMETHEUS_MULTIPROC_DIR is set (e.g. under gunicorn),
+samples are written to per-process files and aggregated at scrape time.
+"""
+
+import os
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+)
+from prometheus_client import multiprocess
+
+
+REQUEST_LATENCY = Histogram(
+    'equipment_http_request_duration_seconds',
+    'Request latency by view/action',
+    ['view', 'method', 'status'],
+)
+
+DB_QUERIES = Histogram(
+    'equipment_db_queries_per_request',
+    'Number of database queries executed per request',
+    ['view'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000),
+)
+
+PHASE_DURATION = Histogram(
+    'equipment_processing_duration_seconds',
+    'Duration of processing phases (parse, analyze, pdf, ...)',
+    ['phase'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+UPLOAD_BYTES = Counter(
+    'equipment_upload_bytes_total',
+    'Bytes of CSV data received through uploads',
+)
+
+ROWS_PROCESSED = Counter(
+    'equipment_rows_processed_total',
+    'Equipment rows parsed and stored from uploads',
+)
+
+
+def observe_phase(phase: str, duration: float) -> None:
+    """Record the duration of a processing phase."""
+    PHASE_DURATION.labels(phase=phase).observe(duration)
+
+
+def record_upload(size: int, rows: int) -> None:
+    """Record the volume of a processed upload."""
+    UPLOAD_BYTES.inc(size)
+    ROWS_PROCESSED.inc(rows)
+
+
+def render_metrics():
+    """
+    Render all metrics in the Prometheus text exposition format.
+
+    Returns:
+        Tuple of (payload, content_type)
+    """
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def wrap_connections(wrapper) -> ExitStack:
+    """
+    Install ``wrapper`` on every database connection of the calling thread.
+
+    Connections are per thread, and async ORM queries run on the request's
+    sync_to_async thread, so async code must call this through sync_to_async.
+    Close the returned stack on the same thread to remove the wrappers.
+    """
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(wrapper))
+    return stack
+
+
+class QueryCounter:
+    """Database execute wrapper counting the queries of a request."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """
+    Middleware recording latency and query count for every request.
+    Disabled when METRICS_ENABLED is False.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        # Stay async under ASGI so async views are not forced onto a thread
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        queries = QueryCounter()
+        start = time.perf_counter()
+        with wrap_connections(queries):
+            response = self.get_response(request)
+        return self.observe(request, response, time.perf_counter() - start, queries.count)
+
+    async def __acall__(self, request):
+        queries = QueryCounter()
+        start = time.perf_counter()
+        stack = await sync_to_async(wrap_connections)(queries)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.observe(request, response, time.perf_counter() - start, queries.count)
+
+    def observe(self, request, response, duration, query_count):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match and match.view_name else 'unmatched'
+        if view != 'metrics':
+            REQUEST_LATENCY.labels(
+                view=view, method=request.method, status=str(response.status_code)
+            ).observe(duration)
+            DB_QUERIES.labels(view=view).observe(query_count)
+        return response
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:19
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Dataset',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(max_length=255)),
+                ('file', models.FileField(upload_to='datasets/')),
+                ('uploaded_at', models.DateTimeField(auto_now_add=True)),
+                ('total_count', models.IntegerField(default=0)),
+                ('avg_flowrate', models.FloatField(blank=True, null=True)),
+                ('avg_pressure', models.FloatField(blank=True, null=True)),
+                ('avg_temperature', models.FloatField(blank=True, null=True)),
+                ('equipment_type_distribution', models.JSONField(default=dict)),
+                ('raw_data', models.JSONField(default=list)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='datasets', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-uploaded_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EquipmentData',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('equipment_name', models.CharField(max_length=100)),
+                ('equipment_type', models.CharField(max_length=50)),
+                ('flowrate', models.FloatField(validators=[django.core.validators.MinValueValidator(0.0)])),
+                ('pressure', models.FloatField(validators=[django.core.validators.MinValueValidator(0.0)])),
+                ('temperature', models.FloatField()),
+                ('dataset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='equipment_items', to='equipment.dataset')),
+            ],
+            options={
+                'ordering': ['equipment_name'],
+                'indexes': [models.Index(fields=['dataset', 'equipment_type'], name='equipment_e_dataset_35146d_idx'), models.Index(fields=['equipment_type'], name='equipment_e_equipme_2c7084_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='dataset',
+            index=models.Index(fields=['-uploaded_at'], name='equipment_d_uploade_90c946_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dataset',
+            index=models.Index(fields=['user', '-uploaded_at'], name='equipment_d_user_id_c05d19_idx'),
+        ),
+    ]
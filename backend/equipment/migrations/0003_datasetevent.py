@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('equipment', '0002_uploadsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('upload.progress', 'Upload progress'), ('upload.failed', 'Upload failed'), ('dataset.created', 'Dataset created'), ('dataset.deleted', 'Dataset deleted'), ('dataset.pruned', 'Dataset pruned')], max_length=20)),
+                ('dataset_id', models.IntegerField(blank=True, null=True)),
+                ('data', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dataset_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['user', 'id'], name='equipment_d_user_id_62d051_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0005_importedfile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='staged',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -3,11 +3,20 @@ Models for the Equipment application.
 Handles dataset storage and equipment data management.
 """
 
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 import json
+import uuid
+
+
+class DatasetManager(models.Manager):
+    """Datasets without the ones still being staged by a large upload."""
+    
+    def get_queryset(self):
+        return super().get_queryset().filter(staged=False)
 
 
 class Dataset(models.Model):
@@ -30,6 +39,13 @@ class Dataset(models.Model):
     # Raw data stored as JSON for quick retrieval
     raw_data = models.JSONField(default=list)
     
+    # True while ingest_csv_path() stores the rows; such datasets are hidden
+    # from Dataset.objects, and all_objects includes them
+    staged = models.BooleanField(default=False)
+    
+    objects = DatasetManager()
+    all_objects = models.Manager()
+    
     class Meta:
         ordering = ['-uploaded_at']
         indexes = [
@@ -85,3 +101,113 @@ class EquipmentData(models.Model):
             'pressure': self.pressure,
             'temperature': self.temperature,
         }
+
+
+class UploadSession(models.Model):
+    """
+    A resumable, chunked CSV upload in progress.
+    Chunks are written straight into a single file on disk at their offsets;
+    the received chunk numbers are tracked next to it.
+    """
+    STATUS_ACTIVE = 'active'
+    STATUS_PROCESSING = 'processing'
+    STATUS_COMPLETE = 'complete'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_ACTIVE, 'Active'),
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_COMPLETE, 'Complete'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    total_size = models.BigIntegerField()
+    chunk_size = models.IntegerField()
+    sha256 = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_ACTIVE)
+    dataset = models.ForeignKey(Dataset, on_delete=models.SET_NULL, null=True, blank=True)
+    # Why the last finalize did not create a dataset
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.filename} ({self.status})"
+    
+    @property
+    def total_chunks(self):
+        """Number of chunks the file is split into."""
+        return max(1, -(-self.total_size // self.chunk_size))
+    
+    def chunk_length(self, index):
+        """Expected byte length of chunk ``index``."""
+        return min(self.chunk_size, self.total_size - index * self.chunk_size)
+    
+    def is_expired(self):
+        """Return True once the session is older than CHUNKED_UPLOAD_EXPIRY_HOURS."""
+        age = timezone.now() - self.created_at
+        return age.total_seconds() > settings.CHUNKED_UPLOAD_EXPIRY_HOURS * 3600
+
+
+class DatasetEvent(models.Model):
+    """
+    A change to a user's datasets or uploads, pushed to clients by the
+    events stream. Stored in the database so that every worker process
+    sees the events published by the others.
+    """
+    TYPE_UPLOAD_PROGRESS = 'upload.progress'
+    TYPE_UPLOAD_FAILED = 'upload.failed'
+    TYPE_DATASET_CREATED = 'dataset.created'
+    TYPE_DATASET_DELETED = 'dataset.deleted'
+    TYPE_DATASET_PRUNED = 'dataset.pruned'
+    TYPE_CHOICES = [
+        (TYPE_UPLOAD_PROGRESS, 'Upload progress'),
+        (TYPE_UPLOAD_FAILED, 'Upload failed'),
+        (TYPE_DATASET_CREATED, 'Dataset created'),
+        (TYPE_DATASET_DELETED, 'Dataset deleted'),
+        (TYPE_DATASET_PRUNED, 'Dataset pruned'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='dataset_events')
+    event_type = models.CharField(max_length=20, choices=TYPE_CHOICES)
+    # Not a foreign key: events outlive the datasets they report as deleted
+    dataset_id = models.IntegerField(null=True, blank=True)
+    data = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['user', 'id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.event_type} ({self.user})"
+
+
+class ImportedFile(models.Model):
+    """
+    A file the import_datasets command is done with: stored as a dataset,
+    or rejected as invalid. Recorded in the transaction that stores the
+    dataset, so an interrupted import resumes without duplicates.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='imported_files')
+    # Absolute path of the imported directory, and the file's path within it
+    source = models.CharField(max_length=1024)
+    path = models.CharField(max_length=1024)
+    dataset = models.ForeignKey(Dataset, on_delete=models.SET_NULL, null=True, blank=True)
+    error = models.TextField(blank=True)
+    imported_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'path'], name='unique_imported_file'),
+        ]
+    
+    def __str__(self):
+        return f"{self.source}/{self.path}"
@@ -0,0 +1,28 @@
+"""
+Pagination classes for the Equipment application.
+"""
+
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class EquipmentRowPagination(PageNumberPagination):
+    """Page through the equipment rows of a dataset; clients may pick the page size."""
+    page_size = 500
+    page_size_query_param = 'page_size'
+    max_page_size = 5000
+
+
+class DatasetCursorPagination(CursorPagination):
+    """
+    Page through a user's datasets, newest first, by keyset on uploaded_at.
+
+    Each page is one range scan of the (user, -uploaded_at) index: there is
+    no COUNT(*) and no OFFSET, so deep pages cost the same as the first.
+    Ties on uploaded_at are resolved by DRF within the cursor. Ordering on
+    a second column as well would make SQLite sort outside the index.
+    """
+    ordering = '-uploaded_at'
+    page_size = settings.DATASET_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.MAX_DATASET_PAGE_SIZE
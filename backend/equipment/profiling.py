@@ -0,0 +1,223 @@
+"""
+Request profiling for the Equipment application.
+Records per-request phase timings, SQL query accounting and peak allocation,
+and reports them as a Server-Timing header and a structured log line.
+"""
+
+import contextvars
+import json
+import logging
+import random
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .metrics import observe_phase, wrap_connections
+
+
+logger = logging.getLogger('equipment.profiling')
+
+_current_profile = contextvars.ContextVar('equipment_request_profile', default=None)
+
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+class RequestProfile:
+    """
+    Timings collected for a single sampled request.
+    Also acts as a database execute wrapper for SQL accounting.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases = {}
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.peak_memory = None
+        self._render_started_at = None
+
+    def add_phase(self, name: str, duration: float) -> None:
+        """Accumulate time spent in a named phase."""
+        self.phases[name] = self.phases.get(name, 0.0) + duration
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_count += 1
+            self.sql_time += time.perf_counter() - start
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def server_timing(self, total: float) -> str:
+        """Format the profile as a Server-Timing header value."""
+        entries = [f"{name};dur={duration * 1000:.2f}" for name, duration in self.phases.items()]
+        entries.append(f'db;dur={self.sql_time * 1000:.2f};desc="{self.sql_count} queries"')
+        if self.peak_memory is not None:
+            entries.append(f'mem;desc="peak {self.peak_memory} bytes"')
+        entries.append(f"total;dur={total * 1000:.2f}")
+        return ', '.join(entries)
+
+    def as_dict(self, total: float) -> dict:
+        """Return the profile as a JSON-serializable dictionary."""
+        return {
+            'duration_ms': round(total * 1000, 2),
+            'phases_ms': {name: round(duration * 1000, 2) for name, duration in self.phases.items()},
+            'sql_count': self.sql_count,
+            'sql_time_ms': round(self.sql_time * 1000, 2),
+            'peak_alloc_bytes': self.peak_memory,
+        }
+
+
+def current_profile():
+    """Return the profile of the request being handled, or None when not sampled."""
+    return _current_profile.get()
+
+
+@contextmanager
+def profile_phase(name: str):
+    """
+    Time a block of code as a named phase of the current request.
+    The duration is always exported as a metric, and added to the request
+    profile when the request is being profiled.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        observe_phase(name, duration)
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.add_phase(name, duration)
+
+
+def _start_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracemalloc_users += 1
+        tracemalloc.reset_peak()
+
+
+def _stop_tracemalloc() -> int:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _, peak = tracemalloc.get_traced_memory()
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+        return peak
+
+
+class RequestProfilingMiddleware:
+    """
+    Opt-in middleware that profiles a sample of requests.
+
+    Enabled with REQUEST_PROFILING_ENABLED; REQUEST_PROFILING_SAMPLE_RATE sets
+    the fraction of requests profiled. Peak allocation tracking uses
+    tracemalloc, which is process-wide and slows the traced request, so it is
+    controlled separately by REQUEST_PROFILING_TRACE_MEMORY.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'REQUEST_PROFILING_SAMPLE_RATE', 1.0)
+        self.trace_memory = getattr(settings, 'REQUEST_PROFILING_TRACE_MEMORY', False)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        profile, token = self.start()
+        try:
+            with wrap_connections(profile):
+                response = self.get_response(request)
+        finally:
+            self.stop(profile, token)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        if random.random() >= self.sample_rate:
+            return await self.get_response(request)
+
+        profile, token = self.start()
+        try:
+            stack = await sync_to_async(wrap_connections)(profile)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        finally:
+            self.stop(profile, token)
+        return self.finish(request, response, profile)
+
+    def start(self):
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        if self.trace_memory:
+            _start_tracemalloc()
+        return profile, token
+
+    def stop(self, profile: RequestProfile, token) -> None:
+        if self.trace_memory:
+            profile.peak_memory = _stop_tracemalloc()
+        _current_profile.reset(token)
+
+    def finish(self, request, response, profile: RequestProfile):
+        total = profile.total
+        response['Server-Timing'] = profile.server_timing(total)
+        self.log(request, response, profile, total)
+        return response
+
+    def process_template_response(self, request, response):
+        """Time DRF response rendering, which happens after the view returns."""
+        profile = _current_profile.get()
+        if profile is not None:
+            profile._render_started_at = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: profile.add_phase(
+                    'render', time.perf_counter() - profile._render_started_at
+                )
+            )
+        return response
+
+    def log(self, request, response, profile: RequestProfile, total: float) -> None:
+        """Emit the profile as a single structured log line."""
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'event': 'request_profile',
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            **profile.as_dict(total),
+        }
+        logger.info(json.dumps(record))
+
+
+class ProfiledAuthenticationMixin:
+    """Record DRF authentication as the 'auth' phase of the request profile."""
+
+    def perform_authentication(self, request):
+        with profile_phase('auth'):
+            super().perform_authentication(request)
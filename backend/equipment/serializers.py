@@ -4,8 +4,10 @@ Handles data validation and transformation for API endpoints.
 """
 
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth.models import User
-from .models import Dataset, EquipmentData
+from .chunked_upload import received_chunks
+from .models import Dataset, EquipmentData, UploadSession
 
 
 class EquipmentDataSerializer(serializers.ModelSerializer):
@@ -28,7 +30,20 @@ class EquipmentDataSerializer(serializers.ModelSerializer):
         return value
 
 
-class DatasetSerializer(serializers.ModelSerializer):
+class DynamicFieldsMixin:
+    """
+    Serializer mixin taking a ``fields`` argument: only the named fields are
+    serialized, in the serializer's own order.
+    """
+    
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class DatasetSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer for dataset with summary statistics."""
     equipment_items = EquipmentDataSerializer(many=True, read_only=True)
     user_username = serializers.CharField(source='user.username', read_only=True)
@@ -46,7 +61,7 @@ class DatasetSerializer(serializers.ModelSerializer):
         ]
 
 
-class DatasetSummarySerializer(serializers.ModelSerializer):
+class DatasetSummarySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Lightweight serializer for dataset summaries (without detailed equipment items)."""
     user_username = serializers.CharField(source='user.username', read_only=True)
     
@@ -64,8 +79,8 @@ class CSVUploadSerializer(serializers.Serializer):
     file = serializers.FileField()
     
     def validate_file(self, value):
-        """Validate that the uploaded file is a CSV."""
-        if not value.name.endswith('.csv'):
+        """Validate that the uploaded file is a CSV (optionally gzip-compressed)."""
+        if not value.name.endswith(('.csv', '.csv.gz')):
             raise serializers.ValidationError("Only CSV files are allowed.")
         
         # Check file size (max 5MB)
@@ -75,6 +90,50 @@ class CSVUploadSerializer(serializers.Serializer):
         return value
 
 
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Serializer for a resumable upload and the chunks received so far."""
+    total_chunks = serializers.IntegerField(read_only=True)
+    received_chunks = serializers.SerializerMethodField()
+    dataset = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id', 'filename', 'total_size', 'chunk_size', 'total_chunks',
+            'received_chunks', 'sha256', 'status', 'dataset', 'error', 'created_at'
+        ]
+        read_only_fields = ['id', 'chunk_size', 'status', 'dataset', 'error', 'created_at']
+    
+    def get_received_chunks(self, obj):
+        return received_chunks(obj)
+    
+    def get_dataset(self, obj):
+        # While processing, the dataset is still staged and not visible
+        return obj.dataset_id if obj.status == UploadSession.STATUS_COMPLETE else None
+    
+    def validate_filename(self, value):
+        """Validate that the file being uploaded is a CSV (optionally gzip-compressed)."""
+        if not value.endswith(('.csv', '.csv.gz')):
+            raise serializers.ValidationError("Only CSV files are allowed.")
+        return value
+    
+    def validate_total_size(self, value):
+        """Validate the announced size against CHUNKED_UPLOAD_MAX_SIZE."""
+        if value < 1:
+            raise serializers.ValidationError("File is empty.")
+        if value > settings.CHUNKED_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"File size must not exceed {settings.CHUNKED_UPLOAD_MAX_SIZE} bytes."
+            )
+        return value
+    
+    def validate_sha256(self, value):
+        value = value.lower()
+        if value and (len(value) != 64 or any(c not in '0123456789abcdef' for c in value)):
+            raise serializers.ValidationError("Must be a hex SHA-256 digest.")
+        return value
+
+
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for user information."""
     
@@ -5,17 +5,36 @@ Maps API endpoints to their respective views.
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import DatasetViewSet, AuthViewSet, health_check
+from . import async_views
+from .views import DatasetViewSet, UploadSessionViewSet, AuthViewSet, dataset_events, events_ticket, health_check
 
 # Create router and register viewsets
 router = DefaultRouter()
 router.register(r'datasets', DatasetViewSet, basename='dataset')
+router.register(r'uploads', UploadSessionViewSet, basename='upload')
 router.register(r'auth', AuthViewSet, basename='auth')
 
+# Async read endpoints, for deployments behind an ASGI server
+async_urlpatterns = [
+    path('health/', async_views.health_check, name='async-health-check'),
+    path('datasets/history/', async_views.dataset_history, name='async-dataset-history'),
+    path('datasets/<int:pk>/', async_views.dataset_detail, name='async-dataset-detail'),
+    path('datasets/<int:pk>/summary/', async_views.dataset_summary, name='async-dataset-summary'),
+    path('datasets/<int:pk>/generate_pdf/', async_views.dataset_pdf, name='async-dataset-pdf'),
+    path('events/', async_views.dataset_events, name='async-dataset-events'),
+]
+
 urlpatterns = [
     # Health check
     path('health/', health_check, name='health-check'),
     
+    # Server-Sent Events
+    path('events/', dataset_events, name='dataset-events'),
+    path('events/ticket/', events_ticket, name='events-ticket'),
+    
+    # Async read endpoints
+    path('async/', include(async_urlpatterns)),
+    
     # Include router URLs
     path('', include(router.urls)),
 ]
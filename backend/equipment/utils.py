@@ -1,23 +1,37 @@
 """
 Utility functions for the Equipment application.
 Includes CSV parsing, data analysis, PDF generation, and error handling.
+
+pandas and ReportLab are imported on first use, so processes that never
+parse a CSV or render a PDF (auth traffic, health checks, management
+commands) do not pay for them.
 """
 
-import pandas as pd
-import io
-from typing import Dict, Any, List, Tuple
-from django.core.files.uploadedfile import UploadedFile
+import importlib
+import os
+import threading
+
+from django.conf import settings
 from rest_framework.views import exception_handler
 from rest_framework.response import Response
 from rest_framework import status
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from datetime import datetime
 
+# Validation and analysis live in the Django-free equipment_analysis package (shared/),
+# which the desktop client imports too
+ANALYSIS_FUNCTIONS = {
+    'validate_csv_structure', 'parse_csv_file', 'analyze_equipment_data',
+    'convert_dataframe_to_list', 'build_parameter_series', 'validate_csv_stream',
+    'equipment_rows', 'process_csv_path',
+}
+
+
+def __getattr__(name):
+    """Load the analysis functions (and pandas with them) on first access."""
+    if name in ANALYSIS_FUNCTIONS:
+        return getattr(importlib.import_module('equipment_analysis'), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def custom_exception_handler(exc, context):
     """
@@ -46,122 +60,6 @@ def custom_exception_handler(exc, context):
     return response
 
 
-def validate_csv_structure(df: pd.DataFrame) -> Tuple[bool, str]:
-    """
-    Validate that the CSV has the required columns and data types.
-    
-    Args:
-        df: Pandas DataFrame to validate
-        
-    Returns:
-        Tuple of (is_valid, error_message)
-    """
-    required_columns = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
-    
-    # Check for required columns
-    missing_columns = [col for col in required_columns if col not in df.columns]
-    if missing_columns:
-        return False, f"Missing required columns: {', '.join(missing_columns)}"
-    
-    # Check for empty dataframe
-    if df.empty:
-        return False, "CSV file is empty"
-    
-    # Validate data types for numeric columns
-    numeric_columns = ['Flowrate', 'Pressure', 'Temperature']
-    for col in numeric_columns:
-        try:
-            pd.to_numeric(df[col], errors='raise')
-        except (ValueError, TypeError):
-            return False, f"Column '{col}' must contain numeric values"
-    
-    # Check for null values in required columns
-    null_counts = df[required_columns].isnull().sum()
-    columns_with_nulls = null_counts[null_counts > 0].index.tolist()
-    if columns_with_nulls:
-        return False, f"Null values found in columns: {', '.join(columns_with_nulls)}"
-    
-    return True, ""
-
-
-def parse_csv_file(file: UploadedFile) -> Tuple[pd.DataFrame, str]:
-    """
-    Parse uploaded CSV file into a pandas DataFrame.
-    
-    Args:
-        file: Uploaded CSV file
-        
-    Returns:
-        Tuple of (DataFrame, error_message)
-    """
-    try:
-        # Read CSV file
-        content = file.read()
-        df = pd.read_csv(io.BytesIO(content))
-        
-        # Validate structure
-        is_valid, error_msg = validate_csv_structure(df)
-        if not is_valid:
-            return None, error_msg
-        
-        # Clean data
-        df = df.dropna(subset=['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature'])
-        
-        # Ensure numeric columns are properly typed
-        df['Flowrate'] = pd.to_numeric(df['Flowrate'])
-        df['Pressure'] = pd.to_numeric(df['Pressure'])
-        df['Temperature'] = pd.to_numeric(df['Temperature'])
-        
-        return df, ""
-    
-    except pd.errors.EmptyDataError:
-        return None, "CSV file is empty"
-    except pd.errors.ParserError as e:
-        return None, f"Error parsing CSV: {str(e)}"
-    except Exception as e:
-        return None, f"Unexpected error reading CSV: {str(e)}"
-
-
-def analyze_equipment_data(df: pd.DataFrame) -> Dict[str, Any]:
-    """
-    Perform statistical analysis on equipment data.
-    
-    Args:
-        df: DataFrame containing equipment data
-        
-    Returns:
-        Dictionary with summary statistics
-    """
-    analysis = {
-        'total_count': len(df),
-        'avg_flowrate': float(df['Flowrate'].mean()),
-        'avg_pressure': float(df['Pressure'].mean()),
-        'avg_temperature': float(df['Temperature'].mean()),
-        'min_flowrate': float(df['Flowrate'].min()),
-        'max_flowrate': float(df['Flowrate'].max()),
-        'min_pressure': float(df['Pressure'].min()),
-        'max_pressure': float(df['Pressure'].max()),
-        'min_temperature': float(df['Temperature'].min()),
-        'max_temperature': float(df['Temperature'].max()),
-        'equipment_type_distribution': df['Type'].value_counts().to_dict(),
-    }
-    
-    # Add statistics by equipment type
-    type_stats = {}
-    for equipment_type in df['Type'].unique():
-        type_df = df[df['Type'] == equipment_type]
-        type_stats[equipment_type] = {
-            'count': len(type_df),
-            'avg_flowrate': float(type_df['Flowrate'].mean()),
-            'avg_pressure': float(type_df['Pressure'].mean()),
-            'avg_temperature': float(type_df['Temperature'].mean()),
-        }
-    
-    analysis['statistics_by_type'] = type_stats
-    
-    return analysis
-
-
 def generate_pdf_report(dataset, filepath: str) -> bool:
     """
     Generate a PDF report for a dataset with summary statistics and equipment details.
@@ -173,6 +71,13 @@ def generate_pdf_report(dataset, filepath: str) -> bool:
     Returns:
         Boolean indicating success
     """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+    from reportlab.lib.enums import TA_CENTER, TA_LEFT
+    
     try:
         doc = SimpleDocTemplate(filepath, pagesize=letter)
         story = []
@@ -275,14 +180,73 @@ def generate_pdf_report(dataset, filepath: str) -> bool:
         return False
 
 
-def convert_dataframe_to_list(df: pd.DataFrame) -> List[Dict[str, Any]]:
+def get_pdf_report(dataset):
     """
-    Convert DataFrame to list of dictionaries for JSON serialization.
+    Return the path of the PDF report of a dataset, generating it if needed.
+    
+    Reports are kept in MEDIA_ROOT/reports and regenerated only when missing
+    or older than the dataset, so repeated and resumed downloads get the
+    same file. A new report is renamed into place once complete, so a
+    concurrent download never reads a partial one.
     
-    Args:
-        df: Pandas DataFrame
-        
     Returns:
-        List of dictionaries
+        Path of the report, or None if it could not be generated
     """
-    return df.to_dict('records')
+    reports_dir = os.path.join(settings.MEDIA_ROOT, 'reports')
+    os.makedirs(reports_dir, exist_ok=True)
+    pdf_path = os.path.join(reports_dir, f"report_{dataset.id}_{dataset.filename.replace('.csv', '')}.pdf")
+    try:
+        # SQLite may reuse the id of a deleted dataset
+        if os.path.getmtime(pdf_path) >= dataset.uploaded_at.timestamp():
+            return pdf_path
+    except OSError:
+        pass
+    
+    tmp_path = f"{pdf_path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    if not generate_pdf_report(dataset, tmp_path):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+    os.replace(tmp_path, pdf_path)
+    return pdf_path
+
+
+def get_dataset_analysis(dataset):
+    """
+    Return the analyze_equipment_data() result for a stored dataset.
+    
+    Computed from raw_data when the dataset kept it; datasets stored without
+    it (chunked uploads over RAW_DATA_MAX_ROWS rows) are aggregated from
+    their equipment rows in the database instead.
+    
+    Returns:
+        Analysis dictionary, or None if the dataset has no rows
+    """
+    if dataset.raw_data:
+        import pandas as pd
+        from equipment_analysis import analyze_equipment_data
+        return analyze_equipment_data(pd.DataFrame(dataset.raw_data))
+    
+    from django.db.models import Avg, Count, Max, Min
+    from .models import EquipmentData
+    rows = EquipmentData.objects.filter(dataset_id=dataset.id)
+    columns = ('flowrate', 'pressure', 'temperature')
+    aggregates = {'total_count': Count('id')}
+    for column in columns:
+        aggregates[f'avg_{column}'] = Avg(column)
+    for column in columns:
+        aggregates[f'min_{column}'] = Min(column)
+        aggregates[f'max_{column}'] = Max(column)
+    analysis = rows.aggregate(**aggregates)
+    if not analysis['total_count']:
+        return None
+    
+    by_type = rows.values('equipment_type').annotate(
+        count=Count('id'), **{f'avg_{column}': Avg(column) for column in columns}
+    ).order_by('-count', 'equipment_type')
+    analysis['equipment_type_distribution'] = {row['equipment_type']: row['count'] for row in by_type}
+    analysis['statistics_by_type'] = {
+        row['equipment_type']: {key: value for key, value in row.items() if key != 'equipment_type'}
+        for row in by_type
+    }
+    return analysis
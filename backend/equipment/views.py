@@ -3,8 +3,10 @@ API Views for the Equipment application.
 Implements REST endpoints for CSV upload, data analysis, and dataset management.
 """
 
-from rest_framework import viewsets, status, permissions
+from rest_framework import viewsets, mixins, status, permissions
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
@@ -12,33 +14,138 @@ from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
 from django.db.models import Q
 from django.conf import settings
-from django.http import FileResponse, HttpResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+import hmac
 import os
 
-from .models import Dataset, EquipmentData
+from .batch_upload import BatchError, ingest_batch
+from .chunked_upload import (
+    ChunkError, UploadExpired, create_storage, delete_storage, processing_stalled,
+    received_chunks, start_processing, touch_heartbeat, write_chunk
+)
+from .export import EXPORT_FORMATS, ExportUnavailable
+from .events import (
+    issue_ticket, open_thread_stream, parse_last_event_id, publish, request_token, stream_response,
+    ticket_user_id, too_many_streams_response
+)
+from .ingest import IngestError, ingest_csv
+from .models import Dataset, DatasetEvent, EquipmentData, UploadSession
+from .pagination import DatasetCursorPagination, EquipmentRowPagination
 from .serializers import (
     DatasetSerializer, DatasetSummarySerializer, EquipmentDataSerializer,
-    CSVUploadSerializer, UserSerializer, UserRegistrationSerializer
-)
-from .utils import (
-    parse_csv_file, analyze_equipment_data, generate_pdf_report,
-    convert_dataframe_to_list
+    CSVUploadSerializer, UploadSessionSerializer, UserSerializer, UserRegistrationSerializer
 )
+from .files import serve_file
+from .utils import get_dataset_analysis, get_pdf_report
+from .metrics import render_metrics
+from .profiling import ProfiledAuthenticationMixin, profile_phase
+
+
+class SparseFieldsMixin:
+    """
+    Shape dataset responses with ``?fields=``, ``?exclude=`` and ``?expand=``.
+    
+    Each takes comma-separated DatasetSerializer field names. ``fields``
+    picks exactly the fields returned, ``exclude`` drops fields and ``expand``
+    adds fields left out by default (``equipment_items`` in lists). The
+    ``analysis`` section of summary and batch responses is selected the same
+    way. ``id`` is always returned. The selection also narrows the queryset:
+    only the columns of the selected fields are loaded, and related rows are
+    fetched only when they are serialized.
+    """
+    shaped_actions = {'list', 'retrieve', 'history', 'summary', 'batch'}
+    list_actions = {'list', 'history', 'batch'}
+    # Sections that are computed rather than read from a column
+    analysis_actions = {'summary', 'batch'}
+    # Serializer fields backed by something other than a column of their own name
+    field_columns = {'user_username': ['user__username'], 'equipment_items': []}
+    
+    @staticmethod
+    def _names(value):
+        return [name.strip() for name in (value or '').split(',') if name.strip()]
+    
+    def get_field_names(self):
+        """Fields of this response, in serializer order; 'analysis' included if selected."""
+        if getattr(self, '_field_names', None) is None:
+            available = list(DatasetSerializer.Meta.fields)
+            if self.action in self.analysis_actions:
+                available.append('analysis')
+            if self.action in self.list_actions:
+                default = DatasetSummarySerializer.Meta.fields
+            else:
+                default = DatasetSerializer.Meta.fields
+            if self.action in self.analysis_actions:
+                default = [*default, 'analysis']
+            
+            params = self.request.query_params
+            fields, exclude, expand = (self._names(params.get(name)) for name in ('fields', 'exclude', 'expand'))
+            unknown = sorted(set(fields + exclude + expand) - set(available))
+            if unknown:
+                raise ValidationError({'fields': [f"Unknown field: {name}" for name in unknown]})
+            
+            selected = set(fields) if fields else set(default) | set(expand)
+            selected = (selected - set(exclude)) | {'id'}
+            self._field_names = [name for name in available if name in selected]
+        return self._field_names
+    
+    def wants_analysis(self):
+        return 'analysis' in self.get_field_names()
+    
+    def shape_queryset(self, queryset):
+        """Load only what the selected fields need; other actions get full rows."""
+        if self.action not in self.shaped_actions:
+            return queryset
+        names = self.get_field_names()
+        columns = {'id'}
+        for name in names:
+            if name != 'analysis':
+                columns.update(self.field_columns.get(name, [name]))
+        if 'analysis' in names:
+            columns.add('raw_data')
+        if self.action in ('list', 'history'):
+            # The cursor of the next page is read from the ordering column
+            columns.add('uploaded_at')
+        if 'user_username' in names:
+            queryset = queryset.select_related('user')
+        if 'equipment_items' in names:
+            queryset = queryset.prefetch_related('equipment_items')
+        return queryset.only(*columns)
+    
+    def get_serializer(self, *args, **kwargs):
+        if self.action in self.shaped_actions:
+            fields = [name for name in self.get_field_names() if name != 'analysis']
+            kwargs.setdefault('context', self.get_serializer_context())
+            return DatasetSerializer(*args, fields=fields, **kwargs)
+        return super().get_serializer(*args, **kwargs)
 
 
-class DatasetViewSet(viewsets.ModelViewSet):
+class DatasetViewSet(SparseFieldsMixin, ProfiledAuthenticationMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing datasets.
     Provides CRUD operations and custom actions for CSV upload and PDF generation.
     """
     serializer_class = DatasetSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = DatasetCursorPagination
     
     def get_queryset(self):
         """Return datasets for the current user only."""
-        return Dataset.objects.filter(user=self.request.user)
+        queryset = Dataset.objects.filter(user=self.request.user)
+        if self.action in ('equipment', 'export', 'generate_pdf', 'download_csv'):
+            # raw_data is as large as the upload; these actions read the rows,
+            # or only a file that is already on disk
+            queryset = queryset.defer('raw_data')
+        return self.shape_queryset(queryset)
+    
+    def perform_content_negotiation(self, request, force=False):
+        # ?format= of export names the file format, not a DRF renderer;
+        # its error responses are JSON
+        if self.action == 'export':
+            return (JSONRenderer(), JSONRenderer.media_type)
+        return super().perform_content_negotiation(request, force)
     
     def get_serializer_class(self):
         """Use summary serializer for list view."""
@@ -46,6 +153,11 @@ class DatasetViewSet(viewsets.ModelViewSet):
             return DatasetSummarySerializer
         return DatasetSerializer
     
+    def perform_destroy(self, instance):
+        dataset_id, filename = instance.id, instance.filename
+        super().perform_destroy(instance)
+        publish(self.request.user, DatasetEvent.TYPE_DATASET_DELETED, dataset_id, filename=filename)
+    
     @swagger_auto_schema(
         method='post',
         request_body=CSVUploadSerializer,
@@ -70,66 +182,88 @@ class DatasetViewSet(viewsets.ModelViewSet):
         
         uploaded_file = serializer.validated_data['file']
         
-        # Parse CSV file
-        df, error_msg = parse_csv_file(uploaded_file)
-        if df is None:
+        try:
+            dataset, analysis = ingest_csv(request.user, uploaded_file)
+        except IngestError as e:
             return Response(
-                {'success': False, 'error': error_msg},
+                {'success': False, 'error': str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Analyze data
-        analysis = analyze_equipment_data(df)
-        
-        # Create dataset
-        dataset = Dataset.objects.create(
-            user=request.user,
-            filename=uploaded_file.name,
-            file=uploaded_file,
-            total_count=analysis['total_count'],
-            avg_flowrate=analysis['avg_flowrate'],
-            avg_pressure=analysis['avg_pressure'],
-            avg_temperature=analysis['avg_temperature'],
-            equipment_type_distribution=analysis['equipment_type_distribution'],
-            raw_data=convert_dataframe_to_list(df)
-        )
-        
-        # Create equipment data entries
-        equipment_items = []
-        for _, row in df.iterrows():
-            equipment_items.append(EquipmentData(
-                dataset=dataset,
-                equipment_name=row['Equipment Name'],
-                equipment_type=row['Type'],
-                flowrate=row['Flowrate'],
-                pressure=row['Pressure'],
-                temperature=row['Temperature']
-            ))
-        
-        EquipmentData.objects.bulk_create(equipment_items)
-        
-        # Manage dataset history - keep only last 5
-        user_datasets = Dataset.objects.filter(user=request.user).order_by('-uploaded_at')
-        if user_datasets.count() > settings.MAX_STORED_DATASETS:
-            datasets_to_delete = user_datasets[settings.MAX_STORED_DATASETS:]
-            for old_dataset in datasets_to_delete:
-                # Delete associated file
-                if old_dataset.file:
-                    old_dataset.file.delete()
-                old_dataset.delete()
-        
         # Return created dataset with full details
-        response_serializer = DatasetSerializer(dataset)
+        with profile_phase('serialize'):
+            response_data = DatasetSerializer(dataset).data
         return Response(
             {
                 'success': True,
                 'message': 'CSV file uploaded and processed successfully',
-                'data': response_serializer.data,
+                'data': response_data,
                 'analysis': analysis
             },
             status=status.HTTP_201_CREATED
         )
     
+    @swagger_auto_schema(
+        method='post',
+        manual_parameters=[
+            openapi.Parameter('files', openapi.IN_FORM, type=openapi.TYPE_FILE, required=True,
+                              description='CSV files (.csv, .csv.gz) or ZIP archives of them; repeat the field for each file'),
+        ],
+        consumes=['multipart/form-data'],
+        responses={
+            201: openapi.Response('One result per CSV file, in upload order; at least one was stored'),
+            200: openapi.Response('One result per CSV file, in upload order; none was stored'),
+            400: 'No files, or too many files'
+        }
+    )
+    @action(detail=False, methods=['post'])
+    def upload_batch(self, request):
+        """
+        Upload several CSV files, or ZIP archives of them, in one request.
+        Files are parsed and analyzed in parallel worker processes; each one
+        succeeds or fails on its own. History is pruned once the batch is
+        stored; files it removes again are reported with ``pruned``.
+        """
+        uploaded_files = request.FILES.getlist('files')
+        if not uploaded_files:
+            return Response(
+                {'success': False, 'error': 'No files provided'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            results = ingest_batch(request.user, uploaded_files)
+        except BatchError as e:
+            return Response(
+                {'success': False, 'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        with profile_phase('serialize'):
+            data = [
+                {'filename': result['filename'], 'success': True,
+                 'data': DatasetSummarySerializer(result['dataset']).data}
+                if 'dataset' in result else
+                {'filename': result['filename'], 'success': False, 'error': result['error'],
+                 **({'pruned': True} if result.get('pruned') else {})}
+                for result in results
+            ]
+        uploaded = sum(1 for result in data if result['success'])
+        pruned = sum(1 for result in data if result.get('pruned'))
+        message = f'{uploaded} of {len(data)} files uploaded and processed successfully'
+        if pruned:
+            message += (f'; {pruned} more were stored and then removed, as only the newest '
+                        f'{settings.MAX_STORED_DATASETS} datasets are kept')
+        return Response(
+            {
+                'success': True,
+                'message': message,
+                'data': {'results': data, 'uploaded': uploaded, 'pruned': pruned,
+                         'failed': len(data) - uploaded - pruned}
+            },
+            status=status.HTTP_201_CREATED if uploaded else status.HTTP_200_OK
+        )
+    
     @swagger_auto_schema(
         method='get',
         responses={200: DatasetSummarySerializer(many=True)}
@@ -137,20 +271,77 @@ class DatasetViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def history(self, request):
         """
-        Get upload history (last 5 datasets with summaries).
+        Get upload history, newest first, one cursor page at a time.
         """
-        datasets = self.get_queryset()[:settings.MAX_STORED_DATASETS]
-        serializer = DatasetSummarySerializer(datasets, many=True)
+        datasets = self.paginate_queryset(self.get_queryset())
+        with profile_phase('serialize'):
+            data = self.get_serializer(datasets, many=True).data
         return Response({
             'success': True,
-            'count': len(serializer.data),
-            'data': serializer.data
+            'count': len(data),
+            'next': self.paginator.get_next_link(),
+            'previous': self.paginator.get_previous_link(),
+            'data': data
+        })
+    
+    @swagger_auto_schema(
+        method='get',
+        manual_parameters=[
+            openapi.Parameter('ids', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True,
+                              description='Comma-separated dataset ids'),
+        ],
+        responses={
+            200: openapi.Response('Summaries and analyses, in the order requested'),
+            400: 'Missing, invalid or too many ids'
+        }
+    )
+    @action(detail=False, methods=['get'])
+    def batch(self, request):
+        """
+        Get summaries and analyses for several datasets in one request.
+        Ids that do not exist or belong to another user are listed in ``missing``.
+        """
+        try:
+            ids = [int(value) for value in request.query_params.get('ids', '').split(',') if value.strip()]
+        except ValueError:
+            return Response(
+                {'success': False, 'error': 'ids must be a comma-separated list of integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return Response(
+                {'success': False, 'error': 'ids is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(ids) > settings.MAX_BATCH_IDS:
+            return Response(
+                {'success': False, 'error': f'At most {settings.MAX_BATCH_IDS} ids per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        datasets = self.get_queryset().in_bulk(ids)
+        found = [datasets[pk] for pk in ids if pk in datasets]
+        with profile_phase('serialize'):
+            items = [{'dataset': summary} for summary in self.get_serializer(found, many=True).data]
+        if self.wants_analysis():
+            with profile_phase('analyze'):
+                for item, dataset in zip(items, found):
+                    item['analysis'] = get_dataset_analysis(dataset)
+        
+        return Response({
+            'success': True,
+            'count': len(found),
+            'data': items,
+            'missing': [pk for pk in ids if pk not in datasets]
         })
     
     @swagger_auto_schema(
         method='get',
         responses={
             200: 'PDF file',
+            206: 'Requested byte range of the PDF file',
+            304: 'Not modified (If-None-Match / If-Modified-Since)',
             404: 'Dataset not found'
         }
     )
@@ -158,20 +349,14 @@ class DatasetViewSet(viewsets.ModelViewSet):
     def generate_pdf(self, request, pk=None):
         """
         Generate and download a PDF report for a specific dataset.
+        Supports Range and conditional requests; the report is kept between downloads.
         """
         dataset = self.get_object()
         
-        # Create media directory if it doesn't exist
-        reports_dir = os.path.join(settings.MEDIA_ROOT, 'reports')
-        os.makedirs(reports_dir, exist_ok=True)
-        
-        # Generate PDF
-        pdf_filename = f"report_{dataset.id}_{dataset.filename.replace('.csv', '')}.pdf"
-        pdf_path = os.path.join(reports_dir, pdf_filename)
+        with profile_phase('pdf'):
+            pdf_path = get_pdf_report(dataset)
         
-        success = generate_pdf_report(dataset, pdf_path)
-        
-        if not success:
+        if pdf_path is None:
             return Response(
                 {'success': False, 'error': 'Failed to generate PDF report'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -179,18 +364,139 @@ class DatasetViewSet(viewsets.ModelViewSet):
         
         # Return PDF file
         try:
-            return FileResponse(
-                open(pdf_path, 'rb'),
-                content_type='application/pdf',
-                as_attachment=True,
-                filename=pdf_filename
-            )
-        except Exception as e:
+            return serve_file(request, pdf_path, os.path.basename(pdf_path), content_type='application/pdf')
+        except OSError as e:
             return Response(
                 {'success': False, 'error': f'Failed to serve PDF: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
+    @swagger_auto_schema(
+        method='get',
+        responses={
+            200: 'The CSV file as uploaded',
+            206: 'Requested byte range of the file',
+            304: 'Not modified (If-None-Match / If-Modified-Since)',
+            404: 'Dataset not found, or no file stored for it'
+        }
+    )
+    @action(detail=True, methods=['get'])
+    def download_csv(self, request, pk=None):
+        """
+        Download the CSV file of a dataset as it was uploaded.
+        Supports Range and conditional requests.
+        """
+        dataset = self.get_object()
+        try:
+            return serve_file(request, dataset.file.path, dataset.filename)
+        except (ValueError, FileNotFoundError):
+            # No file attached, or it is gone from storage
+            return Response(
+                {'success': False, 'error': 'No stored file for this dataset'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+    
+    @swagger_auto_schema(
+        method='get',
+        manual_parameters=[
+            openapi.Parameter('page', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+        ],
+        responses={200: EquipmentDataSerializer(many=True)}
+    )
+    @action(detail=True, methods=['get'], pagination_class=EquipmentRowPagination)
+    def equipment(self, request, pk=None):
+        """
+        Page through the equipment rows of a dataset.
+        """
+        dataset = self.get_object()
+        queryset = EquipmentData.objects.filter(dataset=dataset).order_by('id')
+        page = self.paginate_queryset(queryset)
+        with profile_phase('serialize'):
+            data = EquipmentDataSerializer(page, many=True).data
+        return self.get_paginated_response(data)
+    
+    @swagger_auto_schema(
+        method='get',
+        manual_parameters=[
+            openapi.Parameter('format', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              enum=list(EXPORT_FORMATS), default='csv'),
+        ],
+        responses={
+            200: 'Equipment rows as a CSV, NDJSON or Parquet file',
+            400: 'Unsupported format',
+            501: 'Parquet requested but pyarrow is not installed'
+        }
+    )
+    @action(detail=True, methods=['get'])
+    def export(self, request, pk=None):
+        """
+        Stream all equipment rows of a dataset as CSV, NDJSON or Parquet.
+        """
+        export_format = request.query_params.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'success': False, 'error': f"Unsupported format '{export_format}'; use one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        dataset = self.get_object()
+        encode, content_type, extension = EXPORT_FORMATS[export_format]
+        try:
+            chunks = encode(dataset)
+        except ExportUnavailable as e:
+            return Response(
+                {'success': False, 'error': str(e)},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+        
+        name = dataset.filename.removesuffix('.gz').removesuffix('.csv')
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = content_disposition_header(True, f'{name}.{extension}')
+        return response
+    
+    @swagger_auto_schema(
+        method='get',
+        manual_parameters=[
+            openapi.Parameter('max_points', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+            openapi.Parameter('bins', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+        ],
+        responses={200: openapi.Response('Downsampled per-equipment series and histograms')}
+    )
+    @action(detail=True, methods=['get'])
+    def series(self, request, pk=None):
+        """
+        Get downsampled flowrate/pressure/temperature series and full-data
+        histograms for scatter and histogram charts.
+        """
+        dataset = self.get_object()
+        try:
+            max_points = min(int(request.query_params.get('max_points', 5000)), 50000)
+            bins = min(int(request.query_params.get('bins', 50)), 500)
+        except ValueError:
+            return Response(
+                {'success': False, 'error': 'max_points and bins must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if max_points < 1 or bins < 1:
+            return Response(
+                {'success': False, 'error': 'max_points and bins must be positive'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        with profile_phase('analyze'):
+            import pandas as pd
+            from equipment_analysis import build_parameter_series
+            rows = EquipmentData.objects.filter(dataset=dataset).order_by('id').values_list(
+                'equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature'
+            )
+            df = pd.DataFrame.from_records(
+                rows.iterator(chunk_size=10000),
+                columns=['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+            )
+            series = build_parameter_series(df, max_points=max_points, bins=bins)
+        
+        return Response({'success': True, 'dataset_id': dataset.id, **series})
+    
     @swagger_auto_schema(
         method='get',
         responses={200: openapi.Response('Dataset summary with analysis')}
@@ -201,23 +507,180 @@ class DatasetViewSet(viewsets.ModelViewSet):
         Get detailed summary and analysis for a specific dataset.
         """
         dataset = self.get_object()
-        serializer = self.get_serializer(dataset)
+        with profile_phase('serialize'):
+            dataset_data = self.get_serializer(dataset).data
+        response_data = {'success': True, 'dataset': dataset_data}
         
         # Recreate analysis from stored data
-        df_dict = dataset.raw_data
-        import pandas as pd
-        df = pd.DataFrame(df_dict)
+        if self.wants_analysis():
+            with profile_phase('analyze'):
+                response_data['analysis'] = get_dataset_analysis(dataset)
+        
+        return Response(response_data)
+
+
+class UploadSessionViewSet(ProfiledAuthenticationMixin,
+                          mixins.CreateModelMixin,
+                          mixins.RetrieveModelMixin,
+                          mixins.DestroyModelMixin,
+                          viewsets.GenericViewSet):
+    """
+    Resumable chunked CSV uploads.
+    
+    POST a filename and total_size to start, PUT each chunk body to
+    chunks/<n>/ with its SHA-256 in the X-Chunk-SHA256 header, GET the session
+    to see which chunks arrived, then POST finalize/ to create the dataset in
+    the background.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        """Return upload sessions for the current user only."""
+        return UploadSession.objects.filter(user=self.request.user)
+    
+    def get_object(self):
+        session = super().get_object()
+        if session.status == UploadSession.STATUS_ACTIVE and session.is_expired():
+            delete_storage(session)
+            session.delete()
+            raise UploadExpired()
+        if session.status == UploadSession.STATUS_PROCESSING and processing_stalled(session):
+            # The process ingesting it died; let the client finalize again
+            UploadSession.objects.filter(
+                pk=session.pk, status=UploadSession.STATUS_PROCESSING
+            ).update(status=UploadSession.STATUS_ACTIVE, error='Processing was interrupted; finalize the upload again')
+            session.refresh_from_db()
+        return session
+    
+    def perform_create(self, serializer):
+        # Sessions left behind by dropped clients are removed lazily
+        for stale in self.get_queryset().filter(status=UploadSession.STATUS_ACTIVE):
+            if stale.is_expired():
+                delete_storage(stale)
+                stale.delete()
+        session = serializer.save(user=self.request.user, chunk_size=settings.CHUNKED_UPLOAD_CHUNK_SIZE)
+        create_storage(session)
+    
+    def create(self, request, *args, **kwargs):
+        """Start a resumable upload."""
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                {'success': False, 'errors': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        self.perform_create(serializer)
+        return Response({'success': True, 'data': serializer.data}, status=status.HTTP_201_CREATED)
+    
+    def retrieve(self, request, *args, **kwargs):
+        """Get upload status, including the chunk numbers received so far."""
+        return Response({'success': True, 'data': self.get_serializer(self.get_object()).data})
+    
+    def perform_destroy(self, instance):
+        delete_storage(instance)
+        instance.delete()
+    
+    @swagger_auto_schema(
+        method='put',
+        manual_parameters=[
+            openapi.Parameter('X-Chunk-SHA256', openapi.IN_HEADER, type=openapi.TYPE_STRING, required=True),
+        ],
+        responses={200: 'Chunk stored', 400: 'Length or checksum mismatch', 409: 'Upload is not active'}
+    )
+    @action(detail=True, methods=['put'], url_path=r'chunks/(?P<index>\d+)')
+    def chunk(self, request, pk=None, index=None):
+        """
+        Store one chunk. The raw request body is streamed to disk; re-sending
+        a chunk simply overwrites it.
+        """
+        session = self.get_object()
+        if session.status != UploadSession.STATUS_ACTIVE:
+            return Response(
+                {'success': False, 'error': f'Upload is {session.status}'},
+                status=status.HTTP_409_CONFLICT
+            )
+        index = int(index)
+        if index >= session.total_chunks:
+            return Response(
+                {'success': False, 'error': f'Chunk index must be below {session.total_chunks}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        sha256 = request.headers.get('X-Chunk-SHA256', '')
+        if not sha256:
+            return Response(
+                {'success': False, 'error': 'X-Chunk-SHA256 header is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        analysis = analyze_equipment_data(df)
+        try:
+            write_chunk(session, index, request._request, sha256)
+        except ChunkError as e:
+            return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        return Response({
-            'success': True,
-            'dataset': serializer.data,
-            'analysis': analysis
-        })
+        publish(
+            request.user, DatasetEvent.TYPE_UPLOAD_PROGRESS,
+            upload_id=str(session.id), filename=session.filename,
+            received_chunks=len(received_chunks(session)), total_chunks=session.total_chunks
+        )
+        return Response({'success': True, 'index': index})
+    
+    @swagger_auto_schema(
+        method='post',
+        responses={
+            202: UploadSessionSerializer,
+            400: 'Missing chunks',
+            409: 'Upload is not active'
+        }
+    )
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        """
+        Verify that every chunk arrived and start ingesting the assembled file.
+        
+        Ingesting runs in the background: poll the session until its status
+        is complete (with the dataset id) or failed (with the error), or wait
+        for the dataset.created or upload.failed event. A checksum mismatch
+        sets the session back to active with the error.
+        """
+        session = self.get_object()
+        if session.status != UploadSession.STATUS_ACTIVE:
+            return Response(
+                {'success': False, 'error': f'Upload is {session.status}'},
+                status=status.HTTP_409_CONFLICT
+            )
+        missing = sorted(set(range(session.total_chunks)) - set(received_chunks(session)))
+        if missing:
+            return Response(
+                {'success': False, 'error': 'Upload is incomplete', 'missing_chunks': missing},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Claim the session so a repeated finalize cannot ingest it twice; the
+        # heartbeat comes first so the claimed session never looks stalled
+        touch_heartbeat(session)
+        claimed = UploadSession.objects.filter(
+            pk=session.pk, status=UploadSession.STATUS_ACTIVE
+        ).update(status=UploadSession.STATUS_PROCESSING, error='')
+        if not claimed:
+            return Response(
+                {'success': False, 'error': f'Upload is {session.status}'},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        start_processing(session)
+        session.refresh_from_db()
+        return Response(
+            {
+                'success': True,
+                'message': 'Upload accepted for processing',
+                'data': self.get_serializer(session).data
+            },
+            status=status.HTTP_202_ACCEPTED
+        )
 
 
-class AuthViewSet(viewsets.ViewSet):
+class AuthViewSet(ProfiledAuthenticationMixin, viewsets.ViewSet):
     """
     ViewSet for authentication operations.
     Handles user registration, login, and logout.
@@ -336,3 +799,77 @@ def health_check(request):
         'status': 'healthy',
         'message': 'Chemical Equipment Visualizer API is running'
     })
+
+
+def dataset_events(request):
+    """
+    Server-Sent Events stream of the user's dataset and upload events.
+    
+    Takes the token from the Authorization header or, for EventSource
+    clients, a ticket from events/ticket/ as the ``ticket`` query
+    parameter. The stream ends after
+    EVENT_STREAM_SECONDS and the client reconnects with Last-Event-ID.
+    Each stream holds a server thread, so a process serves at most
+    EVENT_STREAM_MAX_THREADS at once and answers 503 above that.
+    """
+    if request.method != 'GET':
+        return JsonResponse(
+            {'success': False, 'errors': [f'detail: Method "{request.method}" not allowed.'], 'status_code': 405},
+            status=405
+        )
+    key = request_token(request)
+    if key:
+        token = Token.objects.select_related('user').filter(key=key).first()
+        user = token.user if token else None
+    else:
+        user_id = ticket_user_id(request)
+        user = User.objects.filter(pk=user_id).first() if user_id else None
+    if user is None or not user.is_active:
+        response = JsonResponse(
+            {'success': False, 'errors': ['detail: Authentication credentials were not provided.'],
+             'status_code': 401},
+            status=401
+        )
+        response['WWW-Authenticate'] = 'Token'
+        return response
+    
+    stream = open_thread_stream(user.id, parse_last_event_id(request))
+    if stream is None:
+        return too_many_streams_response()
+    return stream_response(stream)
+
+
+@swagger_auto_schema(
+    method='post',
+    responses={200: 'Event stream ticket'}
+)
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def events_ticket(request):
+    """
+    Issue a ticket for the ``ticket`` parameter of events/, for EventSource
+    clients, which cannot send the token header. It is valid for
+    EVENT_TICKET_SECONDS and opens the user's event stream only.
+    """
+    return Response({
+        'success': True,
+        'ticket': issue_ticket(request.user),
+        'expires_in': settings.EVENT_TICKET_SECONDS
+    })
+
+
+def metrics(request):
+    """
+    Prometheus metrics endpoint.
+    Served only when METRICS_AUTH_TOKEN is configured, to requests bearing it.
+    """
+    token = settings.METRICS_AUTH_TOKEN
+    if not token:
+        return HttpResponse('Not Found', status=404, content_type='text/plain')
+    # compare_digest accepts only ASCII str; any header can be sent
+    provided = request.headers.get('Authorization', '').encode()
+    if not hmac.compare_digest(provided, f'Bearer {token}'.encode()):
+        return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+    
+    payload, content_type = render_metrics()
+    return HttpResponse(payload, content_type=content_type)
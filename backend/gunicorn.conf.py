@@ -0,0 +1,19 @@
+"""
+Gunicorn configuration for Chemical Equipment Visualizer.
+"""
+
+import os
+
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 2))
+# Threaded workers: an open event stream holds one thread, not the worker, and
+# at most EVENT_STREAM_MAX_THREADS of them do
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+
+def child_exit(server, worker):
+    """Drop the metric files of a dead worker so gauges stay accurate."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -4,17 +4,61 @@ Handles all communication with Django backend
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.retry import Retry
+import hashlib
 import json
-from typing import Optional, Dict, Any
+import os
+import shutil
+import time
+from contextlib import ExitStack
+from urllib.parse import quote
+from typing import Optional, Dict, Any, Callable, Iterator, List, Tuple
+
+from services.cache_service import CacheService
+from services.upload_stream import MultipartStream, gzip_to_tempfile
+
+# Files above the server's single-request limit use the resumable protocol
+SINGLE_UPLOAD_LIMIT = 5 * 1024 * 1024
+# Files sent together in one request to the batch endpoint
+BATCH_UPLOAD_FILES = 10
+# Dataset summaries fetched together in one request to datasets/batch/
+BATCH_SUMMARY_IDS = 20
+# Columns of the history table; the server leaves the rest out of the list
+HISTORY_FIELDS = "id,filename,total_count,avg_flowrate,uploaded_at"
+# Summary fields, the same from summary/ and datasets/batch/ so either fills the cache;
+# the equipment rows are paged separately
+SUMMARY_FIELDS = ("id,filename,user_username,uploaded_at,total_count,avg_flowrate,"
+                  "avg_pressure,avg_temperature,equipment_type_distribution,analysis")
+# Connections a download may use before giving up; each resumes where the last stopped
+DOWNLOAD_RESUME_ATTEMPTS = 5
 
 
 class APIService:
     """Service class for API communication"""
     
-    def __init__(self, base_url: str = "http://localhost:8000/api"):
+    def __init__(self, base_url: str = "http://localhost:8000/api",
+                 cache: Optional[CacheService] = None, pool_size: int = 8):
         self.base_url = base_url
         self.token: Optional[str] = None
+        self.user_id: Optional[int] = None
         self.session = requests.Session()
+        # Keep-alive connections shared by the worker threads; idempotent
+        # requests are retried with backoff on connection errors and 502/503/504
+        retry = Retry(
+            total=3, connect=3, read=2, backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, pool_block=True,
+                              max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.cache = cache
+        self._batch_upload_supported: Optional[bool] = None
     
     def _get_headers(self) -> Dict[str, str]:
         """Get request headers with authentication token"""
@@ -31,6 +75,7 @@ class APIService:
         response.raise_for_status()
         result = response.json()
         self.token = result.get("token")
+        self.user_id = result.get("user", {}).get("id")
         return result
     
     def register(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -40,6 +85,7 @@ class APIService:
         response.raise_for_status()
         result = response.json()
         self.token = result.get("token")
+        self.user_id = result.get("user", {}).get("id")
         return result
     
     def logout(self) -> None:
@@ -50,41 +96,418 @@ class APIService:
                 self.session.post(url, headers=self._get_headers())
             finally:
                 self.token = None
+                self.user_id = None
     
-    def upload_csv(self, file_path: str) -> Dict[str, Any]:
-        """Upload CSV file"""
+    def upload_csv(self, file_path: str, compress: bool = False,
+                   progress_callback: Optional[Callable[[int, int], None]] = None,
+                   max_retries: int = 0) -> Dict[str, Any]:
+        """
+        Upload CSV file, streaming it in chunks.
+        With ``compress`` the file is gzipped on the fly and sent as .csv.gz.
+        Failed connection attempts are retried ``max_retries`` times; an
+        upload the server may have received is not, to avoid duplicates.
+        """
         url = f"{self.base_url}/datasets/upload_csv/"
-        headers = {}
-        if self.token:
-            headers["Authorization"] = f"Token {self.token}"
+        filename = os.path.basename(file_path)
         
         with open(file_path, 'rb') as f:
-            files = {'file': f}
-            response = self.session.post(url, files=files, headers=headers)
+            body_file = f
+            if compress:
+                # Progress runs once through compression, then through the upload
+                body_file = gzip_to_tempfile(f, progress_callback=progress_callback)
+                filename += '.gz'
+            try:
+                body = MultipartStream('file', filename, body_file,
+                                       content_type='application/gzip' if compress else 'text/csv',
+                                       progress_callback=progress_callback)
+                headers = self._get_headers()
+                headers["Content-Type"] = body.content_type
+                response = self._with_retries(
+                    lambda: self.session.post(url, data=body, headers=headers), max_retries,
+                    idempotent=False
+                )
+            finally:
+                if body_file is not f:
+                    body_file.close()
         
         response.raise_for_status()
         return response.json()
     
-    def get_history(self) -> Dict[str, Any]:
-        """Get dataset history"""
-        url = f"{self.base_url}/datasets/history/"
-        response = self.session.get(url, headers=self._get_headers())
+    def supports_batch_upload(self) -> bool:
+        """Whether the server offers the multi-file upload endpoint (probed once)"""
+        if self._batch_upload_supported is None:
+            # The endpoint is POST-only, so GET answers 405 if it exists; without
+            # it the path falls through to the dataset detail route and 404s
+            response = self.session.get(f"{self.base_url}/datasets/upload_batch/",
+                                        headers=self._get_headers())
+            if response.status_code == 404:
+                self._batch_upload_supported = False
+            elif response.status_code == 405:
+                self._batch_upload_supported = True
+            else:
+                response.raise_for_status()
+                self._batch_upload_supported = False
+        return self._batch_upload_supported
+    
+    def upload_batch(self, file_paths: List[str],
+                     progress_callback: Optional[Callable[[int, int], None]] = None,
+                     max_retries: int = 0) -> Dict[str, Any]:
+        """
+        Upload several CSV files in one streamed request to the batch endpoint.
+        The response lists one result per file, in the order sent. Retried
+        like upload_csv(), only when the request never reached the server.
+        """
+        url = f"{self.base_url}/datasets/upload_batch/"
+        with ExitStack() as stack:
+            files = [stack.enter_context(open(path, 'rb')) for path in file_paths]
+            body = MultipartStream('files', os.path.basename(file_paths[0]), files[0],
+                                   content_type='text/csv', progress_callback=progress_callback)
+            for path, f in zip(file_paths[1:], files[1:]):
+                body.add_file('files', os.path.basename(path), f, content_type='text/csv')
+            headers = self._get_headers()
+            headers["Content-Type"] = body.content_type
+            response = self._with_retries(
+                lambda: self.session.post(url, data=body, headers=headers), max_retries,
+                idempotent=False
+            )
+        
+        response.raise_for_status()
+        return response.json()
+    
+    def upload_csv_resumable(self, file_path: str,
+                             progress_callback: Optional[Callable[[int, int], None]] = None,
+                             max_retries: int = 5) -> Dict[str, Any]:
+        """
+        Upload a large CSV file in checksummed chunks.
+        
+        Dropped connections are retried with backoff, resending only the
+        chunks the server has not acknowledged. The upload id is kept in the
+        cache, so an interrupted or cancelled upload of the same unchanged
+        file resumes where it stopped, even after a restart.
+        """
+        stat = os.stat(file_path)
+        resume_key = self._cache_key(
+            f"upload:{os.path.abspath(file_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        )
+        
+        upload = None
+        upload_id = self.cache.get(resume_key)[0] if self.cache else None
+        if upload_id:
+            response = self._with_retries(
+                lambda: self.session.get(f"{self.base_url}/uploads/{upload_id.decode()}/",
+                                         headers=self._get_headers()),
+                max_retries
+            )
+            if response.ok and response.json()['data']['status'] == 'active':
+                upload = response.json()['data']
+        if upload is None:
+            response = self._with_retries(
+                lambda: self.session.post(f"{self.base_url}/uploads/", headers=self._get_headers(),
+                                          json={"filename": os.path.basename(file_path),
+                                                "total_size": stat.st_size}),
+                max_retries
+            )
+            response.raise_for_status()
+            upload = response.json()['data']
+            if self.cache:
+                self.cache.put(resume_key, upload['id'].encode())
+        
+        upload_url = f"{self.base_url}/uploads/{upload['id']}/"
+        chunk_size = upload['chunk_size']
+        received = set(upload['received_chunks'])
+        sent = sum(min(chunk_size, stat.st_size - i * chunk_size) for i in received)
+        if progress_callback:
+            progress_callback(sent, stat.st_size)
+        
+        with open(file_path, 'rb') as f:
+            for index in range(upload['total_chunks']):
+                if index in received:
+                    continue
+                f.seek(index * chunk_size)
+                chunk = f.read(chunk_size)
+                headers = self._get_headers()
+                headers["Content-Type"] = "application/octet-stream"
+                headers["X-Chunk-SHA256"] = hashlib.sha256(chunk).hexdigest()
+                response = self._with_retries(
+                    lambda: self.session.put(f"{upload_url}chunks/{index}/", data=chunk, headers=headers),
+                    max_retries
+                )
+                response.raise_for_status()
+                sent += len(chunk)
+                if progress_callback:
+                    progress_callback(sent, stat.st_size)
+        
+        response = self._with_retries(
+            lambda: self.session.post(f"{upload_url}finalize/", headers=self._get_headers()),
+            max_retries
+        )
+        # 409: a finalize whose response was lost has already claimed the upload
+        if response.status_code != 409:
+            response.raise_for_status()
+        upload = self._wait_for_processing(upload_url, stat.st_size, progress_callback, max_retries)
+        if upload['status'] != 'active' and self.cache:
+            self.cache.invalidate(resume_key)
+        if upload['status'] != 'complete':
+            # An upload set back to active (checksum mismatch, interrupted
+            # processing) is finalized again by the next attempt
+            raise requests.HTTPError(f"Processing {upload['filename']} failed: {upload['error']}")
+        return {
+            'success': True,
+            'message': 'CSV file uploaded and processed successfully',
+            'data': {'id': upload['dataset']}
+        }
+    
+    def _wait_for_processing(self, upload_url: str, size: int,
+                             progress_callback: Optional[Callable[[int, int], None]],
+                             max_retries: int) -> Dict[str, Any]:
+        """
+        Poll a finalized upload until the server has ingested it or given up,
+        and return its final state. Progress is reported as complete on every
+        poll, so a cancelled worker stops waiting.
+        """
+        delay = 0.5
+        while True:
+            response = self._with_retries(
+                lambda: self.session.get(upload_url, headers=self._get_headers()),
+                max_retries
+            )
+            response.raise_for_status()
+            upload = response.json()['data']
+            if upload['status'] != 'processing':
+                return upload
+            if progress_callback:
+                progress_callback(size, size)
+            time.sleep(delay)
+            delay = min(delay * 2, 5.0)
+    
+    def _with_retries(self, send: Callable[[], requests.Response], max_retries: int,
+                      idempotent: bool = True) -> requests.Response:
+        """
+        Call ``send`` again after connection errors and 5xx responses, with backoff.
+        
+        A request that is not ``idempotent`` (an upload creating datasets) is
+        only sent again if it never reached the server: after a timeout, a
+        dropped connection or a 5xx the server may have stored it already.
+        """
+        for attempt in range(max_retries + 1):
+            try:
+                response = send()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == max_retries or not (idempotent or self._not_sent(e)):
+                    raise
+            else:
+                if response.status_code < 500 or attempt == max_retries or not idempotent:
+                    return response
+            time.sleep(min(2 ** attempt, 30))
+    
+    @staticmethod
+    def _not_sent(error: requests.RequestException) -> bool:
+        """Whether a request failed before a connection to the server was made"""
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        reason = getattr(error.args[0], 'reason', None) if error.args else None
+        return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+    
+    def _cache_key(self, name: str) -> str:
+        """Cache key scoped to the server and the logged-in user"""
+        return f"{self.base_url}|{self.user_id}|{name}"
+    
+    def _cached_get(self, url: str, key: str) -> Dict[str, Any]:
+        """GET a JSON resource, revalidating a cached copy with If-None-Match"""
+        headers = self._get_headers()
+        cached_body, etag = self.cache.get(key) if self.cache else (None, None)
+        if cached_body is not None and etag:
+            headers["If-None-Match"] = etag
+        
+        response = self.session.get(url, headers=headers)
+        if response.status_code == 304 and cached_body is not None:
+            self.cache.touch(key)
+            return json.loads(cached_body)
         response.raise_for_status()
+        
+        if self.cache:
+            self.cache.put(key, response.content, response.headers.get("ETag"))
         return response.json()
     
-    def get_dataset_summary(self, dataset_id: int) -> Dict[str, Any]:
-        """Get detailed dataset summary"""
-        url = f"{self.base_url}/datasets/{dataset_id}/summary/"
-        response = self.session.get(url, headers=self._get_headers())
+    def get_cached(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return a cached JSON resource without touching the network"""
+        if not self.cache:
+            return None
+        body, _ = self.cache.get(self._cache_key(name))
+        return json.loads(body) if body is not None else None
+    
+    def get_history(self) -> Dict[str, Any]:
+        """Get dataset history (revalidated against the cache)"""
+        url = f"{self.base_url}/datasets/history/"
+        return self._cached_get(url, self._cache_key("history"))
+    
+    def get_datasets(self, cursor: str = "") -> Dict[str, Any]:
+        """Get one cursor page of the dataset list, the first if ``cursor`` is empty (revalidated against the cache)"""
+        url = f"{self.base_url}/datasets/?fields={HISTORY_FIELDS}"
+        if cursor:
+            url += f"&cursor={quote(cursor)}"
+        return self._cached_get(url, self._cache_key(f"datasets:cursor:{cursor}"))
+    
+    def get_equipment(self, dataset_id: int, page: int = 1, page_size: int = 500) -> Dict[str, Any]:
+        """Get one page of the equipment rows of a dataset"""
+        url = f"{self.base_url}/datasets/{dataset_id}/equipment/"
+        response = self.session.get(url, headers=self._get_headers(),
+                                    params={"page": page, "page_size": page_size})
         response.raise_for_status()
         return response.json()
     
-    def download_pdf(self, dataset_id: int, save_path: str) -> None:
-        """Download PDF report"""
+    def get_dataset_summary(self, dataset_id: int, revalidate: bool = False) -> Dict[str, Any]:
+        """
+        Get detailed dataset summary.
+        Datasets never change after upload, so a cached summary is returned
+        without a network round trip unless ``revalidate`` is set.
+        """
+        name = f"summary:{dataset_id}"
+        if not revalidate:
+            cached = self.get_cached(name)
+            if cached is not None:
+                return cached
+        url = f"{self.base_url}/datasets/{dataset_id}/summary/?fields={SUMMARY_FIELDS}"
+        return self._cached_get(url, self._cache_key(name))
+    
+    def get_dataset_series(self, dataset_id: int, max_points: int = 5000, bins: int = 50) -> Dict[str, Any]:
+        """Get downsampled per-equipment series and histograms for charting"""
+        name = f"series:{dataset_id}:{max_points}:{bins}"
+        cached = self.get_cached(name)
+        if cached is not None:
+            return cached
+        url = f"{self.base_url}/datasets/{dataset_id}/series/?max_points={max_points}&bins={bins}"
+        return self._cached_get(url, self._cache_key(name))
+    
+    def prefetch_summary(self, dataset_id: int) -> None:
+        """Fetch a dataset summary into the cache unless it is already there"""
+        if self.cache and self.get_cached(f"summary:{dataset_id}") is None:
+            self.get_dataset_summary(dataset_id, revalidate=True)
+    
+    def prefetch_summaries(self, dataset_ids: List[int]) -> None:
+        """
+        Fetch the summaries missing from the cache with one batch request
+        (at most BATCH_SUMMARY_IDS at a time), falling back to one request per
+        dataset on servers without the batch endpoint.
+        """
+        if not self.cache:
+            return
+        missing = [i for i in dataset_ids if self.get_cached(f"summary:{i}") is None]
+        url = f"{self.base_url}/datasets/batch/"
+        for start in range(0, len(missing), BATCH_SUMMARY_IDS):
+            ids = missing[start:start + BATCH_SUMMARY_IDS]
+            response = self.session.get(url, headers=self._get_headers(),
+                                        params={"ids": ",".join(str(i) for i in ids), "fields": SUMMARY_FIELDS})
+            if response.status_code == 404:
+                for dataset_id in ids:
+                    self.get_dataset_summary(dataset_id, revalidate=True)
+                continue
+            response.raise_for_status()
+            # Stored as the summary endpoint returns the same fields, without an ETag
+            for item in response.json()["data"]:
+                body = {"success": True, "dataset": item["dataset"], "analysis": item["analysis"]}
+                self.cache.put(self._cache_key(f"summary:{item['dataset']['id']}"), json.dumps(body).encode())
+    
+    def prefetch_pdf(self, dataset_id: int) -> None:
+        """Download a PDF report into the cache unless it is already there"""
+        if self.cache:
+            self.download_pdf(dataset_id, None)
+    
+    def _download_resumable(self, url: str, target, progress_callback=None) -> None:
+        """
+        Stream a file download to ``target``. A dropped connection resumes
+        from the bytes already written (Range with If-Range); if the file
+        changed meanwhile the server sends it whole and the download restarts.
+        """
+        done, total, etag = 0, 0, None
+        for attempt in range(DOWNLOAD_RESUME_ATTEMPTS):
+            headers = self._get_headers()
+            if done and etag:
+                headers["Range"] = f"bytes={done}-"
+                headers["If-Range"] = etag
+            try:
+                with self.session.get(url, headers=headers, stream=True) as response:
+                    response.raise_for_status()
+                    if response.status_code != 206:
+                        done = 0
+                        total = int(response.headers.get('Content-Length', 0))
+                        etag = response.headers.get('ETag')
+                    with open(target, 'ab' if done else 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=65536):
+                            f.write(chunk)
+                            done += len(chunk)
+                            if progress_callback:
+                                progress_callback(done, total)
+                return
+            except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError):
+                if etag is None or attempt == DOWNLOAD_RESUME_ATTEMPTS - 1:
+                    raise
+    
+    def download_pdf(self, dataset_id: int, save_path: Optional[str],
+                     progress_callback: Optional[Callable[[int, int], None]] = None) -> None:
+        """
+        Download PDF report, reporting (bytes_done, bytes_total) progress.
+        With no ``save_path`` the report is only stored in the cache.
+        """
+        key = self._cache_key(f"pdf:{dataset_id}")
+        cached_path = self.cache.get_file(key) if self.cache else None
+        if cached_path is not None:
+            if save_path:
+                shutil.copyfile(cached_path, save_path)
+            if progress_callback:
+                size = cached_path.stat().st_size
+                progress_callback(size, size)
+            return
+        
         url = f"{self.base_url}/datasets/{dataset_id}/generate_pdf/"
-        response = self.session.get(url, headers=self._get_headers(), stream=True)
-        response.raise_for_status()
+        target = self.cache.new_file_path('.pdf') if self.cache else save_path
+        try:
+            self._download_resumable(url, target, progress_callback)
+        except BaseException:
+            if self.cache:
+                target.unlink(missing_ok=True)
+            raise
+        
+        if self.cache:
+            cached_path = self.cache.put_file(key, target)
+            if save_path:
+                shutil.copyfile(cached_path, save_path)
+    
+    def stream_events(self, last_event_id: Optional[str] = None,
+                      read_timeout: float = 30) -> Iterator[Tuple[Optional[str], Optional[str], Any]]:
+        """
+        Follow the server's event stream until the server ends it, yielding
+        (event_id, event_type, data) for every message. Messages that only
+        carry an id have ``event_type`` None; pass the last id back in to resume.
         
-        with open(save_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        The stream has its own connection so it never holds one of the
+        session pool's connections.
+        """
+        # The async route holds no server thread under ASGI, and is capped like
+        # api/events/ under gunicorn
+        url = f"{self.base_url}/async/events/"
+        headers = {"Authorization": f"Token {self.token}", "Accept": "text/event-stream"}
+        if last_event_id is not None:
+            headers["Last-Event-ID"] = last_event_id
+        # The server sends a comment line at least every 15s, so a silent
+        # connection within read_timeout is a dead one
+        with requests.get(url, headers=headers, stream=True, timeout=(5, read_timeout)) as response:
+            response.raise_for_status()
+            event_id, event_type, data = last_event_id, None, []
+            # One byte at a time: a larger read would wait for more events to arrive
+            for line in response.iter_lines(chunk_size=1, decode_unicode=True):
+                if line:
+                    field, _, value = line.partition(':')
+                    value = value[1:] if value.startswith(' ') else value
+                    if field == 'id':
+                        event_id = value
+                    elif field == 'event':
+                        event_type = value
+                    elif field == 'data':
+                        data.append(value)
+                    continue
+                if data:
+                    yield event_id, event_type or 'message', json.loads('\n'.join(data))
+                elif event_id is not None:
+                    yield event_id, None, None
+                event_type, data = None, []
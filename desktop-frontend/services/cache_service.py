@@ -0,0 +1,147 @@
+"""
+Cache Service for Desktop Application
+Persistent, size-bounded LRU cache for API responses and downloaded files
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+
+def default_cache_dir() -> Path:
+    """Return the per-user cache directory for the application"""
+    if sys.platform == 'win32':
+        base = Path(os.environ.get('LOCALAPPDATA', Path.home() / 'AppData' / 'Local'))
+    elif sys.platform == 'darwin':
+        base = Path.home() / 'Library' / 'Caches'
+    else:
+        base = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache'))
+    return base / 'ChemicalEquipmentVisualizer'
+
+
+class CacheService:
+    """
+    SQLite-backed cache with least-recently-used eviction.
+
+    Response bodies are stored in the database; files (PDF reports) are
+    stored next to it and tracked in the same index, so both count against
+    ``max_bytes``. Safe to use from worker threads.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = 200 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.files_dir = self.cache_dir / 'files'
+        self.files_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.cache_dir / 'cache.sqlite3'), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, etag TEXT, body BLOB, file TEXT,"
+            " size INTEGER NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        self._db.commit()
+
+    def get(self, key: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """Return (body, etag) for a cached response, or (None, None)"""
+        with self._lock:
+            row = self._db.execute("SELECT body, etag FROM entries WHERE key = ? AND file IS NULL",
+                                   (key,)).fetchone()
+            if row is None:
+                return None, None
+            self._touch(key)
+            return row[0], row[1]
+
+    def put(self, key: str, body: bytes, etag: Optional[str] = None) -> None:
+        """Store a response body"""
+        with self._lock:
+            self._delete(key)
+            self._db.execute(
+                "INSERT INTO entries (key, etag, body, file, size, accessed_at) VALUES (?, ?, ?, NULL, ?, ?)",
+                (key, etag, body, len(body), time.time())
+            )
+            self._evict(keep=key)
+            self._db.commit()
+
+    def touch(self, key: str) -> None:
+        """Mark an entry as recently used (e.g. after a 304 revalidation)"""
+        with self._lock:
+            self._touch(key)
+
+    def get_file(self, key: str) -> Optional[Path]:
+        """Return the path of a cached file, or None"""
+        with self._lock:
+            row = self._db.execute("SELECT file FROM entries WHERE key = ? AND file IS NOT NULL",
+                                   (key,)).fetchone()
+            if row is None:
+                return None
+            path = self.files_dir / row[0]
+            if not path.exists():
+                self._delete(key)
+                self._db.commit()
+                return None
+            self._touch(key)
+            return path
+
+    def new_file_path(self, suffix: str = '') -> Path:
+        """Return a fresh path inside the cache for writing a file"""
+        return self.files_dir / f"{time.time_ns()}-{threading.get_ident()}{suffix}"
+
+    def put_file(self, key: str, path: Path) -> Path:
+        """Move a file written at ``path`` (inside the cache) under ``key``"""
+        path = Path(path)
+        if path.parent != self.files_dir:
+            target = self.new_file_path(path.suffix)
+            shutil.copyfile(path, target)
+            path = target
+        with self._lock:
+            self._delete(key)
+            self._db.execute(
+                "INSERT INTO entries (key, etag, body, file, size, accessed_at) VALUES (?, NULL, NULL, ?, ?, ?)",
+                (key, path.name, path.stat().st_size, time.time())
+            )
+            self._evict(keep=key)
+            self._db.commit()
+        return path
+
+    def invalidate(self, key: str) -> None:
+        """Remove an entry"""
+        with self._lock:
+            self._delete(key)
+            self._db.commit()
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        with self._lock:
+            for (name,) in self._db.execute("SELECT file FROM entries WHERE file IS NOT NULL").fetchall():
+                (self.files_dir / name).unlink(missing_ok=True)
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+
+    def _touch(self, key: str) -> None:
+        self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        self._db.commit()
+
+    def _delete(self, key: str) -> None:
+        row = self._db.execute("SELECT file FROM entries WHERE key = ?", (key,)).fetchone()
+        if row and row[0]:
+            (self.files_dir / row[0]).unlink(missing_ok=True)
+        self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def _evict(self, keep: str) -> None:
+        """Drop least recently used entries until within max_bytes, never ``keep``, the entry just written"""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute(
+                "SELECT key, size FROM entries WHERE key != ? ORDER BY accessed_at", (keep,)).fetchall():
+            self._delete(key)
+            total -= size
+            if total <= self.max_bytes:
+                break
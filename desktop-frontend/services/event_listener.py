@@ -0,0 +1,71 @@
+"""
+Event Listener for Desktop Application
+Follows the server's Server-Sent Events stream on a background thread
+"""
+
+import threading
+from typing import Optional
+
+import requests
+from PyQt5.QtCore import QObject, pyqtSignal
+
+# Seconds to wait before reconnecting after the server ended a stream
+RECONNECT_DELAY = 1
+# Upper bound on the backoff while the server is unreachable
+MAX_RECONNECT_DELAY = 60
+
+
+class EventListener(QObject):
+    """
+    Emits ``event_received(type, data)`` on the GUI thread for every event
+    in the user's stream.
+
+    The server ends each stream after a while; the listener reconnects with
+    the last event id, so no event is missed, and backs off while the server
+    is unreachable. The thread is a daemon: a read blocked on the socket
+    never delays closing the application.
+    """
+    event_received = pyqtSignal(str, dict)
+
+    def __init__(self, api_service, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.api_service = api_service
+        self._stop: Optional[threading.Event] = None
+
+    def start(self) -> None:
+        """Start following the stream of the logged-in user"""
+        self.stop()
+        self._stop = threading.Event()
+        threading.Thread(target=self._run, args=(self._stop,), daemon=True).start()
+
+    def stop(self) -> None:
+        """Stop following the stream; events still in flight are dropped"""
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+
+    def _run(self, stop: threading.Event) -> None:
+        last_event_id = None
+        delay = RECONNECT_DELAY
+        while not stop.is_set():
+            try:
+                for event_id, event_type, data in self.api_service.stream_events(last_event_id):
+                    if stop.is_set():
+                        return
+                    last_event_id = event_id
+                    delay = RECONNECT_DELAY
+                    if event_type is not None:
+                        self.event_received.emit(event_type, data)
+            except requests.HTTPError as e:
+                if e.response is not None and e.response.status_code in (401, 403):
+                    # Logged out or token revoked
+                    return
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+                if e.response is not None and e.response.status_code == 503:
+                    # The server's stream slots are taken until one ends
+                    retry_after = e.response.headers.get('Retry-After', '')
+                    if retry_after.isdigit():
+                        delay = min(max(delay, int(retry_after)), MAX_RECONNECT_DELAY)
+            except (requests.RequestException, ValueError):
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+            stop.wait(delay)
@@ -0,0 +1,79 @@
+"""
+Local Analysis for Desktop Application
+Runs the server's CSV validation and analysis code (the shared
+equipment_analysis package) in a background process
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+
+def analyze_csv(file_path: str) -> Dict[str, Any]:
+    """
+    Parse, validate and analyze a CSV file exactly as the server would.
+    Runs in the worker process; raises ValueError for invalid files.
+    """
+    # Imported on use: pandas would slow down the window's start
+    import equipment_analysis
+
+    with open(file_path, 'rb') as f:
+        df, error = equipment_analysis.parse_csv_file(f)
+    if df is None:
+        raise ValueError(error)
+
+    rows = df.rename(columns={
+        'Equipment Name': 'equipment_name', 'Type': 'equipment_type', 'Flowrate': 'flowrate',
+        'Pressure': 'pressure', 'Temperature': 'temperature',
+    })[['equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']]
+    return {
+        'dataset': {'id': None, 'filename': os.path.basename(file_path), 'local_path': file_path},
+        'analysis': equipment_analysis.analyze_equipment_data(df),
+        'series': equipment_analysis.build_parameter_series(df),
+        'rows': rows.to_dict('records'),
+    }
+
+
+def validate_csv(file_path: str,
+                 progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """
+    Check a CSV file against the server's validation rules in one streaming
+    pass. Cheap enough to run in a RequestManager thread; raising from
+    ``progress_callback`` stops the pass.
+    """
+    import equipment_analysis
+
+    with open(file_path, 'rb') as f:
+        return equipment_analysis.validate_csv_stream(f, progress_callback=progress_callback)
+
+
+class LocalAnalyzer:
+    """
+    Runs analyze_csv in a single worker process, started on first use.
+
+    ``analyze`` blocks until the result is ready, so call it from a
+    RequestManager worker thread rather than the GUI thread.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def analyze(self, file_path: str) -> Dict[str, Any]:
+        if self._executor is None:
+            # Never fork a process that is running Qt threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context('spawn')
+            )
+        try:
+            return self._executor.submit(analyze_csv, file_path).result()
+        except BrokenProcessPool:
+            # The worker died (e.g. out of memory); start a fresh one next time
+            self._executor = None
+            raise
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
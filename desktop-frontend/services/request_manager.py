@@ -0,0 +1,150 @@
+"""
+Request Manager for Desktop Application
+Runs APIService calls on a QThreadPool so the GUI thread never blocks
+"""
+
+from typing import Any, Callable, Dict, Optional
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+
+class CancelledError(Exception):
+    """Raised inside a worker when its request has been cancelled"""
+
+
+class WorkerSignals(QObject):
+    """Signals emitted by a Worker; delivered on the GUI thread"""
+    result = pyqtSignal(object)
+    error = pyqtSignal(object)
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal()
+
+
+class Worker(QRunnable):
+    """
+    Runs a callable on a pool thread.
+
+    When ``with_progress`` is set, the callable receives a
+    ``progress_callback(done, total)`` keyword argument. Calling it after the
+    worker was cancelled raises CancelledError, which aborts long transfers.
+    Results of cancelled workers are never delivered.
+    """
+
+    def __init__(self, fn: Callable, *args, with_progress: bool = False, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.with_progress = with_progress
+        self.signals = WorkerSignals()
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Mark the worker as cancelled"""
+        self.cancelled = True
+
+    def report_progress(self, done: int, total: int) -> None:
+        """Forward progress to the GUI thread, aborting if cancelled"""
+        if self.cancelled:
+            raise CancelledError()
+        self.signals.progress.emit(done, total)
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            if self.cancelled:
+                return
+            kwargs = dict(self.kwargs)
+            if self.with_progress:
+                kwargs['progress_callback'] = self.report_progress
+            result = self.fn(*self.args, **kwargs)
+        except CancelledError:
+            pass
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.error.emit(e)
+        else:
+            if not self.cancelled:
+                self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+
+class RequestManager(QObject):
+    """
+    Submits API calls to a bounded thread pool.
+
+    Requests submitted with a ``key`` supersede any earlier request with the
+    same key: the earlier one is removed from the queue if it has not started
+    yet, and its result is discarded otherwise. Callbacks of cancelled
+    requests are never invoked.
+    """
+
+    def __init__(self, max_concurrency: int = 4, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_concurrency)
+        self._keyed: Dict[str, Worker] = {}
+        self._running = set()
+
+    def submit(self, fn: Callable, *args,
+               key: Optional[str] = None,
+               on_result: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               on_progress: Optional[Callable[[int, int], None]] = None,
+               on_finished: Optional[Callable[[], None]] = None,
+               priority: int = 0,
+               **kwargs) -> Worker:
+        """Run ``fn(*args, **kwargs)`` in the background and return its worker"""
+        if key is not None:
+            self.cancel(key)
+
+        worker = Worker(fn, *args, with_progress=on_progress is not None, **kwargs)
+        worker.setAutoDelete(False)
+        if on_result:
+            worker.signals.result.connect(on_result)
+        if on_error:
+            worker.signals.error.connect(on_error)
+        if on_progress:
+            worker.signals.progress.connect(on_progress)
+        if on_finished:
+            worker.signals.finished.connect(lambda: worker.cancelled or on_finished())
+        worker.signals.finished.connect(lambda: self._release(worker, key))
+
+        if key is not None:
+            self._keyed[key] = worker
+        # Keep a reference until finished so the signals object stays alive
+        self._running.add(worker)
+        self.pool.start(worker, priority)
+        return worker
+
+    def cancel(self, key: str) -> None:
+        """Cancel the request registered under ``key``, if any"""
+        worker = self._keyed.pop(key, None)
+        if worker is None:
+            return
+        worker.cancel()
+        if self.pool.tryTake(worker):
+            # Never started, so it will not emit finished
+            self._running.discard(worker)
+
+    def is_pending(self, key: str) -> bool:
+        """Return True while a request with ``key`` is queued or running"""
+        return key in self._keyed
+
+    def cancel_all(self) -> None:
+        """Cancel every queued and running request"""
+        self._keyed.clear()
+        for worker in list(self._running):
+            worker.cancel()
+            if self.pool.tryTake(worker):
+                self._running.discard(worker)
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        """Block until all running requests finish (used on shutdown)"""
+        return self.pool.waitForDone(msecs)
+
+    def _release(self, worker: Worker, key: Optional[str]) -> None:
+        self._running.discard(worker)
+        if key is not None and self._keyed.get(key) is worker:
+            del self._keyed[key]
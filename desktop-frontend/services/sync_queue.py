@@ -0,0 +1,46 @@
+"""
+Sync Queue for Desktop Application
+Files analyzed offline that still have to be uploaded, kept across restarts
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import List
+
+
+class SyncQueue:
+    """Persistent FIFO of CSV file paths waiting to be uploaded"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._items: List[str] = []
+        if self.path.exists():
+            try:
+                self._items = json.loads(self.path.read_text())
+            except (OSError, ValueError):
+                self._items = []
+
+    def add(self, file_path: str) -> None:
+        file_path = os.path.abspath(file_path)
+        if file_path not in self._items:
+            self._items.append(file_path)
+            self._save()
+
+    def remove(self, file_path: str) -> None:
+        if file_path in self._items:
+            self._items.remove(file_path)
+            self._save()
+
+    def peek(self):
+        """Return the oldest pending file, or None"""
+        return self._items[0] if self._items else None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self._items))
+        os.replace(tmp, self.path)
@@ -0,0 +1,122 @@
+"""
+Upload Stream for Desktop Application
+Generator-based multipart/form-data encoder that streams files in chunks
+"""
+
+import gzip
+import mimetypes
+import os
+import tempfile
+import uuid
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+CHUNK_SIZE = 64 * 1024
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class MultipartStream:
+    """
+    A multipart/form-data request body read lazily from file objects.
+
+    Defines ``__len__`` so requests sends a Content-Length header and
+    streams the iterator instead of falling back to chunked transfer, which
+    Django cannot parse. ``progress_callback(sent, total)`` is called after
+    each chunk; an exception raised from it aborts the upload. Further files
+    can be added with ``add_file`` before the body is sent.
+    """
+
+    def __init__(self, field_name: str, filename: str, fileobj: BinaryIO,
+                 fields: Optional[Dict[str, str]] = None, content_type: Optional[str] = None,
+                 chunk_size: int = CHUNK_SIZE, progress_callback: Optional[ProgressCallback] = None):
+        self.boundary = uuid.uuid4().hex
+        self.chunk_size = chunk_size
+        self.progress_callback = progress_callback
+
+        preamble = b''
+        for name, value in (fields or {}).items():
+            preamble += (
+                f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                f'{value}\r\n'
+            ).encode()
+        self.preamble = preamble
+        self.epilogue = f'--{self.boundary}--\r\n'.encode()
+        self.parts: List[Tuple[bytes, BinaryIO, int]] = []
+        self.add_file(field_name, filename, fileobj, content_type)
+
+    def add_file(self, field_name: str, filename: str, fileobj: BinaryIO,
+                 content_type: Optional[str] = None) -> None:
+        """Append another file part to the body"""
+        content_type = content_type or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        header = (
+            f'--{self.boundary}\r\n'
+            f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        ).encode()
+        fileobj.seek(0, os.SEEK_END)
+        size = fileobj.tell()
+        fileobj.seek(0)
+        self.parts.append((header, fileobj, size))
+
+    @property
+    def content_type(self) -> str:
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    def __len__(self) -> int:
+        # Each file part ends with a CRLF before the next boundary
+        parts = sum(len(header) + size + 2 for header, _, size in self.parts)
+        return len(self.preamble) + parts + len(self.epilogue)
+
+    def __iter__(self) -> Iterator[bytes]:
+        total = len(self)
+        sent = len(self.preamble)
+        yield self.preamble
+        for header, fileobj, _ in self.parts:
+            sent += len(header)
+            yield header
+            fileobj.seek(0)
+            while True:
+                chunk = fileobj.read(self.chunk_size)
+                if not chunk:
+                    break
+                sent += len(chunk)
+                if self.progress_callback:
+                    self.progress_callback(sent, total)
+                yield chunk
+            sent += 2
+            yield b'\r\n'
+        yield self.epilogue
+        if self.progress_callback:
+            self.progress_callback(total, total)
+
+
+def gzip_to_tempfile(source: BinaryIO, chunk_size: int = CHUNK_SIZE,
+                     progress_callback: Optional[ProgressCallback] = None) -> BinaryIO:
+    """
+    Compress ``source`` into an anonymous temporary file, chunk by chunk.
+
+    The compressed size must be known before the request starts, so the
+    compressed bytes are spooled to disk rather than held in memory.
+    """
+    source.seek(0, os.SEEK_END)
+    total = source.tell()
+    source.seek(0)
+    target = tempfile.TemporaryFile()
+    try:
+        with gzip.GzipFile(fileobj=target, mode='wb', compresslevel=6, mtime=0) as compressed:
+            done = 0
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                compressed.write(chunk)
+                done += len(chunk)
+                if progress_callback:
+                    progress_callback(done, total)
+    except BaseException:
+        target.close()
+        raise
+    target.seek(0)
+    return target
+
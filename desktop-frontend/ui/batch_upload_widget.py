@@ -0,0 +1,206 @@
+"""Batch Upload Widget - upload a folder or a selection of CSV files in parallel"""
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QFileDialog,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView)
+from PyQt5.QtCore import QTimer, pyqtSignal
+import os
+
+from services.api_service import SINGLE_UPLOAD_LIMIT, BATCH_UPLOAD_FILES
+
+# Attempts per request after a dropped connection or a 5xx response; uploads
+# that may have reached the server are not sent again (see APIService._with_retries)
+BATCH_UPLOAD_RETRIES = 3
+
+
+class BatchUploadWidget(QWidget):
+    """
+    Uploads many files at once on a bounded RequestManager.
+    
+    Small files are grouped into batch endpoint requests when the server
+    offers one and sent one request per file otherwise; files over
+    SINGLE_UPLOAD_LIMIT always use the resumable chunked upload.
+    """
+    batch_finished = pyqtSignal(int)
+    
+    def __init__(self, api_service, request_manager):
+        super().__init__()
+        self.api_service = api_service
+        self.request_manager = request_manager
+        self.files = []
+        self.running = False
+        self._pending = 0
+        self._uploaded = 0
+        # Progress arrives per chunk from every worker; repaint at most 10 times a second
+        self._progress = {}
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(100)
+        self.progress_timer.timeout.connect(self.apply_progress)
+        self.init_ui()
+    
+    def init_ui(self):
+        layout = QVBoxLayout()
+        
+        buttons = QHBoxLayout()
+        self.folder_btn = QPushButton("Upload Folder...")
+        self.folder_btn.clicked.connect(self.select_folder)
+        buttons.addWidget(self.folder_btn)
+        self.files_btn = QPushButton("Upload Files...")
+        self.files_btn.clicked.connect(self.select_files)
+        buttons.addWidget(self.files_btn)
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.cancel)
+        self.cancel_btn.setVisible(False)
+        buttons.addWidget(self.cancel_btn)
+        buttons.addStretch()
+        layout.addLayout(buttons)
+        
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["File", "Size", "Progress", "Status"])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        layout.addWidget(self.table)
+        
+        self.status_label = QLabel("Select a folder or several CSV files to upload them together")
+        layout.addWidget(self.status_label)
+        
+        self.setLayout(layout)
+    
+    def select_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Folder")
+        if folder:
+            paths = sorted(
+                os.path.join(folder, name) for name in os.listdir(folder)
+                if name.lower().endswith('.csv') and os.path.isfile(os.path.join(folder, name))
+            )
+            self.start(paths)
+    
+    def select_files(self):
+        paths, _ = QFileDialog.getOpenFileNames(self, "Select CSV Files", "", "CSV Files (*.csv)")
+        if paths:
+            self.start(paths)
+    
+    def start(self, paths):
+        if not paths:
+            self.status_label.setText("No CSV files found")
+            return
+        
+        self.files = list(paths)
+        self._progress.clear()
+        self._uploaded = 0
+        self.table.setRowCount(len(self.files))
+        for row, path in enumerate(self.files):
+            self.table.setItem(row, 0, QTableWidgetItem(os.path.basename(path)))
+            self.table.setItem(row, 1, QTableWidgetItem(f"{os.path.getsize(path) / 1024:,.0f} KB"))
+            self.table.setItem(row, 2, QTableWidgetItem("0%"))
+            self.table.setItem(row, 3, QTableWidgetItem("Queued"))
+        
+        self.running = True
+        self.folder_btn.setEnabled(False)
+        self.files_btn.setEnabled(False)
+        self.cancel_btn.setVisible(True)
+        self.status_label.setText(f"Uploading {len(self.files)} files...")
+        self.request_manager.submit(
+            self.api_service.supports_batch_upload,
+            key='batch-probe',
+            on_result=self.submit_uploads,
+            on_error=lambda error: self.submit_uploads(False),
+        )
+    
+    def submit_uploads(self, batch_supported):
+        """Queue one request per group of rows; the manager bounds how many run at once"""
+        small, large = [], []
+        for row, path in enumerate(self.files):
+            (small if os.path.getsize(path) <= SINGLE_UPLOAD_LIMIT else large).append(row)
+        
+        jobs = []
+        if batch_supported:
+            for i in range(0, len(small), BATCH_UPLOAD_FILES):
+                rows = small[i:i + BATCH_UPLOAD_FILES]
+                jobs.append((rows, self.api_service.upload_batch, [self.files[row] for row in rows], {}))
+        else:
+            jobs += [([row], self.api_service.upload_csv, self.files[row], {'compress': True})
+                         for row in small]
+        jobs += [([row], self.api_service.upload_csv_resumable, self.files[row], {}) for row in large]
+        
+        self._pending = len(jobs)
+        self.progress_timer.start()
+        for rows, call, arg, kwargs in jobs:
+            batch = call == self.api_service.upload_batch
+            self.request_manager.submit(
+                call, arg,
+                key=f'batch:{rows[0]}',
+                max_retries=BATCH_UPLOAD_RETRIES,
+                on_progress=lambda done, total, rows=rows: self.on_progress(rows, done, total),
+                on_result=lambda result, rows=rows, batch=batch: self.on_result(rows, result, batch),
+                on_error=lambda error, rows=rows: self.on_error(rows, error),
+                on_finished=self.on_request_finished,
+                **kwargs,
+            )
+            self.set_status(rows, "Uploading")
+    
+    def on_progress(self, rows, done, total):
+        if total:
+            for row in rows:
+                self._progress[row] = done * 100 // total
+    
+    def apply_progress(self):
+        for row, percent in self._progress.items():
+            self.table.item(row, 2).setText(f"{percent}%")
+        self._progress.clear()
+    
+    def on_result(self, rows, result, batch):
+        # The batch endpoint returns one result per file, in the order sent
+        results = result['data']['results'] if batch else [result]
+        for row, file_result in zip(rows, results):
+            self._progress.pop(row, None)
+            if file_result.get('success'):
+                self._uploaded += 1
+                self.table.item(row, 2).setText("100%")
+                self.set_status([row], f"Uploaded (dataset {file_result['data']['id']})")
+            else:
+                self.set_status([row], f"Failed: {file_result.get('error', 'rejected by server')}")
+    
+    def on_error(self, rows, error):
+        response = getattr(error, 'response', None)
+        message = str(error)
+        if response is not None:
+            try:
+                body = response.json()
+                message = body.get('error') or body.get('errors') or message
+            except ValueError:
+                pass
+        for row in rows:
+            self._progress.pop(row, None)
+        self.set_status(rows, f"Failed: {message}")
+    
+    def on_request_finished(self):
+        self._pending -= 1
+        if self._pending == 0:
+            self.finish(f"Uploaded {self._uploaded} of {len(self.files)} files")
+    
+    def cancel(self):
+        if not self.running:
+            return
+        for row in range(len(self.files)):
+            self.request_manager.cancel(f'batch:{row}')
+            if self.table.item(row, 3).text() in ("Queued", "Uploading"):
+                self.set_status([row], "Cancelled")
+        self.request_manager.cancel('batch-probe')
+        self.finish(f"Cancelled; uploaded {self._uploaded} of {len(self.files)} files")
+    
+    def finish(self, message):
+        self.progress_timer.stop()
+        self.apply_progress()
+        self.running = False
+        self._pending = 0
+        self.folder_btn.setEnabled(True)
+        self.files_btn.setEnabled(True)
+        self.cancel_btn.setVisible(False)
+        self.status_label.setText(message)
+        if self._uploaded:
+            self.batch_finished.emit(self._uploaded)
+    
+    def set_status(self, rows, text):
+        for row in rows:
+            self.table.item(row, 3).setText(text)
@@ -0,0 +1,184 @@
+"""Chart Renderer - Reusable Matplotlib axes and artists updated in place"""
+from typing import Any, Dict, Optional
+
+import numpy as np
+from matplotlib import colormaps
+
+PARAMETERS = ['flowrate', 'pressure', 'temperature']
+BAR_COLORS = ['#4CAF50', '#2196F3', '#FF9800']
+
+# Above this many points the scatter is drawn as a rasterized density image
+DENSITY_THRESHOLD = 2000
+DENSITY_BINS = 200
+
+
+class ChartRenderer:
+    """
+    Owns a fixed 2x2 grid of axes on a figure.
+
+    Axes and artists are created once; switching datasets only swaps the data
+    behind them and schedules an idle redraw. The scatter hover annotation is
+    drawn with blitting, so moving the mouse never re-renders the figure.
+    """
+
+    def __init__(self, figure, canvas):
+        self.figure = figure
+        self.canvas = canvas
+        self.series: Optional[Dict[str, Any]] = None
+        self.x_key = 'flowrate'
+        self.y_key = 'temperature'
+        self.hist_key = 'flowrate'
+        self._background = None
+        self._points = np.empty((0, 2))
+        self._labels = []
+
+        (self.pie_ax, self.bar_ax), (self.scatter_ax, self.hist_ax) = figure.subplots(2, 2)
+
+        self.pie_ax.set_title('Equipment Type Distribution')
+        self.pie_ax.set_axis_off()
+
+        self.bars = self.bar_ax.bar(['Flowrate', 'Pressure', 'Temperature'], [0, 0, 0], color=BAR_COLORS)
+        self.bar_ax.set_title('Average Parameters')
+        self.bar_ax.set_ylabel('Value')
+
+        self.scatter = self.scatter_ax.scatter([], [], c=[], s=8, linewidths=0, cmap=colormaps['tab10'], vmin=0, vmax=9)
+        self.density = self.scatter_ax.imshow(
+            np.zeros((1, 1)), origin='lower', aspect='auto', cmap='viridis',
+            interpolation='nearest', visible=False
+        )
+        self.density.set_rasterized(True)
+        self.annotation = self.scatter_ax.annotate(
+            '', xy=(0, 0), xytext=(8, 8), textcoords='offset points',
+            bbox={'boxstyle': 'round', 'fc': 'white', 'alpha': 0.9}, visible=False, animated=True
+        )
+
+        self.stairs = self.hist_ax.stairs([0], [0, 1], fill=True, color='#2196F3', alpha=0.7)
+        self.hist_ax.set_ylabel('Count')
+
+        figure.tight_layout()
+        canvas.mpl_connect('draw_event', self._on_draw)
+        canvas.mpl_connect('motion_notify_event', self._on_motion)
+
+    # Aggregates
+
+    def set_summary(self, analysis: Dict[str, Any]) -> None:
+        """Show the type distribution and parameter averages"""
+        # Wedges cannot be re-shaped in place, but only this axes is redrawn
+        for artist in list(self.pie_ax.patches) + list(self.pie_ax.texts):
+            artist.remove()
+        distribution = analysis['equipment_type_distribution']
+        if distribution:
+            self.pie_ax.pie(list(distribution.values()), labels=list(distribution.keys()),
+                            autopct='%1.1f%%')
+
+        values = [analysis['avg_flowrate'], analysis['avg_pressure'], analysis['avg_temperature']]
+        for bar, value in zip(self.bars, values):
+            bar.set_height(value or 0)
+        self.bar_ax.set_ylim(0, max((v or 0) for v in values) * 1.1 or 1)
+        self.canvas.draw_idle()
+
+    # Per-equipment series
+
+    def set_series(self, series: Dict[str, Any]) -> None:
+        """Show downsampled per-equipment series returned by the server"""
+        self.series = series
+        self._update_scatter()
+        self._update_histogram()
+        self.canvas.draw_idle()
+
+    def set_scatter_axes(self, x_key: str, y_key: str) -> None:
+        self.x_key, self.y_key = x_key, y_key
+        if self.series is not None:
+            self._update_scatter()
+            self.canvas.draw_idle()
+
+    def set_histogram_parameter(self, key: str) -> None:
+        self.hist_key = key
+        if self.series is not None:
+            self._update_histogram()
+            self.canvas.draw_idle()
+
+    def clear_series(self) -> None:
+        self.series = None
+        self.scatter.set_offsets(np.empty((0, 2)))
+        self.density.set_visible(False)
+        self.stairs.set_data([0], [0, 1])
+        self._points = np.empty((0, 2))
+        self.canvas.draw_idle()
+
+    def _update_scatter(self):
+        x = np.asarray(self.series[self.x_key], dtype=float)
+        y = np.asarray(self.series[self.y_key], dtype=float)
+        codes = np.asarray(self.series['types'])
+        ax = self.scatter_ax
+        ax.set_xlabel(self.x_key.capitalize())
+        ax.set_ylabel(self.y_key.capitalize())
+        ax.set_title(f"{self.series['sampled_count']:,} of {self.series['total_count']:,} equipment")
+
+        if len(x) == 0:
+            self.scatter.set_offsets(np.empty((0, 2)))
+            self.density.set_visible(False)
+            self._points = np.empty((0, 2))
+            return
+
+        x_range = (x.min(), x.max() if x.max() > x.min() else x.min() + 1)
+        y_range = (y.min(), y.max() if y.max() > y.min() else y.min() + 1)
+        if len(x) > DENSITY_THRESHOLD:
+            counts, _, _ = np.histogram2d(x, y, bins=DENSITY_BINS, range=[x_range, y_range])
+            self.density.set_data(np.ma.masked_equal(counts.T, 0))
+            self.density.set_extent((*x_range, *y_range))
+            self.density.set_clim(1, max(counts.max(), 1))
+            self.density.set_visible(True)
+            self.scatter.set_visible(False)
+            self._points = np.empty((0, 2))
+        else:
+            self.scatter.set_offsets(np.column_stack([x, y]))
+            self.scatter.set_array(codes % 10)
+            self.scatter.set_visible(True)
+            self.density.set_visible(False)
+            self._points = np.column_stack([x, y])
+            self._labels = [self.series['type_labels'][code] for code in codes]
+        margin_x = (x_range[1] - x_range[0]) * 0.05
+        margin_y = (y_range[1] - y_range[0]) * 0.05
+        ax.set_xlim(x_range[0] - margin_x, x_range[1] + margin_x)
+        ax.set_ylim(y_range[0] - margin_y, y_range[1] + margin_y)
+
+    def _update_histogram(self):
+        histogram = self.series['histograms'][self.hist_key]
+        counts, edges = histogram['counts'], histogram['edges']
+        if not counts:
+            counts, edges = [0], [0, 1]
+        self.stairs.set_data(counts, edges)
+        self.hist_ax.set_xlim(edges[0], edges[-1])
+        self.hist_ax.set_ylim(0, max(counts) * 1.1 or 1)
+        self.hist_ax.set_title(f'{self.hist_key.capitalize()} Distribution')
+        self.hist_ax.set_xlabel(self.hist_key.capitalize())
+
+    # Interaction
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        if self.annotation.get_visible():
+            self.scatter_ax.draw_artist(self.annotation)
+
+    def _on_motion(self, event):
+        if self._background is None:
+            return
+        visible = False
+        if event.inaxes is self.scatter_ax and len(self._points):
+            # Nearest point in screen space, within a few pixels
+            screen = self.scatter_ax.transData.transform(self._points)
+            distances = np.hypot(screen[:, 0] - event.x, screen[:, 1] - event.y)
+            nearest = int(np.argmin(distances))
+            if distances[nearest] < 6:
+                x, y = self._points[nearest]
+                self.annotation.xy = (x, y)
+                self.annotation.set_text(f"{self._labels[nearest]}\n{x:.2f}, {y:.2f}")
+                visible = True
+        if not visible and not self.annotation.get_visible():
+            return
+        self.annotation.set_visible(visible)
+        self.canvas.restore_region(self._background)
+        if visible:
+            self.scatter_ax.draw_artist(self.annotation)
+        self.canvas.blit(self.scatter_ax.bbox)
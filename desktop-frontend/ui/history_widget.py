@@ -1,45 +1,155 @@
 """History Widget - Display dataset history"""
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, QPushButton
-from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableView, QPushButton,
+                             QLabel, QLineEdit, QAbstractItemView, QHeaderView, QCheckBox)
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+
+from ui.table_models import HistoryTableModel, cursor_fetcher, next_cursor
+
+# Upper bound on datasets prefetched per pass, however tall the table is
+MAX_PREFETCH_ROWS = 20
+
 
 class HistoryWidget(QWidget):
     dataset_selected = pyqtSignal(int)
     
-    def __init__(self, api_service):
+    def __init__(self, api_service, request_manager, prefetch_manager=None):
         super().__init__()
         self.api_service = api_service
+        self.request_manager = request_manager
+        # Summaries (and optionally PDFs) of the visible rows are fetched in the
+        # background on their own small pool, so they never delay user actions
+        self.prefetch_manager = prefetch_manager
+        self.fetch_page = cursor_fetcher(self.api_service.get_datasets)
+        self._prefetched = set()
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.setInterval(250)
+        self.prefetch_timer.timeout.connect(self.prefetch_visible)
+        # Server events arriving together (an upload and the pruning it causes)
+        # trigger a single reload
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(300)
+        self.reload_timer.timeout.connect(self.load_history)
         self.init_ui()
     
     def init_ui(self):
         layout = QVBoxLayout()
         
-        self.table = QTableWidget()
-        self.table.setColumnCount(4)
-        self.table.setHorizontalHeaderLabels(['Filename', 'Count', 'Avg Flowrate', 'Date'])
-        self.table.cellDoubleClicked.connect(self.on_row_selected)
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter by filename...")
+        self.filter_edit.textChanged.connect(lambda text: self.model.set_filter(text, 0))
+        layout.addWidget(self.filter_edit)
+        
+        self.model = HistoryTableModel(self.fetch_page, self.request_manager, self)
+        self.model.load_failed.connect(self.on_load_error)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        # Keep the server order (newest first) until a header is clicked
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.table.setSortingEnabled(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setColumnHidden(4, True)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.doubleClicked.connect(self.on_row_selected)
+        # Prefetch once scrolling or loading settles
+        self.table.verticalScrollBar().valueChanged.connect(self.prefetch_timer.start)
+        self.model.rowsInserted.connect(self.prefetch_timer.start)
+        self.model.modelReset.connect(self.prefetch_timer.start)
+        self.model.layoutChanged.connect(self.prefetch_timer.start)
         layout.addWidget(self.table)
         
-        refresh_btn = QPushButton("Refresh")
-        refresh_btn.clicked.connect(self.load_history)
-        layout.addWidget(refresh_btn)
+        footer = QHBoxLayout()
+        self.status_label = QLabel("")
+        footer.addWidget(self.status_label)
+        footer.addStretch()
+        self.prefetch_pdf_check = QCheckBox("Prefetch PDF reports")
+        self.prefetch_pdf_check.toggled.connect(self.prefetch_timer.start)
+        self.prefetch_pdf_check.setVisible(self.prefetch_manager is not None)
+        footer.addWidget(self.prefetch_pdf_check)
+        self.refresh_btn = QPushButton("Refresh")
+        self.refresh_btn.clicked.connect(self.load_history)
+        footer.addWidget(self.refresh_btn)
+        layout.addLayout(footer)
         
         self.setLayout(layout)
     
     def load_history(self):
-        try:
-            result = self.api_service.get_history()
-            datasets = result.get('data', [])
-            self.table.setRowCount(len(datasets))
-            
-            for i, ds in enumerate(datasets):
-                self.table.setItem(i, 0, QTableWidgetItem(ds['filename']))
-                self.table.setItem(i, 1, QTableWidgetItem(str(ds['total_count'])))
-                self.table.setItem(i, 2, QTableWidgetItem(f"{ds['avg_flowrate']:.2f}"))
-                self.table.setItem(i, 3, QTableWidgetItem(ds['uploaded_at'][:10]))
-                self.table.item(i, 0).setData(100, ds['id'])
-        except Exception as e:
-            print(f"Failed to load history: {e}")
-    
-    def on_row_selected(self, row, col):
-        dataset_id = self.table.item(row, 0).data(100)
+        self._prefetched.clear()
+        # Show the last known first page instantly, then revalidate it
+        cached = self.api_service.get_cached("datasets:cursor:")
+        if cached is not None:
+            self.show_first_page(cached['results'], next_cursor(cached))
+        
+        self.refresh_btn.setEnabled(False)
+        self.status_label.setText("Loading history...")
+        self.request_manager.submit(
+            self.fetch_page, '',
+            key='history',
+            on_result=lambda page: self.show_first_page(page[0], page[1]),
+            on_error=self.on_load_error,
+            on_finished=lambda: self.refresh_btn.setEnabled(True),
+        )
+    
+    def show_first_page(self, rows, next_page):
+        # Further pages are fetched by the view as the user scrolls
+        self.model.reload(initial_rows=rows, initial_next=next_page)
+        self.status_label.setText("")
+    
+    def on_load_error(self, error):
+        self.status_label.setText(f"Failed to load history: {error}")
+    
+    def on_server_event(self, event_type, data):
+        """Follow dataset changes made by this or any other client"""
+        if event_type.startswith('dataset.'):
+            self.reload_timer.start()
+        elif event_type == 'upload.progress':
+            self.status_label.setText(
+                f"Uploading {data['filename']}: {data['received_chunks']} of {data['total_chunks']} chunks"
+            )
+        elif event_type == 'upload.failed':
+            self.status_label.setText(f"Upload of {data['filename']} failed: {data['error']}")
+    
+    def prefetch_visible(self):
+        """Queue background fetches for the rows currently on screen"""
+        if self.prefetch_manager is None or not self.isVisible():
+            return
+        first = self.table.rowAt(0)
+        if first < 0:
+            return
+        last = self.table.rowAt(self.table.viewport().height() - 1)
+        if last < 0:
+            last = self.model.rowCount() - 1
+        last = min(last, first + MAX_PREFETCH_ROWS - 1)
+        
+        dataset_ids = [self.model.row_value(row, 'id') for row in range(first, last + 1)]
+        # Errors are ignored: the datasets are simply fetched on demand later
+        summaries = [i for i in dataset_ids if ('summary', i) not in self._prefetched]
+        if summaries:
+            self._prefetched.update(('summary', i) for i in summaries)
+            # All visible summaries in one batch request
+            self.prefetch_manager.submit(
+                self.api_service.prefetch_summaries, summaries,
+                key=f'prefetch-summary:{summaries[0]}',
+                on_error=lambda e, ids=summaries: self._prefetched.difference_update(('summary', i) for i in ids),
+            )
+        if not self.prefetch_pdf_check.isChecked():
+            return
+        for dataset_id in dataset_ids:
+            if ('pdf', dataset_id) in self._prefetched:
+                continue
+            self._prefetched.add(('pdf', dataset_id))
+            self.prefetch_manager.submit(
+                self.api_service.prefetch_pdf, dataset_id,
+                key=f'prefetch-pdf:{dataset_id}',
+                on_error=lambda e, key=('pdf', dataset_id): self._prefetched.discard(key),
+                priority=-1,
+            )
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.prefetch_timer.start()
+    
+    def on_row_selected(self, index):
+        dataset_id = self.model.row_value(index.row(), 'id')
         self.dataset_selected.emit(dataset_id)
@@ -12,6 +12,7 @@ class LoginDialog(QDialog):
         super().__init__(parent)
         self.api_service = api_service
         self.user_data = None
+        self.offline = False
         self.init_ui()
     
     def init_ui(self):
@@ -46,6 +47,11 @@ class LoginDialog(QDialog):
         login_btn.clicked.connect(self.do_login)
         layout.addRow(login_btn)
         
+        offline_btn = QPushButton("Work Offline")
+        offline_btn.setToolTip("Analyze CSV files locally; uploads sync after the next login")
+        offline_btn.clicked.connect(self.work_offline)
+        layout.addRow(offline_btn)
+        
         widget.setLayout(layout)
         return widget
     
@@ -85,6 +91,11 @@ class LoginDialog(QDialog):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Login failed: {str(e)}")
     
+    def work_offline(self):
+        """Continue without a server session"""
+        self.offline = True
+        self.accept()
+    
     def do_register(self):
         """Handle registration"""
         if self.reg_password.text() != self.reg_password_confirm.text():
@@ -6,13 +6,19 @@ Implements MVC pattern with PyQt5
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QPushButton, QLabel, QTabWidget, QMessageBox,
                              QFileDialog, QTableWidget, QTableWidgetItem)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
 from PyQt5.QtGui import QFont
 import os
 
-from services.api_service import APIService
+from services.api_service import APIService, SINGLE_UPLOAD_LIMIT
+from services.cache_service import CacheService
+from services.event_listener import EventListener
+from services.local_analysis import LocalAnalyzer
+from services.request_manager import RequestManager
+from services.sync_queue import SyncQueue
 from ui.login_dialog import LoginDialog
 from ui.upload_widget import UploadWidget
+from ui.batch_upload_widget import BatchUploadWidget
 from ui.history_widget import HistoryWidget
 from ui.visualization_widget import VisualizationWidget
 
@@ -22,7 +28,22 @@ class MainWindow(QMainWindow):
     
     def __init__(self):
         super().__init__()
-        self.api_service = APIService()
+        self.api_service = APIService(cache=CacheService())
+        self.request_manager = RequestManager(max_concurrency=4, parent=self)
+        # Background prefetching is limited to two connections to avoid load bursts
+        self.prefetch_manager = RequestManager(max_concurrency=2, parent=self)
+        # Batch uploads run a bounded number of files in parallel
+        self.batch_manager = RequestManager(max_concurrency=4, parent=self)
+        # Dataset changes are pushed by the server instead of polled
+        self.event_listener = EventListener(self.api_service, self)
+        # Offline analysis runs the backend's analysis code in a local process;
+        # the analyzed files are uploaded once a server session is available
+        self.local_analyzer = LocalAnalyzer()
+        self.sync_queue = SyncQueue(self.api_service.cache.cache_dir / 'pending_uploads.json')
+        self.sync_timer = QTimer(self)
+        self.sync_timer.setInterval(60000)
+        self.sync_timer.timeout.connect(self.sync_pending)
+        self._syncing = False
         self.current_user = None
         self.init_ui()
         self.show_login()
@@ -47,17 +68,22 @@ class MainWindow(QMainWindow):
         self.main_layout.addWidget(self.tabs)
         
         # Create tabs
-        self.upload_widget = UploadWidget(self.api_service)
-        self.history_widget = HistoryWidget(self.api_service)
-        self.visualization_widget = VisualizationWidget(self.api_service)
+        self.upload_widget = UploadWidget(self.api_service, self.request_manager, self.local_analyzer)
+        self.batch_upload_widget = BatchUploadWidget(self.api_service, self.batch_manager)
+        self.history_widget = HistoryWidget(self.api_service, self.request_manager, self.prefetch_manager)
+        self.visualization_widget = VisualizationWidget(self.api_service, self.request_manager)
         
         self.tabs.addTab(self.upload_widget, "Upload CSV")
+        self.tabs.addTab(self.batch_upload_widget, "Batch Upload")
         self.tabs.addTab(self.history_widget, "History")
         self.tabs.addTab(self.visualization_widget, "Visualization")
         
         # Connect signals
         self.upload_widget.upload_success.connect(self.on_upload_success)
+        self.upload_widget.local_analysis_ready.connect(self.on_local_analysis)
+        self.batch_upload_widget.batch_finished.connect(lambda count: self.history_widget.load_history())
         self.history_widget.dataset_selected.connect(self.on_dataset_selected)
+        self.event_listener.event_received.connect(self.history_widget.on_server_event)
         
         # Initially disable tabs until login
         self.set_tabs_enabled(False)
@@ -86,14 +112,26 @@ class MainWindow(QMainWindow):
         self.logout_btn.setVisible(False)
         header_layout.addWidget(self.logout_btn)
         
+        # Login button (offline mode)
+        self.login_btn = QPushButton("Log In")
+        self.login_btn.clicked.connect(self.show_login)
+        self.login_btn.setVisible(False)
+        header_layout.addWidget(self.login_btn)
+        
         self.main_layout.addLayout(header_layout)
     
     def show_login(self):
         """Show login dialog"""
         dialog = LoginDialog(self.api_service, self)
         if dialog.exec_():
+            if dialog.offline:
+                self.on_offline()
+                return
             self.current_user = dialog.user_data
             self.on_login_success()
+        elif self.login_btn.isVisible():
+            # Dismissed while already working offline
+            return
         else:
             # User closed dialog without logging in
             QMessageBox.information(self, "Info", "Please login to use the application")
@@ -104,8 +142,83 @@ class MainWindow(QMainWindow):
         username = self.current_user.get('username', 'User')
         self.user_label.setText(f"Welcome, {username}")
         self.logout_btn.setVisible(True)
+        self.login_btn.setVisible(False)
+        self.set_tabs_enabled(True)
+        self.tabs.setTabEnabled(self.tabs.indexOf(self.history_widget), True)
+        self.tabs.setTabEnabled(self.tabs.indexOf(self.batch_upload_widget), True)
+        self.upload_widget.set_offline(False)
+        self.history_widget.load_history()
+        self.event_listener.start()
+        self.sync_pending()
+    
+    def on_offline(self):
+        """Work without a server session: local analysis only"""
+        self.current_user = None
+        self.event_listener.stop()
+        pending = len(self.sync_queue)
+        self.user_label.setText(f"Offline mode ({pending} pending upload{'s' if pending != 1 else ''})")
+        self.logout_btn.setVisible(False)
+        self.login_btn.setVisible(True)
         self.set_tabs_enabled(True)
+        self.tabs.setTabEnabled(self.tabs.indexOf(self.history_widget), False)
+        self.tabs.setTabEnabled(self.tabs.indexOf(self.batch_upload_widget), False)
+        self.upload_widget.set_offline(True)
+        self.tabs.setCurrentWidget(self.upload_widget)
+    
+    def on_local_analysis(self, result):
+        """Show a locally analyzed file and queue it for upload"""
+        self.tabs.setCurrentWidget(self.visualization_widget)
+        self.visualization_widget.show_local_result(result)
+        self.sync_queue.add(result['dataset']['local_path'])
+        if self.current_user is None:
+            self.on_offline()
+        else:
+            self.sync_pending()
+    
+    def sync_pending(self):
+        """Upload the oldest file analyzed offline, then continue with the rest"""
+        if self.current_user is None or self._syncing:
+            return
+        file_path = self.sync_queue.peek()
+        if file_path is None:
+            self.sync_timer.stop()
+            return
+        if not os.path.exists(file_path):
+            self.sync_queue.remove(file_path)
+            self.sync_pending()
+            return
+        
+        if os.path.getsize(file_path) > SINGLE_UPLOAD_LIMIT:
+            call, kwargs = self.api_service.upload_csv_resumable, {}
+        else:
+            call, kwargs = self.api_service.upload_csv, {'compress': True}
+        self._syncing = True
+        self.request_manager.submit(
+            call, file_path,
+            key='sync',
+            on_result=lambda result: self.on_sync_finished(file_path),
+            on_error=lambda error: self.on_sync_error(file_path, error),
+            **kwargs,
+        )
+    
+    def on_sync_finished(self, file_path):
+        self._syncing = False
+        self.sync_queue.remove(file_path)
         self.history_widget.load_history()
+        self.sync_pending()
+    
+    def on_sync_error(self, file_path, error):
+        self._syncing = False
+        response = getattr(error, 'response', None)
+        if response is not None and 400 <= response.status_code < 500 and response.status_code != 401:
+            # Rejected by the server: retrying would fail the same way
+            self.sync_queue.remove(file_path)
+            QMessageBox.warning(self, "Sync Failed",
+                                f"{os.path.basename(file_path)} was rejected by the server: {error}")
+            self.sync_pending()
+        else:
+            # Offline or server unavailable: try again later
+            self.sync_timer.start()
     
     def logout(self):
         """Handle logout"""
@@ -114,6 +227,13 @@ class MainWindow(QMainWindow):
                                     QMessageBox.Yes | QMessageBox.No)
         
         if reply == QMessageBox.Yes:
+            self.request_manager.cancel_all()
+            self.prefetch_manager.cancel_all()
+            self.batch_upload_widget.cancel()
+            self.batch_manager.cancel_all()
+            self.event_listener.stop()
+            self.sync_timer.stop()
+            self._syncing = False
             self.api_service.logout()
             self.current_user = None
             self.user_label.setText("")
@@ -136,3 +256,15 @@ class MainWindow(QMainWindow):
         """Handle dataset selection from history"""
         self.tabs.setCurrentWidget(self.visualization_widget)
         self.visualization_widget.load_dataset(dataset_id)
+    
+    def closeEvent(self, event):
+        """Cancel outstanding requests before the window closes"""
+        self.request_manager.cancel_all()
+        self.prefetch_manager.cancel_all()
+        self.batch_manager.cancel_all()
+        self.event_listener.stop()
+        self.request_manager.wait_for_done(2000)
+        self.prefetch_manager.wait_for_done(2000)
+        self.batch_manager.wait_for_done(2000)
+        self.local_analyzer.shutdown()
+        super().closeEvent(event)
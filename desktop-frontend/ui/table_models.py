@@ -0,0 +1,311 @@
+"""Table Models - Lazily paged, column-backed models for QTableView"""
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSignal
+
+# (header, key, kind, display format); kind is 'float', 'int', 'category' or 'str'
+Column = Tuple[str, str, str, Optional[str]]
+
+# fetch_page(token) -> (rows, next_token, total_count); next_token None when exhausted
+FetchPage = Callable[[Any], Tuple[List[Dict[str, Any]], Any, Optional[int]]]
+
+
+def page_number_fetcher(get_page: Callable[[int], Dict[str, Any]]) -> FetchPage:
+    """Adapt a DRF page-number endpoint (count/next/results) to FetchPage"""
+    def fetch(page: int):
+        data = get_page(page)
+        return data['results'], (page + 1 if data.get('next') else None), data.get('count')
+    return fetch
+
+
+def next_cursor(data: Dict[str, Any]) -> Optional[str]:
+    """Cursor of the page after a DRF cursor page, or None on the last page"""
+    if not data.get('next'):
+        return None
+    return parse_qs(urlparse(data['next']).query).get('cursor', [None])[0]
+
+
+def cursor_fetcher(get_page: Callable[[str], Dict[str, Any]]) -> FetchPage:
+    """Adapt a DRF cursor endpoint (next/results, no count) to FetchPage; the first token is ''"""
+    def fetch(cursor: str):
+        data = get_page(cursor)
+        return data['results'], next_cursor(data), None
+    return fetch
+
+
+class _ColumnStore:
+    """Compact storage for one column"""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        if kind == 'float':
+            self.values = array('d')
+        elif kind == 'int':
+            self.values = array('q')
+        elif kind == 'category':
+            # Repeated strings are stored once, rows hold 32-bit codes
+            self.values = array('I')
+            self.categories: List[str] = []
+            self._codes: Dict[str, int] = {}
+        else:
+            self.values = []
+
+    def extend(self, items):
+        if self.kind == 'category':
+            for item in items:
+                code = self._codes.get(item)
+                if code is None:
+                    code = self._codes[item] = len(self.categories)
+                    self.categories.append(item)
+                self.values.append(code)
+        else:
+            self.values.extend(items)
+
+    def get(self, row: int):
+        value = self.values[row]
+        return self.categories[value] if self.kind == 'category' else value
+
+    def sort_keys(self) -> np.ndarray:
+        """Return an array whose argsort orders the rows by this column"""
+        if self.kind in ('float', 'int'):
+            return np.frombuffer(self.values, dtype=self.values.typecode) if len(self.values) else np.array([])
+        if self.kind == 'category':
+            ranks = np.empty(len(self.categories), dtype=np.int64)
+            ranks[np.argsort(np.array(self.categories, dtype=object))] = np.arange(len(self.categories))
+            return ranks[np.frombuffer(self.values, dtype=np.uint32)] if len(self.values) else np.array([])
+        return np.array(self.values, dtype=object)
+
+    def clear(self):
+        self.__init__(self.kind)
+
+
+class PagedTableModel(QAbstractTableModel):
+    """
+    Read-only table model backed by per-column arrays.
+
+    Rows are fetched page by page in the background as the view scrolls
+    (canFetchMore/fetchMore). Sorting and filtering are done in the model
+    through a row index, so the stored columns are never copied.
+    """
+    loading_changed = pyqtSignal(bool)
+    load_failed = pyqtSignal(object)
+
+    def __init__(self, columns: List[Column], fetch_page: FetchPage, request_manager,
+                 key: str, parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self.fetch_page = fetch_page
+        self.request_manager = request_manager
+        self.key = key
+        self._stores = [_ColumnStore(kind) for _, _, kind, _ in columns]
+        self._stored_rows = 0
+        self._index: Optional[np.ndarray] = None
+        self._sort: Optional[Tuple[int, int]] = None
+        self._filter: Optional[Tuple[int, str]] = None
+        self._next_token: Any = None
+        self._loading = False
+        self.total_count: Optional[int] = None
+
+    # Loading
+
+    def reload(self, first_token: Any = 1, initial_rows: Optional[List[Dict[str, Any]]] = None,
+               initial_next: Any = None, fetch_page: Optional[FetchPage] = None):
+        """
+        Drop all rows and start paging from ``first_token``, or show
+        ``initial_rows`` and continue from ``initial_next``.
+        """
+        self.request_manager.cancel(self.key)
+        if fetch_page is not None:
+            self.fetch_page = fetch_page
+        self.beginResetModel()
+        for store in self._stores:
+            store.clear()
+        self._stored_rows = 0
+        self._index = None
+        self._loading = False
+        self.total_count = None
+        if initial_rows is not None:
+            self._append(initial_rows)
+            self._next_token = initial_next
+        else:
+            self._next_token = first_token
+        self._rebuild_index()
+        self.endResetModel()
+        if initial_rows is None:
+            self.fetchMore(QModelIndex())
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._next_token is not None and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self._set_loading(True)
+        self.request_manager.submit(
+            self.fetch_page, self._next_token,
+            key=self.key,
+            on_result=self._on_page,
+            on_error=self._on_error,
+        )
+
+    def _on_page(self, result):
+        rows, next_token, total = result
+        self._next_token = next_token
+        if total is not None:
+            self.total_count = total
+        if rows:
+            if self._index is None:
+                first = self._stored_rows
+                self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+                self._append(rows)
+                self.endInsertRows()
+            else:
+                # The visible row count grows only by the new rows that pass the
+                # filter: insert them at the end, then let the sort move them
+                stored = self._stored_rows
+                self._append(rows)
+                added = self._filtered(np.arange(stored, self._stored_rows))
+                if len(added):
+                    first = len(self._index)
+                    self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+                    self._index = np.concatenate([self._index, added])
+                    self.endInsertRows()
+                    if self._sort is not None:
+                        self.layoutAboutToBeChanged.emit()
+                        self._index = self._sorted(self._index)
+                        self.layoutChanged.emit()
+        self._set_loading(False)
+
+    def _on_error(self, error):
+        self._set_loading(False)
+        self.load_failed.emit(error)
+
+    def _set_loading(self, loading: bool):
+        self._loading = loading
+        self.loading_changed.emit(loading)
+
+    def _append(self, rows: List[Dict[str, Any]]):
+        for store, (_, key, _, _) in zip(self._stores, self.columns):
+            store.extend(row[key] for row in rows)
+        self._stored_rows += len(rows)
+
+    # Sorting and filtering
+
+    def sort(self, column: int, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        # A negative column restores the server order
+        self._sort = (column, order) if column >= 0 else None
+        self._rebuild_index()
+        self.layoutChanged.emit()
+
+    def set_filter(self, text: str, column: int = 0):
+        """Show only rows whose ``column`` contains ``text`` (case-insensitive)"""
+        self.beginResetModel()
+        self._filter = (column, text.lower()) if text else None
+        self._rebuild_index()
+        self.endResetModel()
+
+    def _rebuild_index(self):
+        if self._sort is None and self._filter is None:
+            self._index = None
+            return
+
+        self._index = self._sorted(self._filtered(np.arange(self._stored_rows)))
+
+    def _filtered(self, rows: np.ndarray) -> np.ndarray:
+        """Return the stored ``rows`` that pass the filter"""
+        if self._filter is None:
+            return rows
+        column, needle = self._filter
+        store = self._stores[column]
+        mask = np.fromiter(
+            (needle in str(store.get(row)).lower() for row in rows),
+            dtype=bool, count=len(rows)
+        )
+        return rows[mask]
+
+    def _sorted(self, rows: np.ndarray) -> np.ndarray:
+        """Return stored ``rows`` in the sort order"""
+        if self._sort is None:
+            return rows
+        column, order = self._sort
+        keys = self._stores[column].sort_keys()[rows]
+        rows = rows[np.argsort(keys, kind='stable')]
+        if order == Qt.DescendingOrder:
+            rows = rows[::-1]
+        return rows
+
+    # Model interface
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._stored_rows if self._index is None else len(self._index)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section][0]
+        return None
+
+    def row_value(self, row: int, key: str):
+        """Return the raw value of ``key`` for a view row"""
+        column = next(i for i, (_, k, _, _) in enumerate(self.columns) if k == key)
+        return self._value(row, column)
+
+    def _value(self, row: int, column: int):
+        stored = row if self._index is None else int(self._index[row])
+        return self._stores[column].get(stored)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            value = self._value(index.row(), index.column())
+            fmt = self.columns[index.column()][3]
+            return format(value, fmt) if fmt else str(value)
+        if role == Qt.UserRole:
+            return self._value(index.row(), index.column())
+        if role == Qt.TextAlignmentRole and self.columns[index.column()][2] in ('float', 'int'):
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+
+class HistoryTableModel(PagedTableModel):
+    """Uploaded datasets, newest first"""
+    COLUMNS = [
+        ('Filename', 'filename', 'str', None),
+        ('Count', 'total_count', 'int', None),
+        ('Avg Flowrate', 'avg_flowrate', 'float', '.2f'),
+        ('Date', 'uploaded_date', 'category', None),
+        ('ID', 'id', 'int', None),
+    ]
+
+    def __init__(self, fetch_page: FetchPage, request_manager, parent=None):
+        super().__init__(self.COLUMNS, fetch_page, request_manager, 'history-page', parent)
+
+    def _append(self, rows):
+        for row in rows:
+            row['uploaded_date'] = row['uploaded_at'][:10]
+            if row['avg_flowrate'] is None:
+                row['avg_flowrate'] = float('nan')
+        super()._append(rows)
+
+
+class EquipmentTableModel(PagedTableModel):
+    """Equipment rows of one dataset"""
+    COLUMNS = [
+        ('Equipment Name', 'equipment_name', 'str', None),
+        ('Type', 'equipment_type', 'category', None),
+        ('Flowrate', 'flowrate', 'float', '.2f'),
+        ('Pressure', 'pressure', 'float', '.2f'),
+        ('Temperature', 'temperature', 'float', '.2f'),
+    ]
+
+    def __init__(self, fetch_page: FetchPage, request_manager, parent=None):
+        super().__init__(self.COLUMNS, fetch_page, request_manager, 'equipment-page', parent)
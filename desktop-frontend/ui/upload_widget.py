@@ -1,13 +1,24 @@
 """Upload Widget - CSV file upload interface"""
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QPushButton, QLabel, QFileDialog, QMessageBox
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QFileDialog,
+                             QMessageBox, QProgressBar, QCheckBox)
 from PyQt5.QtCore import pyqtSignal
+import os
+
+from services.api_service import SINGLE_UPLOAD_LIMIT
+from services.local_analysis import validate_csv
 
 class UploadWidget(QWidget):
     upload_success = pyqtSignal(int)
+    local_analysis_ready = pyqtSignal(object)
     
-    def __init__(self, api_service):
+    def __init__(self, api_service, request_manager, local_analyzer=None):
         super().__init__()
         self.api_service = api_service
+        self.request_manager = request_manager
+        self.local_analyzer = local_analyzer
+        self.offline = False
+        # None while the pre-upload check runs or has not run
+        self.file_valid = None
         self.init_ui()
     
     def init_ui(self):
@@ -20,10 +31,38 @@ class UploadWidget(QWidget):
         select_btn.clicked.connect(self.select_file)
         layout.addWidget(select_btn)
         
+        self.compress_check = QCheckBox("Compress before sending (gzip, files up to 5 MB)")
+        self.compress_check.setChecked(True)
+        layout.addWidget(self.compress_check)
+        
+        buttons = QHBoxLayout()
         self.upload_btn = QPushButton("Upload")
         self.upload_btn.clicked.connect(self.upload_file)
         self.upload_btn.setEnabled(False)
-        layout.addWidget(self.upload_btn)
+        buttons.addWidget(self.upload_btn)
+        
+        # Charts straight from the local file; the upload is synced later
+        self.local_btn = QPushButton("Analyze Locally")
+        self.local_btn.clicked.connect(self.analyze_locally)
+        self.local_btn.setEnabled(False)
+        self.local_btn.setVisible(self.local_analyzer is not None)
+        buttons.addWidget(self.local_btn)
+        
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.cancel_upload)
+        self.cancel_btn.setVisible(False)
+        buttons.addWidget(self.cancel_btn)
+        layout.addLayout(buttons)
+        
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+        
+        self.errors_label = QLabel()
+        self.errors_label.setStyleSheet("color: #c0392b;")
+        self.errors_label.setWordWrap(True)
+        self.errors_label.setVisible(False)
+        layout.addWidget(self.errors_label)
         
         layout.addStretch()
         self.setLayout(layout)
@@ -33,19 +72,137 @@ class UploadWidget(QWidget):
         file_path, _ = QFileDialog.getOpenFileName(self, "Select CSV File", "", "CSV Files (*.csv)")
         if file_path:
             self.selected_file = file_path
-            self.status_label.setText(f"Selected: {file_path}")
-            self.upload_btn.setEnabled(True)
+            self.validate_file()
+    
+    def validate_file(self):
+        """Check the selected file in the background; invalid files are never sent"""
+        self.file_valid = None
+        self.upload_btn.setEnabled(False)
+        self.local_btn.setEnabled(False)
+        self.errors_label.setVisible(False)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.status_label.setText(f"Checking {self.selected_file}...")
+        self.request_manager.submit(
+            validate_csv, self.selected_file,
+            key='validate',
+            on_progress=self.on_validation_progress,
+            on_result=self.on_validation_finished,
+            on_error=self.on_validation_error,
+        )
+    
+    def on_validation_progress(self, rows, estimated_rows):
+        self.progress_bar.setValue(rows * 100 // estimated_rows if estimated_rows else 0)
+        self.status_label.setText(
+            f"Checking {self.selected_file}: {rows:,} of ~{estimated_rows:,} rows..."
+        )
+    
+    def on_validation_finished(self, result):
+        self.progress_bar.setVisible(False)
+        self.file_valid = result['valid']
+        if self.file_valid:
+            self.status_label.setText(f"Selected: {self.selected_file} ({result['rows']:,} rows)")
+        else:
+            rows = f"{result['rows']:,} rows checked" if result['complete'] else "check stopped early"
+            self.status_label.setText(f"Invalid file: {self.selected_file} ({rows})")
+            self.errors_label.setText("\n".join(result['errors']))
+            self.errors_label.setVisible(True)
+        self._update_buttons()
+    
+    def on_validation_error(self, error):
+        # The check itself failed, e.g. on a binary file: never send it
+        self.progress_bar.setVisible(False)
+        self.file_valid = False
+        self.status_label.setText(f"Could not check: {self.selected_file}")
+        self.errors_label.setText(str(error))
+        self.errors_label.setVisible(True)
+        self._update_buttons()
+    
+    def _update_buttons(self):
+        ready = bool(self.selected_file) and bool(self.file_valid)
+        self.upload_btn.setEnabled(ready and not self.offline)
+        self.local_btn.setEnabled(ready)
     
     def upload_file(self):
+        if not self.selected_file or not self.file_valid:
+            return
+        
+        self.upload_btn.setEnabled(False)
+        self.cancel_btn.setVisible(True)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        if os.path.getsize(self.selected_file) > SINGLE_UPLOAD_LIMIT:
+            # Large files go in resumable chunks; a cancelled upload picks up where it stopped
+            self.status_label.setText(f"Uploading {self.selected_file} in chunks...")
+            call, kwargs = self.api_service.upload_csv_resumable, {}
+        else:
+            compress = self.compress_check.isChecked()
+            verb = "Compressing and uploading" if compress else "Uploading"
+            self.status_label.setText(f"{verb} {self.selected_file}...")
+            call, kwargs = self.api_service.upload_csv, {'compress': compress}
+        self.request_manager.submit(
+            call, self.selected_file,
+            key='upload',
+            on_progress=self.on_upload_progress,
+            on_result=self.on_upload_finished,
+            on_error=self.on_upload_error,
+            **kwargs,
+        )
+    
+    def on_upload_progress(self, done, total):
+        if total:
+            self.progress_bar.setValue(done * 100 // total)
+    
+    def cancel_upload(self):
+        # The worker aborts at its next chunk; its callbacks are not invoked
+        self.request_manager.cancel('upload')
+        self._reset_progress()
+        self._update_buttons()
+        self.status_label.setText(f"Upload cancelled. Selected: {self.selected_file}")
+    
+    def _reset_progress(self):
+        self.cancel_btn.setVisible(False)
+        self.progress_bar.setVisible(False)
+    
+    def on_upload_finished(self, result):
+        self._reset_progress()
+        dataset_id = result['data']['id']
+        self.selected_file = None
+        self.file_valid = None
+        self._update_buttons()
+        self.status_label.setText("Upload successful!")
+        self.upload_success.emit(dataset_id)
+    
+    def on_upload_error(self, error):
+        self._reset_progress()
+        self._update_buttons()
+        self.status_label.setText(f"Selected: {self.selected_file}")
+        QMessageBox.critical(self, "Error", f"Upload failed: {str(error)}")
+    
+    def set_offline(self, offline):
+        """Allow only local analysis while there is no server session"""
+        self.offline = offline
+        self._update_buttons()
+    
+    def analyze_locally(self):
         if not self.selected_file:
             return
         
-        try:
-            result = self.api_service.upload_csv(self.selected_file)
-            dataset_id = result['data']['id']
-            self.upload_success.emit(dataset_id)
-            self.selected_file = None
-            self.upload_btn.setEnabled(False)
-            self.status_label.setText("Upload successful!")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Upload failed: {str(e)}")
+        file_path = self.selected_file
+        self.local_btn.setEnabled(False)
+        self.status_label.setText(f"Analyzing {file_path} locally...")
+        self.request_manager.submit(
+            self.local_analyzer.analyze, file_path,
+            key='local-analysis',
+            on_result=self.on_local_analysis_finished,
+            on_error=self.on_local_analysis_error,
+            on_finished=self._update_buttons,
+        )
+    
+    def on_local_analysis_finished(self, result):
+        self.status_label.setText("Local analysis complete; the upload will sync when online")
+        self.local_analysis_ready.emit(result)
+    
+    def on_local_analysis_error(self, error):
+        self.status_label.setText(f"Selected: {self.selected_file}")
+        QMessageBox.critical(self, "Error", f"Analysis failed: {str(error)}")
@@ -1,13 +1,18 @@
 """Visualization Widget - Display charts with Matplotlib"""
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QPushButton, QLabel, QFileDialog
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QFileDialog,
+                             QSplitter, QTableView, QLineEdit, QHeaderView, QComboBox)
+from PyQt5.QtCore import Qt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
+
+from ui.chart_renderer import ChartRenderer, PARAMETERS
+from ui.table_models import EquipmentTableModel, page_number_fetcher
 
 class VisualizationWidget(QWidget):
-    def __init__(self, api_service):
+    def __init__(self, api_service, request_manager):
         super().__init__()
         self.api_service = api_service
+        self.request_manager = request_manager
         self.current_dataset = None
         self.init_ui()
     
@@ -17,42 +22,109 @@ class VisualizationWidget(QWidget):
         self.info_label = QLabel("Select a dataset from history to visualize")
         layout.addWidget(self.info_label)
         
-        self.figure = Figure(figsize=(10, 6))
+        controls = QHBoxLayout()
+        self.x_combo = self._parameter_combo('flowrate')
+        self.y_combo = self._parameter_combo('temperature')
+        self.hist_combo = self._parameter_combo('flowrate')
+        for label, combo in (("Scatter X:", self.x_combo), ("Y:", self.y_combo),
+                             ("Histogram:", self.hist_combo)):
+            controls.addWidget(QLabel(label))
+            controls.addWidget(combo)
+        controls.addStretch()
+        self.x_combo.currentIndexChanged.connect(self.on_scatter_axes_changed)
+        self.y_combo.currentIndexChanged.connect(self.on_scatter_axes_changed)
+        self.hist_combo.currentIndexChanged.connect(
+            lambda: self.charts.set_histogram_parameter(self.hist_combo.currentData()))
+        layout.addLayout(controls)
+        
+        splitter = QSplitter(Qt.Vertical)
+        
+        self.figure = Figure(figsize=(10, 8))
         self.canvas = FigureCanvas(self.figure)
-        layout.addWidget(self.canvas)
+        self.charts = ChartRenderer(self.figure, self.canvas)
+        splitter.addWidget(self.canvas)
+        
+        # Equipment rows, paged in from the server as the table scrolls
+        table_panel = QWidget()
+        table_layout = QVBoxLayout(table_panel)
+        table_layout.setContentsMargins(0, 0, 0, 0)
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter by equipment name...")
+        self.filter_edit.textChanged.connect(lambda text: self.equipment_model.set_filter(text, 0))
+        table_layout.addWidget(self.filter_edit)
         
-        pdf_btn = QPushButton("Download PDF Report")
-        pdf_btn.clicked.connect(self.download_pdf)
-        layout.addWidget(pdf_btn)
+        self.equipment_model = EquipmentTableModel(lambda page: ([], None, 0), self.request_manager, self)
+        self.equipment_table = QTableView()
+        self.equipment_table.setModel(self.equipment_model)
+        self.equipment_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.equipment_table.setSortingEnabled(True)
+        self.equipment_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        # Uniform row heights let the view skip measuring every row
+        self.equipment_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        table_layout.addWidget(self.equipment_table)
+        splitter.addWidget(table_panel)
+        
+        layout.addWidget(splitter)
+        
+        self.pdf_btn = QPushButton("Download PDF Report")
+        self.pdf_btn.clicked.connect(self.download_pdf)
+        layout.addWidget(self.pdf_btn)
         
         self.setLayout(layout)
     
+    def _parameter_combo(self, selected):
+        combo = QComboBox()
+        for key in PARAMETERS:
+            combo.addItem(key.capitalize(), key)
+        combo.setCurrentIndex(PARAMETERS.index(selected))
+        return combo
+    
     def load_dataset(self, dataset_id):
-        try:
-            result = self.api_service.get_dataset_summary(dataset_id)
-            self.current_dataset = result
-            self.info_label.setText(f"Dataset: {result['dataset']['filename']}")
-            self.plot_charts(result['analysis'])
-        except Exception as e:
-            self.info_label.setText(f"Error loading dataset: {e}")
+        # Supersedes any dataset still loading, e.g. after clicking another row
+        self.info_label.setText("Loading dataset...")
+        self.request_manager.submit(
+            self.api_service.get_dataset_summary, dataset_id,
+            key='dataset',
+            on_result=self.on_dataset_loaded,
+            on_error=lambda e: self.info_label.setText(f"Error loading dataset: {e}"),
+        )
     
-    def plot_charts(self, analysis):
-        self.figure.clear()
+    def on_dataset_loaded(self, result):
+        self.current_dataset = result
+        self.pdf_btn.setEnabled(True)
+        self.info_label.setText(f"Dataset: {result['dataset']['filename']}")
+        self.plot_charts(result['analysis'])
         
-        ax1 = self.figure.add_subplot(121)
-        types = list(analysis['equipment_type_distribution'].keys())
-        counts = list(analysis['equipment_type_distribution'].values())
-        ax1.pie(counts, labels=types, autopct='%1.1f%%')
-        ax1.set_title('Equipment Type Distribution')
-        
-        ax2 = self.figure.add_subplot(122)
-        params = ['Flowrate', 'Pressure', 'Temperature']
-        values = [analysis['avg_flowrate'], analysis['avg_pressure'], analysis['avg_temperature']]
-        ax2.bar(params, values, color=['#4CAF50', '#2196F3', '#FF9800'])
-        ax2.set_title('Average Parameters')
-        ax2.set_ylabel('Value')
-        
-        self.canvas.draw()
+        dataset_id = result['dataset']['id']
+        # Per-equipment charts come from a server-side downsampled series
+        self.charts.clear_series()
+        self.request_manager.submit(
+            self.api_service.get_dataset_series, dataset_id,
+            key='series',
+            on_result=self.charts.set_series,
+            on_error=lambda e: self.info_label.setText(f"Error loading charts: {e}"),
+        )
+        self.equipment_model.reload(fetch_page=page_number_fetcher(
+            lambda page: self.api_service.get_equipment(dataset_id, page)
+        ))
+    
+    def show_local_result(self, result):
+        """Show a dataset analyzed on this machine that is not on the server yet"""
+        self.request_manager.cancel('dataset')
+        self.request_manager.cancel('series')
+        self.current_dataset = None
+        # Reports are generated by the server once the upload has synced
+        self.pdf_btn.setEnabled(False)
+        self.info_label.setText(f"Dataset: {result['dataset']['filename']} (local, not yet synced)")
+        self.plot_charts(result['analysis'])
+        self.charts.set_series(result['series'])
+        self.equipment_model.reload(initial_rows=result['rows'], initial_next=None)
+    
+    def plot_charts(self, analysis):
+        self.charts.set_summary(analysis)
+    
+    def on_scatter_axes_changed(self):
+        self.charts.set_scatter_axes(self.x_combo.currentData(), self.y_combo.currentData())
     
     def download_pdf(self):
         if not self.current_dataset:
@@ -60,9 +132,20 @@ class VisualizationWidget(QWidget):
         
         file_path, _ = QFileDialog.getSaveFileName(self, "Save PDF", "", "PDF Files (*.pdf)")
         if file_path:
-            try:
-                dataset_id = self.current_dataset['dataset']['id']
-                self.api_service.download_pdf(dataset_id, file_path)
-                self.info_label.setText(f"PDF saved to {file_path}")
-            except Exception as e:
-                self.info_label.setText(f"Error downloading PDF: {e}")
+            dataset_id = self.current_dataset['dataset']['id']
+            self.pdf_btn.setEnabled(False)
+            self.info_label.setText("Generating PDF report...")
+            self.request_manager.submit(
+                self.api_service.download_pdf, dataset_id, file_path,
+                key='pdf-download',
+                on_progress=self.on_pdf_progress,
+                on_result=lambda _: self.info_label.setText(f"PDF saved to {file_path}"),
+                on_error=lambda e: self.info_label.setText(f"Error downloading PDF: {e}"),
+                on_finished=lambda: self.pdf_btn.setEnabled(True),
+            )
+    
+    def on_pdf_progress(self, done, total):
+        if total:
+            self.info_label.setText(f"Downloading PDF... {done * 100 // total}%")
+        else:
+            self.info_label.setText(f"Downloading PDF... {done // 1024} KB")
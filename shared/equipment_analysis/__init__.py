@@ -0,0 +1,28 @@
+"""
+CSV validation and analysis shared by the backend and the desktop client.
+
+    pip install -e shared
+"""
+
+from .analysis import (
+    NUMERIC_COLUMNS,
+    REQUIRED_COLUMNS,
+    AnalysisAccumulator,
+    CSVError,
+    DecompressedSizeExceeded,
+    analyze_equipment_data,
+    build_parameter_series,
+    convert_dataframe_to_list,
+    equipment_rows,
+    iter_csv_chunks,
+    parse_csv_file,
+    process_csv_path,
+    validate_csv_stream,
+    validate_csv_structure,
+)
+
+__all__ = [
+    'NUMERIC_COLUMNS', 'REQUIRED_COLUMNS', 'AnalysisAccumulator', 'CSVError', 'DecompressedSizeExceeded',
+    'analyze_equipment_data', 'build_parameter_series', 'convert_dataframe_to_list', 'equipment_rows',
+    'iter_csv_chunks', 'parse_csv_file', 'process_csv_path', 'validate_csv_stream', 'validate_csv_structure',
+]
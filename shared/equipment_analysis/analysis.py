@@ -0,0 +1,468 @@
+"""
+CSV validation and analysis for the Equipment application.
+Depends only on pandas and numpy (no Django): the backend and the desktop
+client both import it, so offline analysis runs the exact same code.
+"""
+
+import gzip
+import io
+import os
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+REQUIRED_COLUMNS = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+NUMERIC_COLUMNS = ['Flowrate', 'Pressure', 'Temperature']
+
+
+def validate_csv_structure(df: pd.DataFrame) -> Tuple[bool, str]:
+    """
+    Validate that the CSV has the required columns and data types.
+    
+    Args:
+        df: Pandas DataFrame to validate
+        
+    Returns:
+        Tuple of (is_valid, error_message)
+    """
+    # Check for required columns
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        return False, f"Missing required columns: {', '.join(missing_columns)}"
+    
+    # Check for empty dataframe
+    if df.empty:
+        return False, "CSV file is empty"
+    
+    # Validate data types for numeric columns
+    for col in NUMERIC_COLUMNS:
+        try:
+            pd.to_numeric(df[col], errors='raise')
+        except (ValueError, TypeError):
+            return False, f"Column '{col}' must contain numeric values"
+    
+    # Check for null values in required columns
+    null_counts = df[REQUIRED_COLUMNS].isnull().sum()
+    columns_with_nulls = null_counts[null_counts > 0].index.tolist()
+    if columns_with_nulls:
+        return False, f"Null values found in columns: {', '.join(columns_with_nulls)}"
+    
+    return True, ""
+
+
+def parse_csv_file(file: BinaryIO, max_decompressed_size: Optional[int] = None) -> Tuple[pd.DataFrame, str]:
+    """
+    Parse uploaded CSV file into a pandas DataFrame.
+    Files named ``*.gz`` are decompressed while reading.
+    
+    Args:
+        file: Uploaded CSV file, or any binary file object with a ``name``
+        max_decompressed_size: Largest size a ``*.gz`` file may inflate to, in bytes
+        
+    Returns:
+        Tuple of (DataFrame, error_message)
+    """
+    try:
+        # Read CSV file straight from the upload, without an in-memory copy
+        df = pd.read_csv(_open_source(file, max_decompressed_size))
+        
+        # Validate structure
+        is_valid, error_msg = validate_csv_structure(df)
+        if not is_valid:
+            return None, error_msg
+        
+        # Clean data
+        df = df.dropna(subset=REQUIRED_COLUMNS)
+        
+        # Ensure numeric columns are properly typed
+        df['Flowrate'] = pd.to_numeric(df['Flowrate'])
+        df['Pressure'] = pd.to_numeric(df['Pressure'])
+        df['Temperature'] = pd.to_numeric(df['Temperature'])
+        
+        return df, ""
+    
+    except pd.errors.EmptyDataError:
+        return None, "CSV file is empty"
+    except pd.errors.ParserError as e:
+        return None, f"Error parsing CSV: {str(e)}"
+    except (OSError, EOFError) as e:
+        return None, f"Error decompressing CSV: {str(e)}"
+    except Exception as e:
+        return None, f"Unexpected error reading CSV: {str(e)}"
+
+
+class DecompressedSizeExceeded(OSError):
+    """A compressed CSV file inflates past the allowed size."""
+
+
+class _LimitedReader(io.RawIOBase):
+    """Read-only stream over ``source`` that fails once more than ``limit`` bytes are read."""
+    
+    def __init__(self, source: BinaryIO, limit: int):
+        super().__init__()
+        self._source = source
+        self._limit = limit
+        self._consumed = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        data = self._source.read(len(buffer))
+        self._consumed += len(data)
+        if self._consumed > self._limit:
+            raise DecompressedSizeExceeded(
+                f"decompressed size exceeds the {self._limit // (1024 * 1024)}MB limit"
+            )
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def _open_source(file: BinaryIO, max_decompressed_size: Optional[int] = None) -> BinaryIO:
+    """
+    Rewind ``file`` and wrap it in a decompressor if its name ends in .gz.
+    The compressed size says little about the decompressed one, so reading
+    past ``max_decompressed_size`` bytes raises DecompressedSizeExceeded.
+    """
+    file.seek(0)
+    if not file.name.endswith('.gz'):
+        return file
+    source = gzip.GzipFile(fileobj=file)
+    if max_decompressed_size is None:
+        return source
+    return io.BufferedReader(_LimitedReader(source, max_decompressed_size))
+
+
+def _locate_errors(chunk: pd.DataFrame, limit: int) -> List[Tuple[int, str]]:
+    """
+    Find the first rows of a chunk that break the validate_csv_structure rules.
+    
+    Returns:
+        Up to ``limit`` (row_number, message) pairs with 1-based data row numbers
+    """
+    errors = []
+    for col in NUMERIC_COLUMNS:
+        values = chunk[col]
+        bad = values.notna() & pd.to_numeric(values, errors='coerce').isna()
+        for index in values.index[bad][:limit]:
+            errors.append((index + 1, f"Column '{col}' must contain numeric values (got {values[index]!r})"))
+    nulls = chunk[REQUIRED_COLUMNS].isnull()
+    for index in nulls.index[nulls.any(axis=1)][:limit]:
+        columns = nulls.columns[nulls.loc[index]].tolist()
+        errors.append((index + 1, f"Null values found in columns: {', '.join(columns)}"))
+    return sorted(errors)[:limit]
+
+
+def validate_csv_stream(file: BinaryIO, chunk_rows: int = 100_000, max_errors: int = 10,
+                        progress_callback: Optional[Callable[[int, int], None]] = None,
+                        max_decompressed_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Validate a CSV file in chunks, without loading it into memory.
+    
+    Applies the same rules as validate_csv_structure, chunk by chunk, so a
+    file that passes here is accepted by parse_csv_file. Only the required
+    columns are read, and the pass stops after ``max_errors`` errors.
+    
+    Args:
+        file: Binary file object with a ``name``; ``*.gz`` files are decompressed
+        chunk_rows: Number of rows read per chunk
+        max_errors: Maximum number of errors collected
+        progress_callback: Called as ``(rows_checked, estimated_rows)`` after each chunk
+        max_decompressed_size: Largest size a ``*.gz`` file may inflate to, in bytes
+        
+    Returns:
+        Dictionary with ``valid``, ``rows`` (rows checked), ``complete``
+        (whether the whole file was read) and ``errors`` (messages in file order)
+    """
+    file.seek(0, os.SEEK_END)
+    total_size = file.tell()
+    result = {'valid': False, 'rows': 0, 'complete': False, 'errors': []}
+    
+    try:
+        header = pd.read_csv(_open_source(file, max_decompressed_size), nrows=0).columns
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in header]
+        if missing_columns:
+            result['errors'].append(f"Missing required columns: {', '.join(missing_columns)}")
+            return result
+        
+        reader = pd.read_csv(_open_source(file, max_decompressed_size), usecols=REQUIRED_COLUMNS, chunksize=chunk_rows)
+        with reader:
+            for chunk in reader:
+                if chunk.empty:
+                    continue
+                is_valid, error_msg = validate_csv_structure(chunk)
+                if not is_valid:
+                    located = _locate_errors(chunk, max_errors - len(result['errors']))
+                    if located:
+                        result['errors'].extend(f"Row {row}: {message}" for row, message in located)
+                    else:
+                        first = result['rows'] + 1
+                        result['errors'].append(f"Rows {first}-{first + len(chunk) - 1}: {error_msg}")
+                result['rows'] += len(chunk)
+                
+                if progress_callback:
+                    # The compressed or raw position read so far extrapolates the row count
+                    consumed = file.tell()
+                    estimate = result['rows'] * total_size // consumed if consumed else result['rows']
+                    progress_callback(result['rows'], max(estimate, result['rows']))
+                if len(result['errors']) >= max_errors:
+                    del result['errors'][max_errors:]
+                    return result
+    
+    except pd.errors.EmptyDataError:
+        result['errors'].append("CSV file is empty")
+        return result
+    except pd.errors.ParserError as e:
+        result['errors'].append(f"Error parsing CSV: {str(e)}")
+        return result
+    except UnicodeDecodeError as e:
+        result['errors'].append(f"CSV file is not UTF-8 text: {str(e)}")
+        return result
+    except (OSError, EOFError) as e:
+        result['errors'].append(f"Error decompressing CSV: {str(e)}")
+        return result
+    
+    result['complete'] = True
+    if result['rows'] == 0:
+        result['errors'].append("CSV file is empty")
+    result['valid'] = not result['errors']
+    if progress_callback:
+        progress_callback(result['rows'], result['rows'])
+    return result
+
+
+class CSVError(ValueError):
+    """An equipment CSV failed validation; the message is meant for the uploader."""
+
+
+def iter_csv_chunks(file: BinaryIO, chunk_rows: int = 100_000,
+                    max_decompressed_size: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """
+    Yield a CSV file as validated DataFrames of up to ``chunk_rows`` rows,
+    for files too large to parse whole.
+    
+    Chunks hold the required columns only, with numeric columns typed as in
+    parse_csv_file, whose rules every chunk must pass.
+    
+    Args:
+        file: Binary file object with a ``name``; ``*.gz`` files are decompressed
+        chunk_rows: Number of rows per chunk
+        max_decompressed_size: Largest size a ``*.gz`` file may inflate to, in bytes
+        
+    Raises:
+        CSVError: At the first chunk that breaks a rule, or if the file has no rows
+    """
+    rows = 0
+    try:
+        header = pd.read_csv(_open_source(file, max_decompressed_size), nrows=0).columns
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in header]
+        if missing_columns:
+            raise CSVError(f"Missing required columns: {', '.join(missing_columns)}")
+        
+        reader = pd.read_csv(_open_source(file, max_decompressed_size), usecols=REQUIRED_COLUMNS, chunksize=chunk_rows)
+        with reader:
+            for chunk in reader:
+                if chunk.empty:
+                    continue
+                is_valid, error_msg = validate_csv_structure(chunk)
+                if not is_valid:
+                    located = _locate_errors(chunk, 1)
+                    if located:
+                        row, message = located[0]
+                        raise CSVError(f"Row {row}: {message}")
+                    raise CSVError(f"Rows {rows + 1}-{rows + len(chunk)}: {error_msg}")
+                for col in NUMERIC_COLUMNS:
+                    chunk[col] = pd.to_numeric(chunk[col])
+                rows += len(chunk)
+                yield chunk
+    
+    except pd.errors.EmptyDataError:
+        raise CSVError("CSV file is empty") from None
+    except pd.errors.ParserError as e:
+        raise CSVError(f"Error parsing CSV: {str(e)}") from None
+    except UnicodeDecodeError as e:
+        raise CSVError(f"CSV file is not UTF-8 text: {str(e)}") from None
+    except (OSError, EOFError) as e:
+        raise CSVError(f"Error decompressing CSV: {str(e)}") from None
+    
+    if rows == 0:
+        raise CSVError("CSV file is empty")
+
+
+class AnalysisAccumulator:
+    """
+    Builds the analyze_equipment_data() result of a file chunk by chunk,
+    keeping only running totals in memory.
+    """
+    
+    def __init__(self):
+        self.total_count = 0
+        self._sums = dict.fromkeys(NUMERIC_COLUMNS, 0.0)
+        self._mins = {}
+        self._maxs = {}
+        # Type -> [count, flowrate sum, pressure sum, temperature sum], in order of first appearance
+        self._types = {}
+    
+    def add(self, df: pd.DataFrame) -> None:
+        """Add the rows of a chunk, typed as yielded by iter_csv_chunks."""
+        if df.empty:
+            return
+        self.total_count += len(df)
+        for col in NUMERIC_COLUMNS:
+            self._sums[col] += float(df[col].sum())
+            low, high = float(df[col].min()), float(df[col].max())
+            self._mins[col] = min(self._mins.get(col, low), low)
+            self._maxs[col] = max(self._maxs.get(col, high), high)
+        grouped = df.groupby('Type', sort=False)[NUMERIC_COLUMNS]
+        sums = grouped.sum()
+        for equipment_type, count in grouped.size().items():
+            totals = self._types.setdefault(equipment_type, [0, 0.0, 0.0, 0.0])
+            totals[0] += int(count)
+            for i, col in enumerate(NUMERIC_COLUMNS, start=1):
+                totals[i] += float(sums.at[equipment_type, col])
+    
+    def result(self) -> Dict[str, Any]:
+        """Return the analysis of every row added so far, as analyze_equipment_data() would."""
+        count = self.total_count
+        analysis = {'total_count': count}
+        for col in NUMERIC_COLUMNS:
+            key = col.lower()
+            analysis[f'avg_{key}'] = self._sums[col] / count if count else float('nan')
+        for col in NUMERIC_COLUMNS:
+            key = col.lower()
+            analysis[f'min_{key}'] = self._mins.get(col, float('nan'))
+            analysis[f'max_{key}'] = self._maxs.get(col, float('nan'))
+        by_count = sorted(self._types.items(), key=lambda item: -item[1][0])
+        analysis['equipment_type_distribution'] = {
+            equipment_type: totals[0] for equipment_type, totals in by_count
+        }
+        analysis['statistics_by_type'] = {
+            equipment_type: {
+                'count': type_count,
+                'avg_flowrate': flowrate / type_count,
+                'avg_pressure': pressure / type_count,
+                'avg_temperature': temperature / type_count,
+            }
+            for equipment_type, (type_count, flowrate, pressure, temperature) in self._types.items()
+        }
+        return analysis
+
+
+def analyze_equipment_data(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Perform statistical analysis on equipment data.
+    
+    Args:
+        df: DataFrame containing equipment data
+        
+    Returns:
+        Dictionary with summary statistics
+    """
+    analysis = {
+        'total_count': len(df),
+        'avg_flowrate': float(df['Flowrate'].mean()),
+        'avg_pressure': float(df['Pressure'].mean()),
+        'avg_temperature': float(df['Temperature'].mean()),
+        'min_flowrate': float(df['Flowrate'].min()),
+        'max_flowrate': float(df['Flowrate'].max()),
+        'min_pressure': float(df['Pressure'].min()),
+        'max_pressure': float(df['Pressure'].max()),
+        'min_temperature': float(df['Temperature'].min()),
+        'max_temperature': float(df['Temperature'].max()),
+        'equipment_type_distribution': df['Type'].value_counts().to_dict(),
+    }
+    
+    # Add statistics by equipment type
+    type_stats = {}
+    for equipment_type in df['Type'].unique():
+        type_df = df[df['Type'] == equipment_type]
+        type_stats[equipment_type] = {
+            'count': len(type_df),
+            'avg_flowrate': float(type_df['Flowrate'].mean()),
+            'avg_pressure': float(type_df['Pressure'].mean()),
+            'avg_temperature': float(type_df['Temperature'].mean()),
+        }
+    
+    analysis['statistics_by_type'] = type_stats
+    
+    return analysis
+
+
+def convert_dataframe_to_list(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Convert DataFrame to list of dictionaries for JSON serialization.
+    
+    Args:
+        df: Pandas DataFrame
+        
+    Returns:
+        List of dictionaries
+    """
+    return df.to_dict('records')
+
+
+def equipment_rows(df: pd.DataFrame) -> List[Tuple]:
+    """Return the required columns of every row as plain tuples, in file order."""
+    return list(df[REQUIRED_COLUMNS].itertuples(index=False, name=None))
+
+
+def process_csv_path(path: str, max_decompressed_size: Optional[int] = None) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Parse and analyze the CSV file at ``path`` (gzip-compressed if it ends in .gz).
+
+    Runs in batch upload worker processes, so it takes a path and returns
+    only picklable data.
+
+    Returns:
+        Tuple of ({'analysis', 'raw_data', 'rows'}, '') or (None, error message)
+    """
+    with open(path, 'rb') as f:
+        df, error_msg = parse_csv_file(f, max_decompressed_size)
+    if df is None:
+        return None, error_msg
+    return {
+        'analysis': analyze_equipment_data(df),
+        'raw_data': convert_dataframe_to_list(df),
+        'rows': equipment_rows(df),
+    }, ''
+
+
+def build_parameter_series(df: pd.DataFrame, max_points: int = 5000, bins: int = 50) -> Dict[str, Any]:
+    """
+    Build chart-ready per-equipment series for a dataset.
+    
+    Histograms are computed over every row; the scatter points are an evenly
+    strided sample of at most ``max_points`` rows, so the payload stays small
+    however large the dataset is.
+    
+    Args:
+        df: DataFrame with Equipment Name, Type, Flowrate, Pressure and Temperature columns
+        max_points: Maximum number of sampled rows
+        bins: Number of histogram bins per parameter
+        
+    Returns:
+        Dictionary with sampled columns, type codes and histograms
+    """
+    total = len(df)
+    if total > max_points:
+        sample = df.iloc[np.linspace(0, total - 1, max_points).astype(int)]
+    else:
+        sample = df
+    
+    type_codes, type_labels = pd.factorize(sample['Type'], sort=True)
+    series = {
+        'total_count': total,
+        'sampled_count': len(sample),
+        'types': type_codes.tolist(),
+        'type_labels': type_labels.tolist(),
+        'histograms': {},
+    }
+    for column in ['Flowrate', 'Pressure', 'Temperature']:
+        key = column.lower()
+        series[key] = sample[column].astype(float).tolist()
+        values = df[column].to_numpy(dtype=float)
+        counts, edges = np.histogram(values, bins=bins) if total else (np.array([]), np.array([]))
+        series['histograms'][key] = {'counts': counts.tolist(), 'edges': edges.tolist()}
+    
+    return series
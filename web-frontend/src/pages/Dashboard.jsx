@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
-import { datasetAPI } from '../services/api';
+import { datasetAPI, eventsAPI, DATASET_EVENTS } from '../services/api';
 import { toast } from 'react-toastify';
 import { Chart as ChartJS, ArcElement, Tooltip, Legend, CategoryScale, LinearScale, BarElement, Title } from 'chart.js';
 import { Pie, Bar } from 'react-chartjs-2';
@@ -14,6 +14,8 @@ const Dashboard = () => {
 
   useEffect(() => {
     fetchDashboardData();
+    const handlers = Object.fromEntries(DATASET_EVENTS.map((type) => [type, fetchDashboardData]));
+    return eventsAPI.subscribe(handlers);
   }, []);
 
   const fetchDashboardData = async () => {
@@ -32,18 +32,22 @@ const DatasetDetail = () => {
     }
   };
 
+  const saveBlob = (blob, filename) => {
+    const url = window.URL.createObjectURL(blob);
+    const link = document.createElement('a');
+    link.href = url;
+    link.download = filename;
+    document.body.appendChild(link);
+    link.click();
+    document.body.removeChild(link);
+    window.URL.revokeObjectURL(url);
+  };
+
   const handleDownloadPDF = async () => {
     setDownloading(true);
     try {
       const pdfBlob = await datasetAPI.generatePDF(id);
-      const url = window.URL.createObjectURL(pdfBlob);
-      const link = document.createElement('a');
-      link.href = url;
-      link.download = `report_${dataset.filename.replace('.csv', '')}.pdf`;
-      document.body.appendChild(link);
-      link.click();
-      document.body.removeChild(link);
-      window.URL.revokeObjectURL(url);
+      saveBlob(pdfBlob, `report_${dataset.filename.replace('.csv', '')}.pdf`);
       toast.success('PDF downloaded successfully');
     } catch (error) {
       toast.error('Failed to generate PDF');
@@ -52,6 +56,14 @@ const DatasetDetail = () => {
     }
   };
 
+  const handleDownloadCSV = async () => {
+    try {
+      saveBlob(await datasetAPI.downloadCSV(id), dataset.filename);
+    } catch (error) {
+      toast.error('The uploaded CSV file is not available');
+    }
+  };
+
   if (loading) {
     return (
       <div className="loading">
@@ -114,9 +126,14 @@ const DatasetDetail = () => {
           <h1>{dataset.filename}</h1>
           <p>Uploaded on {new Date(dataset.uploaded_at).toLocaleString()}</p>
         </div>
-        <button onClick={handleDownloadPDF} className="btn btn-primary" disabled={downloading}>
-          {downloading ? 'Generating PDF...' : '📄 Download PDF Report'}
-        </button>
+        <div style={{ display: 'flex', gap: '8px' }}>
+          <button onClick={handleDownloadCSV} className="btn btn-secondary">
+            Download CSV
+          </button>
+          <button onClick={handleDownloadPDF} className="btn btn-primary" disabled={downloading}>
+            {downloading ? 'Generating PDF...' : '📄 Download PDF Report'}
+          </button>
+        </div>
       </div>
 
       <div className="grid grid-3">
@@ -1,20 +1,26 @@
 import React, { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
-import { datasetAPI } from '../services/api';
+import { datasetAPI, eventsAPI, nextCursor, DATASET_EVENTS } from '../services/api';
 import { toast } from 'react-toastify';
 
 const History = () => {
   const [datasets, setDatasets] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [cursor, setCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchHistory();
+    // Uploads, deletions and pruning from any client refresh the list
+    const handlers = Object.fromEntries(DATASET_EVENTS.map((type) => [type, fetchHistory]));
+    return eventsAPI.subscribe(handlers);
   }, []);
 
   const fetchHistory = async () => {
     try {
       const response = await datasetAPI.getHistory();
       setDatasets(response.data || []);
+      setCursor(nextCursor(response));
     } catch (error) {
       toast.error('Failed to load history');
     } finally {
@@ -22,6 +28,19 @@ const History = () => {
     }
   };
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const response = await datasetAPI.getHistory(cursor);
+      setDatasets((current) => [...current, ...(response.data || [])]);
+      setCursor(nextCursor(response));
+    } catch (error) {
+      toast.error('Failed to load more history');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleDelete = async (id) => {
     if (!window.confirm('Are you sure you want to delete this dataset?')) {
       return;
@@ -30,7 +49,7 @@ const History = () => {
     try {
       await datasetAPI.deleteDataset(id);
       toast.success('Dataset deleted successfully');
-      setDatasets(datasets.filter(ds => ds.id !== id));
+      setDatasets((current) => current.filter(ds => ds.id !== id));
     } catch (error) {
       toast.error('Failed to delete dataset');
     }
@@ -49,7 +68,7 @@ const History = () => {
     <div className="page-container">
       <div className="page-header">
         <h1>Upload History</h1>
-        <p>View and manage your last 5 uploaded datasets</p>
+        <p>View and manage your uploaded datasets</p>
       </div>
 
       {datasets.length === 0 ? (
@@ -113,6 +132,14 @@ const History = () => {
           ))}
         </div>
       )}
+
+      {cursor && (
+        <div style={{ textAlign: 'center', marginTop: '24px' }}>
+          <button onClick={loadMore} className="btn btn-primary" disabled={loadingMore}>
+            {loadingMore ? 'Loading...' : 'Load More'}
+          </button>
+        </div>
+      )}
     </div>
   );
 };
@@ -1,6 +1,6 @@
-import React, { useState } from 'react';
+import React, { useRef, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { datasetAPI } from '../services/api';
+import { datasetAPI, uploadAPI, RESUMABLE_UPLOAD_THRESHOLD, UploadProcessingError } from '../services/api';
 import { toast } from 'react-toastify';
 import './Upload.css';
 
@@ -8,6 +8,7 @@ const Upload = () => {
   const [file, setFile] = useState(null);
   const [uploading, setUploading] = useState(false);
   const [uploadProgress, setUploadProgress] = useState(0);
+  const abortRef = useRef(null);
   const navigate = useNavigate();
 
   const handleFileChange = (e) => {
@@ -17,10 +18,6 @@ const Upload = () => {
         toast.error('Please select a CSV file');
         return;
       }
-      if (selectedFile.size > 5 * 1024 * 1024) {
-        toast.error('File size must not exceed 5MB');
-        return;
-      }
       setFile(selectedFile);
     }
   };
@@ -50,22 +47,46 @@ const Upload = () => {
     setUploading(true);
     setUploadProgress(0);
 
+    const controller = new AbortController();
+    abortRef.current = controller;
+
     try {
-      const response = await datasetAPI.uploadCSV(file, (progressEvent) => {
-        const progress = Math.round((progressEvent.loaded * 100) / progressEvent.total);
-        setUploadProgress(progress);
-      });
+      let response;
+      if (file.size > RESUMABLE_UPLOAD_THRESHOLD) {
+        // Large files go in resumable chunks; uploading the same file again resumes it
+        response = await uploadAPI.uploadResumable(
+          file,
+          (sent, total) => setUploadProgress(Math.round((sent * 100) / total)),
+          controller.signal
+        );
+      } else {
+        response = await datasetAPI.uploadCSV(file, (progressEvent) => {
+          const progress = Math.round((progressEvent.loaded * 100) / progressEvent.total);
+          setUploadProgress(progress);
+        }, controller.signal);
+      }
 
       toast.success(response.message || 'File uploaded successfully!');
       navigate(`/dataset/${response.data.id}`);
     } catch (error) {
-      const errorMsg = error.response?.data?.error || 'Upload failed';
-      toast.error(errorMsg);
+      if (controller.signal.aborted) {
+        toast.info('Upload cancelled');
+      } else {
+        const errorMsg = error instanceof UploadProcessingError
+          ? error.message
+          : error.response?.data?.error || 'Upload failed';
+        toast.error(errorMsg);
+      }
     } finally {
+      abortRef.current = null;
       setUploading(false);
     }
   };
 
+  const handleCancel = () => {
+    abortRef.current?.abort();
+  };
+
   const handleReset = () => {
     setFile(null);
     setUploadProgress(0);
@@ -83,7 +104,7 @@ const Upload = () => {
           <h3>CSV File Requirements</h3>
           <ul>
             <li>File must be in CSV format (.csv extension)</li>
-            <li>Maximum file size: 5MB</li>
+            <li>Files over 5MB are uploaded in resumable chunks</li>
             <li>Required columns: Equipment Name, Type, Flowrate, Pressure, Temperature</li>
             <li>All numeric columns must contain valid numbers</li>
             <li>No empty values in required columns</li>
@@ -130,6 +151,9 @@ const Upload = () => {
               <div className="progress-fill" style={{ width: `${uploadProgress}%` }}></div>
             </div>
             <p className="progress-text">{uploadProgress}%</p>
+            <button onClick={handleCancel} className="btn btn-secondary">
+              Cancel
+            </button>
           </div>
         )}
 
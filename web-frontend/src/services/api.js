@@ -74,9 +74,123 @@ export const authAPI = {
   },
 };
 
+// Files above the server's single-request limit use resumable chunked uploads
+export const RESUMABLE_UPLOAD_THRESHOLD = 5 * 1024 * 1024;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+const sha256Hex = async (blob) => {
+  const digest = await crypto.subtle.digest('SHA-256', await blob.arrayBuffer());
+  return Array.from(new Uint8Array(digest))
+    .map((byte) => byte.toString(16).padStart(2, '0'))
+    .join('');
+};
+
+// Retry network errors and 5xx responses with exponential backoff
+const withRetries = async (send, maxRetries = 5) => {
+  for (let attempt = 0; ; attempt++) {
+    try {
+      return await send();
+    } catch (error) {
+      const status = error.response?.status;
+      if (axios.isCancel(error) || (status && status < 500) || attempt >= maxRetries) {
+        throw error;
+      }
+      await sleep(Math.min(2 ** attempt, 30) * 1000);
+    }
+  }
+};
+
+// Upload API (resumable chunked uploads)
+export class UploadProcessingError extends Error {}
+
+export const uploadAPI = {
+  /**
+   * Upload a large CSV file in checksummed chunks. The upload id is kept in
+   * localStorage, so re-selecting the same file after a dropped connection
+   * or a page reload only sends the chunks the server has not received.
+   */
+  uploadResumable: async (file, onProgress, signal) => {
+    const resumeKey = `upload:${file.name}:${file.size}:${file.lastModified}`;
+    let upload = null;
+
+    const savedId = localStorage.getItem(resumeKey);
+    if (savedId) {
+      try {
+        const response = await withRetries(() => apiClient.get(`/uploads/${savedId}/`, { signal }));
+        if (response.data.data.status === 'active') {
+          upload = response.data.data;
+        }
+      } catch (error) {
+        if (axios.isCancel(error)) throw error;
+      }
+    }
+    if (!upload) {
+      const response = await withRetries(() =>
+        apiClient.post('/uploads/', { filename: file.name, total_size: file.size }, { signal })
+      );
+      upload = response.data.data;
+      localStorage.setItem(resumeKey, upload.id);
+    }
+
+    const received = new Set(upload.received_chunks);
+    const chunkLength = (index) => Math.min(upload.chunk_size, file.size - index * upload.chunk_size);
+    let sent = [...received].reduce((total, index) => total + chunkLength(index), 0);
+    onProgress?.(sent, file.size);
+
+    for (let index = 0; index < upload.total_chunks; index++) {
+      if (received.has(index)) continue;
+      const chunk = file.slice(index * upload.chunk_size, index * upload.chunk_size + chunkLength(index));
+      const checksum = await sha256Hex(chunk);
+      await withRetries(() =>
+        apiClient.put(`/uploads/${upload.id}/chunks/${index}/`, chunk, {
+          headers: {
+            'Content-Type': 'application/octet-stream',
+            'X-Chunk-SHA256': checksum,
+          },
+          signal,
+          onUploadProgress: (event) => onProgress?.(sent + event.loaded, file.size),
+        })
+      );
+      sent += chunk.size;
+      onProgress?.(sent, file.size);
+    }
+
+    try {
+      await withRetries(() => apiClient.post(`/uploads/${upload.id}/finalize/`, null, { signal }));
+    } catch (error) {
+      // 409: a finalize whose response was lost has already claimed the upload
+      if (error.response?.status !== 409) throw error;
+    }
+
+    // The server ingests the file in the background; poll until it is done
+    let delay = 500;
+    for (;;) {
+      const response = await withRetries(() => apiClient.get(`/uploads/${upload.id}/`, { signal }));
+      upload = response.data.data;
+      if (upload.status !== 'processing') break;
+      await sleep(delay);
+      delay = Math.min(delay * 2, 5000);
+    }
+    // An upload set back to active (checksum mismatch, interrupted
+    // processing) is finalized again when the file is selected again
+    if (upload.status !== 'active') {
+      localStorage.removeItem(resumeKey);
+    }
+    if (upload.status !== 'complete') {
+      throw new UploadProcessingError(`Processing ${upload.filename} failed: ${upload.error}`);
+    }
+    return {
+      success: true,
+      message: 'CSV file uploaded and processed successfully',
+      data: { id: upload.dataset },
+    };
+  },
+};
+
 // Dataset API
 export const datasetAPI = {
-  uploadCSV: async (file, onUploadProgress) => {
+  uploadCSV: async (file, onUploadProgress, signal) => {
     const formData = new FormData();
     formData.append('file', file);
     
@@ -85,6 +199,7 @@ export const datasetAPI = {
         'Content-Type': 'multipart/form-data',
       },
       onUploadProgress,
+      signal,
     });
     return response.data;
   },
@@ -99,8 +214,11 @@ export const datasetAPI = {
     return response.data;
   },
   
-  getHistory: async () => {
-    const response = await apiClient.get('/datasets/history/');
+  // History is paged by cursor; pass nextCursor(page) to get the page after `page`
+  getHistory: async (cursor = null) => {
+    const response = await apiClient.get('/datasets/history/', {
+      params: cursor ? { cursor } : {},
+    });
     return response.data;
   },
   
@@ -109,6 +227,12 @@ export const datasetAPI = {
     return response.data;
   },
   
+  // Summaries and analyses of several datasets in one request (server limit: 50 ids)
+  getSummaries: async (ids) => {
+    const response = await apiClient.get('/datasets/batch/', { params: { ids: ids.join(',') } });
+    return response.data;
+  },
+  
   generatePDF: async (id) => {
     const response = await apiClient.get(`/datasets/${id}/generate_pdf/`, {
       responseType: 'blob',
@@ -116,12 +240,98 @@ export const datasetAPI = {
     return response.data;
   },
   
+  downloadCSV: async (id) => {
+    const response = await apiClient.get(`/datasets/${id}/download_csv/`, {
+      responseType: 'blob',
+    });
+    return response.data;
+  },
+  
   deleteDataset: async (id) => {
     const response = await apiClient.delete(`/datasets/${id}/`);
     return response.data;
   },
 };
 
+// Dataset and upload events pushed by the server (Server-Sent Events).
+// The async route holds no server thread under ASGI; VITE_EVENTS_URL overrides it.
+const EVENTS_URL = import.meta.env.VITE_EVENTS_URL || `${API_BASE_URL}/async/events/`;
+
+// Cursor of the page after a cursor-paginated response, or null on the last page
+export const nextCursor = (page) =>
+  page.next ? new URL(page.next).searchParams.get('cursor') : null;
+
+// Delay before asking for a new stream ticket after the stream was refused
+const TICKET_RETRY_MS = 1000;
+
+export const eventsAPI = {
+  /**
+   * Subscribe to the user's events. `handlers` maps event types such as
+   * 'dataset.created' to callbacks that receive the parsed payload.
+   * EventSource reconnects by itself and resumes from the last event id.
+   * Returns a function that closes the stream.
+   */
+  subscribe: (handlers) => {
+    const token = localStorage.getItem('authToken');
+    if (!token || typeof EventSource === 'undefined') {
+      return () => {};
+    }
+    let source = null;
+    let closed = false;
+    let retryTimer = null;
+    let lastEventId = null;
+
+    const retry = () => {
+      retryTimer = setTimeout(open, TICKET_RETRY_MS);
+    };
+    // EventSource cannot send an Authorization header, so the URL carries a
+    // short-lived ticket instead of the token
+    const open = async () => {
+      let ticket;
+      try {
+        ({ ticket } = (await apiClient.post('/events/ticket/')).data);
+      } catch (error) {
+        if (error.response?.status !== 401 && !closed) {
+          retry();
+        }
+        return;
+      }
+      if (closed) {
+        return;
+      }
+      const params = new URLSearchParams({ ticket });
+      if (lastEventId) {
+        params.set('last_event_id', lastEventId);
+      }
+      source = new EventSource(`${EVENTS_URL}?${params}`);
+      Object.entries(handlers).forEach(([type, handler]) => {
+        source.addEventListener(type, (event) => {
+          lastEventId = event.lastEventId;
+          handler(JSON.parse(event.data));
+        });
+      });
+      // The source reconnects by itself with the same ticket; once that has
+      // expired the server refuses it and the source closes
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED && !closed) {
+          retry();
+        }
+      };
+    };
+
+    open();
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      if (source) {
+        source.close();
+      }
+    };
+  },
+};
+
+export const DATASET_EVENTS = ['dataset.created', 'dataset.deleted', 'dataset.pruned'];
+
 // Health check
 export const healthCheck = async () => {
   const response = await apiClient.get('/health/');